@@ -1,7 +1,39 @@
-from selenium.common.exceptions import NoSuchElementException
-from selenium.webdriver.common.by import By
+import binascii
+import collections
+import copy
+import functools
+import os
+import time
 
 
+class By(object):
+    """ Webdriver locator strategies, the same as Selenium's ``By``, which
+        isn't imported so that Page Objects don't need Selenium to load.
+    """
+    ID = 'id'
+    XPATH = 'xpath'
+    LINK_TEXT = 'link text'
+    PARTIAL_LINK_TEXT = 'partial link text'
+    NAME = 'name'
+    TAG_NAME = 'tag name'
+    CLASS_NAME = 'class name'
+    CSS_SELECTOR = 'css selector'
+
+
+class _LazyExceptions(object):
+    """ The webdriver exceptions from `page_objects.exceptions`, which is only
+        imported, along with Selenium, the first time one is raised or caught.
+        ``except`` clauses are only evaluated when there's an exception.
+    """
+    def __getattr__(self, name):
+        from page_objects import exceptions
+        value = getattr(exceptions, name)
+        setattr(self, name, value)
+        return value
+
+
+_errors = _LazyExceptions()
+
 # Map PageElement constructor arguments to webdriver locator enums
 _LOCATOR_MAP = {'css': By.CSS_SELECTOR,
                 'id_': By.ID,
@@ -14,7 +46,602 @@ _LOCATOR_MAP = {'css': By.CSS_SELECTOR,
                 }
 
 
-class PageObject(object):
+def _script_locator(by, value):
+    """ Translate a webdriver locator into one that the `_JS_FIND` function can
+        evaluate in the browser, the same way the remote webdriver does for the
+        W3C protocol. Returns ``None`` for locators that can't be translated
+        exactly, such as link text.
+    """
+    if by in (By.CSS_SELECTOR, By.XPATH):
+        return by, value
+    if by == By.ID:
+        return By.CSS_SELECTOR, '[id="%s"]' % value
+    if by == By.NAME:
+        return By.CSS_SELECTOR, '[name="%s"]' % value
+    if by == By.CLASS_NAME:
+        return By.CSS_SELECTOR, '.%s' % value
+    if by == By.TAG_NAME:
+        return By.CSS_SELECTOR, value
+    return None
+
+
+# Javascript function to find one or many elements from a root node, using a
+# locator from `_script_locator`
+_JS_FIND = """
+var find = function(root, using, value, multi) {
+    if (using === 'xpath') {
+        var res = document.evaluate(value, root, null, multi ? 7 : 9, null);
+        if (!multi) {
+            return res.singleNodeValue;
+        }
+        var found = [];
+        for (var i = 0; i < res.snapshotLength; i++) {
+            found.push(res.snapshotItem(i));
+        }
+        return found;
+    }
+    if (multi) {
+        return Array.prototype.slice.call(root.querySelectorAll(value));
+    }
+    return root.querySelector(value);
+};
+"""
+
+# Resolve a list of [context, using, value, multi] queries. Each result is the
+# element(s) found, or false if the query failed in the browser.
+_RESOLVE_SCRIPT = _JS_FIND + """
+return arguments[0].map(function(q) {
+    try {
+        return find(q[0] || document, q[1], q[2], q[3]);
+    } catch (e) {
+        return false;
+    }
+});
+"""
+
+# Set values on a list of [elements, using, value, multi, new value] queries,
+# finding any elements that are null. Values are only set if every query found
+# something; returns the elements found (false where the query failed) and
+# whether the values were set.
+_FILL_SCRIPT = _JS_FIND + """
+var setValue = function(el, value) {
+    if (typeof value === 'boolean') {
+        el.checked = value;
+    } else {
+        // Use the native setter so frameworks tracking the value see the change
+        var prop = Object.getOwnPropertyDescriptor(Object.getPrototypeOf(el), 'value');
+        if (prop && prop.set) {
+            prop.set.call(el, value);
+        } else {
+            el.value = value;
+        }
+    }
+    ['input', 'change'].forEach(function(type) {
+        el.dispatchEvent(new Event(type, {bubbles: true}));
+    });
+};
+var queries = arguments[0];
+var found = queries.map(function(q) {
+    if (q[0] !== null) {
+        return q[0];
+    }
+    try {
+        return find(document, q[1], q[2], q[3]);
+    } catch (e) {
+        return false;
+    }
+});
+var ok = found.every(function(f) {
+    // Selects and forms have a length too, so only lists can be empty
+    return f && (f.nodeType === 1 || f.length !== 0);
+});
+if (ok) {
+    queries.forEach(function(q, i) {
+        (q[3] ? found[i] : [found[i]]).forEach(function(el) {
+            setValue(el, q[4]);
+        });
+    });
+}
+return [found, ok];
+"""
+
+# Find a chain of [using, value] steps from a root node, each in the first
+# element found by the one before. The last step finds one or many elements as
+# given by the multi flag. Returns false if a step failed in the browser.
+_CHAIN_SCRIPT = _JS_FIND + """
+var root = arguments[0] || document, steps = arguments[1], multi = arguments[2];
+try {
+    for (var i = 0; i < steps.length - 1; i++) {
+        root = find(root, steps[i][0], steps[i][1], false);
+        if (!root) {
+            return multi ? [] : null;
+        }
+    }
+    return find(root, steps[i][0], steps[i][1], multi);
+} catch (e) {
+    return false;
+}
+"""
+
+# Whether anything matches a [context, using, value] locator, without waiting.
+# Link text is matched against the trimmed rendered text of links, as the
+# webdriver does. Returns null if the locator failed in the browser.
+_EXISTS_SCRIPT = _JS_FIND + """
+var root = arguments[0] || document, using = arguments[1], value = arguments[2];
+try {
+    if (using === 'link text' || using === 'partial link text') {
+        var links = root.querySelectorAll('a');
+        for (var i = 0; i < links.length; i++) {
+            var text = (links[i].innerText || links[i].textContent || '').trim();
+            if (using === 'link text' ? text === value : text.indexOf(value) !== -1) {
+                return true;
+            }
+        }
+        return false;
+    }
+    return !!find(root, using, value, false);
+} catch (e) {
+    return null;
+}
+"""
+
+# Javascript function reading a field from an element like get_attribute, from
+# the property of that name if there is one or else the attribute, with 'text'
+# and 'tag_name' as for the element
+_JS_READ = """
+var read = function(el, field) {
+    if (field === 'text') {
+        return el.innerText;
+    }
+    if (field === 'tag_name') {
+        return el.tagName.toLowerCase();
+    }
+    var value = el[field];
+    if (typeof value === 'boolean') {
+        return value ? 'true' : null;
+    }
+    if (value === undefined || value === null || typeof value === 'object' ||
+            typeof value === 'function') {
+        value = el.getAttribute(field);
+    }
+    return value;
+};
+"""
+
+# Read fields from elements, given [context, elements, using, value, fields,
+# multi]. The elements are found with the locator if they're null, only the
+# first match unless multi is true. Returns a list of values for each field, or
+# false if the lookup failed in the browser.
+_EXTRACT_SCRIPT = _JS_FIND + _JS_READ + """
+var els = arguments[1], fields = arguments[4];
+if (els === null) {
+    try {
+        els = find(arguments[0] || document, arguments[2], arguments[3], arguments[5]);
+    } catch (e) {
+        return false;
+    }
+    if (!arguments[5]) {
+        els = els ? [els] : [];
+    }
+}
+return fields.map(function(field) {
+    return els.map(function(el) {
+        return read(el, field);
+    });
+});
+"""
+
+# Find the next batch of elements not seen before by the iteration named by a
+# token, given [context, using, value, token, batch size, key, scroll]. Elements
+# are marked as seen with a property named after the token or, given a key
+# field, by recording its value on the window, for lists that reuse their
+# elements. With scroll, the last element is scrolled into view when there are
+# no more to return, to load more. Returns false if the query failed.
+_ITER_SCRIPT = _JS_FIND + """
+var token = arguments[3], batch = arguments[4], key = arguments[5], scroll = arguments[6];
+var els;
+try {
+    els = find(arguments[0] || document, arguments[1], arguments[2], true);
+} catch (e) {
+    return false;
+}
+var seen = window[token] = window[token] || {};
+var found = [];
+for (var i = 0; i < els.length && found.length < batch; i++) {
+    var el = els[i];
+    if (key === null) {
+        if (el[token]) {
+            continue;
+        }
+        el[token] = true;
+    } else {
+        var value = String(key === 'text' ? el.innerText : el.getAttribute(key));
+        if (seen.hasOwnProperty(value)) {
+            continue;
+        }
+        seen[value] = true;
+    }
+    found.push(el);
+}
+if (scroll && found.length < batch && els.length) {
+    els[els.length - 1].scrollIntoView();
+}
+return found;
+"""
+
+# Get the HTML of an element, found with [element, using, value], or the whole
+# document if both are null, along with the page URL and title. The values and
+# checked and selected states of form fields are copied to the attributes of a
+# clone first, as the HTML only has the ones the page was loaded with.
+_SNAPSHOT_SCRIPT = _JS_FIND + """
+var root = arguments[0];
+if (root === null) {
+    root = arguments[1] === null ? document.documentElement :
+        find(document, arguments[1], arguments[2], false);
+}
+if (!root) {
+    return [null, document.URL, document.title];
+}
+var fields = function(el) {
+    return [el].concat(Array.prototype.slice.call(el.querySelectorAll('input, textarea, option')));
+};
+var copy = root.cloneNode(true), live = fields(root), copied = fields(copy);
+for (var i = 0; i < live.length; i++) {
+    var el = live[i], tag = el.tagName.toLowerCase(), state = null;
+    if (tag === 'input' || tag === 'textarea') {
+        copied[i].setAttribute('value', el.value);
+        if (tag === 'textarea') {
+            copied[i].textContent = el.value;
+        }
+        state = el.type === 'checkbox' || el.type === 'radio' ? 'checked' : null;
+    } else if (tag === 'option') {
+        state = 'selected';
+    }
+    if (state && el[state]) {
+        copied[i].setAttribute(state, '');
+    } else if (state) {
+        copied[i].removeAttribute(state);
+    }
+}
+return [copy.outerHTML, document.URL, document.title];
+"""
+
+# Watch the values of [name, using, value, multi] queries under the name in
+# arguments[0], reading the field in arguments[2] of the element, or list of
+# elements, each finds. Whenever the DOM changes the values are read again,
+# and any that changed are queued as [name, old, new, milliseconds] events.
+# Returns the current values.
+_WATCH_SCRIPT = _JS_FIND + _JS_READ + """
+var token = arguments[0], queries = arguments[1], field = arguments[2];
+if (window[token]) {
+    window[token].observer.disconnect();
+}
+var state = window[token] = {queue: [], values: {}, pending: false};
+var current = function(q) {
+    var found;
+    try {
+        found = find(document, q[1], q[2], q[3]);
+    } catch (e) {
+        return null;
+    }
+    if (q[3]) {
+        return found.map(function(el) { return read(el, field); });
+    }
+    return found ? read(found, field) : null;
+};
+state.check = function() {
+    state.pending = false;
+    var now = Date.now();
+    queries.forEach(function(q) {
+        var value = current(q), old = state.values[q[0]];
+        if (JSON.stringify(value) !== JSON.stringify(old)) {
+            state.values[q[0]] = value;
+            state.queue.push([q[0], old, value, now]);
+        }
+    });
+};
+queries.forEach(function(q) {
+    state.values[q[0]] = current(q);
+});
+state.observer = new MutationObserver(function() {
+    if (!state.pending) {
+        state.pending = true;
+        setTimeout(state.check, 0);
+    }
+});
+state.observer.observe(document, {childList: true, subtree: true, attributes: true,
+                                  characterData: true});
+return queries.map(function(q) { return state.values[q[0]]; });
+"""
+
+# Return and clear the events queued by the watch named in arguments[0], and
+# stop it if arguments[1] is true. Returns null if there's no such watch, as
+# when the browser has loaded another document.
+_DRAIN_SCRIPT = """
+var state = window[arguments[0]];
+if (!state) {
+    return null;
+}
+if (state.pending) {
+    state.check();
+}
+var events = state.queue;
+state.queue = [];
+if (arguments[1]) {
+    state.observer.disconnect();
+    delete window[arguments[0]];
+}
+return events;
+"""
+
+# Conditions a waiting Page Element can wait for
+_WAIT_CONDITIONS = ('present', 'visible', 'enabled')
+
+# Seconds between lookups when a wait can't be done in the browser
+_POLL_INTERVAL = 0.5
+
+# Asynchronous script waiting for a [context, using, value, multi] query to find
+# elements meeting a condition, within a timeout in milliseconds. The query is
+# checked whenever the DOM changes; CSS can also change visibility without
+# touching the DOM, so visibility is rechecked every 100ms. Calls back with the
+# element(s) found, null or [] on timeout, or false if the query failed.
+_WAIT_SCRIPT = _JS_FIND + """
+var root = arguments[0] || document, using = arguments[1], value = arguments[2],
+    multi = arguments[3], until = arguments[4], timeout = arguments[5],
+    done = arguments[arguments.length - 1];
+var ready = function(el) {
+    if (until === 'visible') {
+        return window.getComputedStyle(el).visibility !== 'hidden' &&
+            el.getClientRects().length > 0;
+    }
+    if (until === 'enabled') {
+        return !el.disabled;
+    }
+    return true;
+};
+var check = function() {
+    var found = find(root, using, value, multi);
+    var els = multi ? found : (found ? [found] : []);
+    return els.some(ready) ? found : null;
+};
+var observer, timer, interval;
+var finish = function(res) {
+    observer.disconnect();
+    clearTimeout(timer);
+    clearInterval(interval);
+    done(res);
+};
+var recheck = function() {
+    var res;
+    try {
+        res = check();
+    } catch (e) {
+        res = false;
+    }
+    if (res !== null) {
+        finish(res);
+    }
+};
+observer = new MutationObserver(recheck);
+observer.observe(document, {childList: true, subtree: true, attributes: true,
+                            characterData: true});
+timer = setTimeout(function() {
+    finish(multi ? [] : null);
+}, timeout);
+if (until === 'visible') {
+    interval = setInterval(recheck, 100);
+}
+recheck();
+"""
+
+
+# Ways `PageObject.get` can navigate
+_NAVIGATION_STRATEGIES = ('normal', 'eager', 'none', 'history')
+
+# Seconds between checks for an 'eager' navigation's document to be parsed
+_LOAD_POLL_INTERVAL = 0.05
+
+# Navigate to the URL in arguments[0] without waiting for it to load, marking the
+# current document with the name in arguments[1]. If arguments[2] is true, push
+# the URL onto the history instead, for single-page apps to route to.
+_NAVIGATE_SCRIPT = """
+var url = arguments[0], token = arguments[1];
+if (arguments[2]) {
+    history.pushState(null, '', url);
+    window.dispatchEvent(new PopStateEvent('popstate', {state: null}));
+    return;
+}
+window[token] = true;
+window.location.href = url;
+"""
+
+# Asynchronous script returning true once the document that replaced the one
+# marked with arguments[0] has been parsed, or false if it's still the old one
+_LOADED_SCRIPT = """
+var done = arguments[arguments.length - 1];
+if (window[arguments[0]]) {
+    done(false);
+} else if (document.readyState !== 'loading') {
+    done(true);
+} else {
+    document.addEventListener('DOMContentLoaded', function() { done(true); });
+}
+"""
+
+# Active `page_objects.instrumentation.Recorder`, if any
+_recorder = None
+
+
+def _instrumented(op):
+    """ Decorator recording calls to a `PageObject` method on the active recorder.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(self, *args, **kwargs):
+            if _recorder is None:
+                return func(self, *args, **kwargs)
+            # Only the names of mappings of fields, not their values
+            locator = ', '.join([', '.join(a) if isinstance(a, dict) else str(a) for a in args] +
+                                sorted(kwargs))
+            return _recorder.call(op, self, None, locator, func, self, *args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def _token():
+    """ Unique name for marking things in the browser, such as the window.
+    """
+    return '__page_objects_%s' % binascii.hexlify(os.urandom(16)).decode('ascii')
+
+
+# Characters of CSS selector lists and combinators
+_CSS_COMBINATORS = frozenset(' \t\n,>+~')
+
+
+def _compound_locator(parent, child):
+    """ Combine the locators of a Page Element and its parent into one that finds
+        the child inside the first element matching the parent. Returns ``None``
+        if they can't be combined exactly.
+    """
+    if parent.has_context or parent.wait or not child.script_locator:
+        return None
+    by, value = parent.locator
+    child_by, child_value = child.script_locator
+    if child_by == By.CSS_SELECTOR and by == By.ID:
+        # IDs are unique, so any element under a match is under the first one.
+        # Only for a single compound selector: the ancestors in a child selector
+        # like 'div span' can be outside the parent element, but not once it's
+        # appended to the parent's selector.
+        if not _CSS_COMBINATORS.intersection(child_value) and '"' not in value:
+            return By.CSS_SELECTOR, '[id="%s"] %s' % (value, child_value)
+    elif child_by == By.XPATH and child_value.startswith('./') and '|' not in child_value:
+        if by == By.ID and "'" not in value:
+            return By.XPATH, "//*[@id='%s']%s" % (value, child_value[1:])
+        if by == By.XPATH:
+            return By.XPATH, '(%s)[1]%s' % (value, child_value[1:])
+    return None
+
+
+def _driver(context):
+    """ The webdriver of a context, which is either the webdriver or an element.
+    """
+    # Elements know their driver as their parent
+    return getattr(context, 'parent', context)
+
+
+def _find_chain(context, descriptors):
+    """ Find the last of a chain of Page Elements, each inside the one before,
+        with one script call. Returns ``False`` if the chain can't be found with
+        a script.
+    """
+    steps = []
+    for elem in descriptors:
+        if elem.wait or not elem.own.script_locator:
+            return False
+        steps.append(list(elem.own.script_locator))
+    driver = _driver(context)
+    return driver.execute_script(_CHAIN_SCRIPT, context if context is not driver else None,
+                                 steps, descriptors[-1].multiple)
+
+
+def _page_elements(cls):
+    """ Return a dict of name -> `PageElement` for all the page elements
+        declared on the given class and its bases.
+    """
+    registry = vars(cls).get('_po_elements')
+    if registry is not None:
+        return registry
+    return _collect_elements(cls)
+
+
+def _collect_elements(cls):
+    elements = {}
+    for klass in reversed(cls.__mro__):
+        for name, attr in vars(klass).items():
+            if isinstance(attr, PageElement):
+                elements[name] = attr
+            else:
+                elements.pop(name, None)
+    return elements
+
+
+# How and how long the last `PageObject.get` took, see `PageObject.last_navigation`
+Navigation = collections.namedtuple('Navigation', ['url', 'strategy', 'seconds'])
+
+# Change to a watched Page Element, see `PageObject.watch`
+WatchEvent = collections.namedtuple('WatchEvent', ['name', 'old', 'new', 'time'])
+
+# Entry in the registry of a Page Object class, see `PageObject.page_elements`
+ElementInfo = collections.namedtuple('ElementInfo',
+                                     ['name', 'locator', 'kind', 'context', 'descriptor'])
+
+
+class _PageObjectType(type):
+    """ Metaclass building the registry of Page Elements of each Page Object
+        class when the class is created, and keeping it up to date when Page
+        Elements are added to or removed from the class later.
+    """
+    def __init__(cls, name, bases, attrs):
+        super(_PageObjectType, cls).__init__(name, bases, attrs)
+        # The base classes here are created before PageElement, and have no elements
+        if cls.__module__ != __name__:
+            cls._register()
+
+    def page_elements(cls):
+        """ List the Page Elements declared on this class and its bases.
+
+            >>> [e.name for e in LoginPage.page_elements() if e.kind == 'multi']
+            ['errors']
+
+        :returns: `tuple` of `ElementInfo` with the ``name``, ``locator``,
+            ``kind`` (``'single'`` or ``'multi'``), ``context`` flag and
+            ``descriptor`` of each Page Element, sorted by name
+        """
+        return cls._po_registry
+
+    def _register(cls):
+        elements = _collect_elements(cls)
+        for name, elem in elements.items():
+            if elem.name is None:
+                elem.name = name
+        if issubclass(cls, Component) and not issubclass(cls, PageObject):
+            for name, attr in vars(cls).items():
+                if isinstance(attr, PageElement):
+                    # Lists of elements can't tell that the browser has loaded
+                    # another document, so they're looked up every time
+                    attr.shared = cls.shared_cache and not attr.multiple
+        elif issubclass(cls, Component) and cls._element_cache is not Component._element_cache:
+            raise ValueError("Please list the components of %s before PageObject in its bases"
+                             % cls.__name__)
+        type.__setattr__(cls, '_po_elements', elements)
+        type.__setattr__(cls, '_po_registry', tuple(
+            ElementInfo(name, elem.locator, 'multi' if elem.multiple else 'single',
+                        elem.has_context, elem)
+            for name, elem in sorted(elements.items())))
+
+    def _reregister(cls, name, value=None):
+        if isinstance(value, PageElement) or name in cls._po_elements:
+            todo = [cls]
+            while todo:
+                klass = todo.pop()
+                klass._register()
+                todo.extend(type.__subclasses__(klass))
+
+    def __setattr__(cls, name, value):
+        super(_PageObjectType, cls).__setattr__(name, value)
+        cls._reregister(name, value)
+
+    def __delattr__(cls, name):
+        super(_PageObjectType, cls).__delattr__(name)
+        cls._reregister(name)
+
+
+# Created by calling the metaclass, for the same syntax on Python 2 and 3
+_PageObjectBase = _PageObjectType(str('_PageObjectBase'), (object,),
+                                  {'_po_elements': {}, '_po_registry': ()})
+
+
+class PageObject(_PageObjectBase):
     """Page Object pattern.
 
     :param webdriver: `selenium.webdriver.WebDriver`
@@ -22,17 +649,566 @@ class PageObject(object):
     :param root_uri: `str`
         Root URI to base any calls to the ``PageObject.get`` method. If not defined
         in the constructor it will try and look it from the webdriver object.
+    :param cache: `bool`
+        Cache the elements found by this page's Page Elements. Defaults to the
+        ``cache_elements`` class attribute.
+
+    Set ``ready_element`` to the name of a Page Element for ``get`` to wait for
+    after navigating, usually one with a ``wait``.
+
+    Set ``blocked_resources`` to URL patterns, and ``network_conditions`` to a
+    dict of network conditions, for ``get`` to apply to the webdriver before
+    navigating, see `page_objects.network`.
+
+    The Page Elements of each Page Object class are registered when the class
+    is created, and listed by ``LoginPage.page_elements()``.
     """
-    def __init__(self, webdriver, root_uri=None):
+    cache_elements = False
+    ready_element = None
+    blocked_resources = ()
+    network_conditions = None
+    # `Navigation` record of the last call to ``get``
+    last_navigation = None
+
+    def __init__(self, webdriver, root_uri=None, cache=None):
         self.w = webdriver
         self.root_uri = root_uri if root_uri else getattr(self.w, 'root_uri', None)
+        if cache is not None:
+            self.cache_elements = bool(cache)
+
+    @property
+    def _element_cache(self):
+        # Created on first use so subclasses overriding __init__ still work
+        cache = self.__dict__.get('_po_element_cache')
+        if cache is None:
+            cache = self.__dict__['_po_element_cache'] = {}
+        return cache
 
-    def get(self, uri):
+    @_instrumented('get')
+    def get(self, uri, reload=True, strategy='normal', ready=None, timeout=30):
         """
         :param uri:  URI to GET, based off of the root_uri attribute.
+        :param reload: `bool`
+            Navigate even if the browser is already on the URL
+        :param strategy: `str`
+            ``'normal'`` waits for the page to load, ``'eager'`` only until its
+            HTML is parsed and ``'none'`` doesn't wait. ``'history'`` pushes the
+            URL onto the history of a single-page app instead of loading it.
+        :param ready: `str`
+            Name of a Page Element to wait for after navigating, defaults to the
+            ``ready_element`` class attribute
+        :param timeout: `float`
+            Seconds to wait for an ``'eager'`` navigation
+        """
+        if strategy not in _NAVIGATION_STRATEGIES:
+            raise ValueError("Please specify one of %s to navigate with"
+                             % ', '.join(_NAVIGATION_STRATEGIES))
+        ready = ready or self.ready_element
+        if ready and _page_elements(self.__class__)[ready].has_context:
+            raise ValueError("Sorry, can't wait for elements with context: %s" % ready)
+
+        url = (self.root_uri or '') + uri
+        started = time.time()
+        if not reload and self.w.current_url == url:
+            self.last_navigation = Navigation(url, 'skipped', time.time() - started)
+            return
+
+        self.invalidate()
+        if self.blocked_resources or self.network_conditions or hasattr(self.w, '_po_network'):
+            from page_objects import network
+            network.apply(self.w, self.blocked_resources, self.network_conditions)
+        if strategy == 'normal':
+            self.w.get(url)
+        else:
+            token = _token()
+            self.w.execute_script(_NAVIGATE_SCRIPT, url, token, strategy == 'history')
+            if strategy == 'eager':
+                self._wait_loaded(url, token, timeout)
+        if ready and not getattr(self, ready):
+            raise _errors.TimeoutException("Sorry, %s wasn't ready after loading %s" % (ready, url))
+        self.last_navigation = Navigation(url, strategy, time.time() - started)
+
+    def _wait_loaded(self, url, token, timeout):
+        deadline = time.time() + timeout
+        while True:
+            try:
+                if self.w.execute_async_script(_LOADED_SCRIPT, token):
+                    return
+            except _errors.WebDriverException:
+                # The script ran in the old document, and was unloaded with it
+                pass
+            if time.time() >= deadline:
+                raise _errors.TimeoutException("Sorry, %s didn't load in time" % url)
+            time.sleep(_LOAD_POLL_INTERVAL)
+
+    def invalidate(self, *names):
+        """ Drop cached elements, forcing them to be looked up again on next access.
+
+        :param names: `str`
+            Names of the Page Elements to drop. If none are given the whole
+            cache is cleared.
+        """
+        cache = self._element_cache
+        if not names:
+            cache.clear()
+            return
+        elements = _page_elements(self.__class__)
+        descriptors = set(elements[name] for name in names)
+        for key in [k for k in cache if k[0] in descriptors]:
+            del cache[key]
+
+    @_instrumented('resolve')
+    def resolve(self, *names):
+        """ Look up several Page Elements in a single call to the browser. If
+            caching is enabled for the page, the elements found are cached so
+            accessing them afterwards doesn't need another lookup.
+
+            Locators that can't be evaluated in the browser, such as link text,
+            are looked up individually.
+
+        :param names: `str`
+            Names of the Page Elements to look up. If none are given, all the
+            Page Elements that don't need a context are looked up.
+        :returns: `dict` of name -> element, or list of elements for
+            `MultiPageElement`
+        """
+        elements = _page_elements(self.__class__)
+        if not names:
+            names = sorted(n for n, e in elements.items() if not e.has_context)
+
+        cache = self._element_cache
+        results = {}
+        queries = []
+        for name in names:
+            elem = elements[name]
+            if elem.has_context:
+                raise ValueError("Sorry, can't resolve elements with context: %s" % name)
+            if (elem, None) in cache:
+                results[name] = cache[(elem, None)]
+            elif elem.script_locator and not elem.wait:
+                queries.append((name, elem))
+            else:
+                results[name] = elem.find(self.w)
+
+        if queries:
+            found = self.w.execute_script(_RESOLVE_SCRIPT, [
+                [None, elem.script_locator[0], elem.script_locator[1], elem.multiple]
+                for _, elem in queries])
+            for (name, elem), res in zip(queries, found):
+                results[name] = elem.find(self.w) if res is False else res
+
+        for name in names:
+            elem = elements[name]
+            if results[name] and (self.cache_elements or elem.shared) and (elem, None) not in cache:
+                results[name] = cache[(elem, None)] = _cache_entry(self, elem, None, results[name])
+        return results
+
+    @_instrumented('has')
+    def has(self, name, context=None):
+        """ Check whether a Page Element is on the page, straight away. Unlike
+            looking the element up, an absent element doesn't wait for the
+            webdriver's implicit wait or the element's ``wait``.
+
+                >>> assert not page.has('error')
+
+        :param name: `str`
+            Name of the Page Element
+        :param context: Element to look in, for Page Elements with context
+        :returns: `bool`
+        """
+        elem = _page_elements(self.__class__)[name]
+        if elem.has_context and context is None:
+            raise ValueError("Please specify the context to look for %s in" % name)
+        if isinstance(context, LazyElement):
+            context = context.resolve()
+            if not context:
+                return False
+        return elem.exists(context if context is not None else self.w)
+
+    @_instrumented('extract')
+    def extract(self, name, fields, context=None):
+        """ Read fields from all the elements a Page Element finds with a single
+            call to the browser, rather than one call per element and field.
+
+                >>> page.extract('rows', ['text', 'data-id'])
+                {'text': ['Row 1', 'Row 2'], 'data-id': ['1', '2']}
+
+            Fields are read the way ``get_attribute`` reads them, from the
+            property of that name if the element has one or else the attribute.
+            ``'text'`` and ``'tag_name'`` give the element's text and tag name.
+            Single Page Elements only read the first element they match.
+
+        :param name: `str`
+            Name of the Page Element
+        :param fields: `list`
+            Names of the fields to read
+        :param context:
+            Element to look the Page Element up in, if it has context
+        :returns: `dict` of field name -> list of values, one for each element
+        """
+        elem = _page_elements(self.__class__)[name]
+        if elem.has_context and context is None:
+            raise ValueError("Please specify a context to extract %s from" % name)
+        if isinstance(context, LazyElement):
+            context = context.resolve()
+        fields = list(fields)
+        try:
+            columns = self._extract(elem, fields, context)
+        except _errors.StaleElementReferenceException:
+            # The cached elements have gone stale
+            self.invalidate(name)
+            columns = self._extract(elem, fields, context)
+        return dict(zip(fields, columns))
+
+    def _extract(self, elem, fields, context):
+        found = _unwrap(self._element_cache.get((elem, context)))
+        if found is None and (elem.wait or not elem.script_locator):
+            found = elem.find(context or self.w)
+        if found is not None and not elem.multiple:
+            found = [found] if found else []
+        using, value = elem.script_locator or (None, None)
+        columns = self.w.execute_script(_EXTRACT_SCRIPT, context, found, using, value, fields,
+                                        elem.multiple)
+        if columns is False:
+            found = elem.find(context or self.w)
+            found = found if elem.multiple else [found] if found else []
+            columns = self.w.execute_script(_EXTRACT_SCRIPT, context, found, using, value,
+                                            fields, elem.multiple)
+        return columns
+
+    @_instrumented('snapshot')
+    def snapshot(self, name=None):
+        """ Take a read-only copy of the page with a single call to the browser.
+            The copy's Page Elements are looked up in the copy, without any
+            round-trips, and return `page_objects.snapshot.SnapshotElement` views.
+
+                >>> snap = page.snapshot()
+                >>> assert snap.price.text == '9.99'
+
+        :param name: `str`
+            Name of a Page Element to copy the element of, rather than the whole page
+        :returns: a copy of this Page Object, on a `page_objects.snapshot.SnapshotDriver`
+        """
+        from page_objects.snapshot import SnapshotDriver
+
+        root, using, value = None, None, None
+        if name is not None:
+            elem = _page_elements(self.__class__)[name]
+            if elem.has_context or elem.multiple:
+                raise ValueError("Sorry, can only snapshot single elements without context: %s"
+                                 % name)
+            root = _unwrap(self._element_cache.get((elem, None)))
+            if root is None and (elem.wait or not elem.script_locator):
+                root = elem.find(self.w)
+                if not root:
+                    raise ValueError("Can't take snapshot, element not found")
+            elif root is None:
+                using, value = elem.script_locator
+        html, url, title = self.w.execute_script(_SNAPSHOT_SCRIPT, root, using, value)
+        if html is None:
+            raise ValueError("Can't take snapshot, element not found")
+
+        page = copy.copy(self)
+        page.__dict__.pop('_po_element_cache', None)
+        # Lookups in a snapshot are local, and it never goes stale
+        page.cache_elements = False
+        page.w = SnapshotDriver(html, url, title)
+        return page
+
+    @_instrumented('capture')
+    def capture(self, name, context=None):
+        """ Take a screenshot of a Page Element. The browser crops it to the
+            element's bounding box, so only the element's pixels are sent back.
+
+                >>> png = page.capture('header')
+
+            See `page_objects.visual` to compare captures with baselines.
+
+        :param name: `str`
+            Name of the Page Element
+        :param context: Element to look in, for Page Elements with context
+        :returns: `bytes` of the PNG image
+        """
+        elem = _page_elements(self.__class__)[name]
+        if elem.multiple:
+            raise ValueError("Sorry, can only capture single elements: %s" % name)
+        if elem.has_context and context is None:
+            raise ValueError("Please specify the context to capture %s in" % name)
+        found = getattr(self, name)
+        if elem.has_context:
+            found = found(context)
+        if not found:
+            raise ValueError("Can't capture %s, element not found" % name)
+        return found.screenshot_as_png
+
+    @_instrumented('watch')
+    def watch(self, *names, **kwargs):
+        """ Watch Page Elements for changes, rather than reading them over and
+            over. One call installs an observer in the browser, which records
+            changes to the elements as they happen, and they're then fetched in
+            batches with one call per poll.
+
+                >>> with page.watch('status', 'count') as watch:
+                        for event in watch:
+                            print(event.name, event.old, event.new)
+
+        :param names: `str`
+            Names of the Page Elements to watch
+        :param field: `str`
+            Field of the elements to watch, as for ``extract``. Defaults to ``'text'``.
+        :param interval: `float`
+            Seconds between polls when nothing has changed, defaults to 0.5
+        :returns: the started `Watch`
+        """
+        unknown = set(kwargs) - set(['field', 'interval'])
+        if unknown:
+            raise TypeError("Unexpected arguments: %s" % ', '.join(sorted(unknown)))
+        return Watch(self, names, **kwargs).start()
+
+    def iterate(self, name, batch=100, limit=None, until=None, key=None, scroll=False,
+                more=None, pause=0.5, context=None):
+        """ Iterate over the elements of a Multi Page Element, fetching them from
+            the browser in batches as they're needed. Elements are only returned
+            once, even if more are loaded into the list as it goes.
+
+                >>> for row in page.iterate('rows', batch=200, scroll=True, limit=1000):
+                        check(row)
+
+            When there are no new elements left, ``scroll`` scrolls the last one
+            into view and checks again after ``pause`` seconds, for lists that
+            load more as they're scrolled. ``more`` is called instead, or after
+            scrolling finds nothing new, to load another page of elements.
+
+        :param name: `str`
+            Name of the Multi Page Element
+        :param batch: `int`
+            Number of elements to fetch at a time
+        :param limit: `int`
+            Stop after this many elements
+        :param until: `callable`
+            Stop before the first element this returns true for
+        :param key: `str`
+            Field identifying elements, such as ``'data-id'`` or ``'text'``, for
+            lists that reuse their elements for new items. By default elements
+            are only returned once.
+        :param scroll: `bool`
+            Scroll to load more elements
+        :param more: `callable`
+            Called with the page to load more elements, eg by clicking a next
+            button. Iteration continues while it returns true.
+        :param pause: `float`
+            Seconds to wait for more elements after scrolling
+        :param context:
+            Element to look the Page Element up in, if it has context
+        """
+        elem = _page_elements(self.__class__)[name]
+        if not elem.multiple:
+            raise ValueError("Sorry, can only iterate over Multi Page Elements: %s" % name)
+        if elem.has_context and context is None:
+            raise ValueError("Please specify a context to iterate over %s in" % name)
+        if isinstance(context, LazyElement):
+            context = context.resolve()
+        if limit is not None and limit <= 0:
+            return
+        count = 0
+        for found in self._batches(elem, batch, key, scroll, more, pause, context):
+            for el in found:
+                if until is not None and until(el):
+                    return
+                yield el
+                count += 1
+                if count == limit:
+                    return
+
+    def _batches(self, elem, batch, key, scroll, more, pause, context):
+        if elem.script_locator and not elem.wait:
+            token = _token()
+            args = (context,) + elem.script_locator + (token, batch, key, bool(scroll))
+            waited = False
+            while True:
+                found = self.w.execute_script(_ITER_SCRIPT, *args)
+                if found is False:
+                    break
+                if found:
+                    waited = False
+                    yield found
+                elif scroll and not waited:
+                    waited = True
+                    time.sleep(pause)
+                elif more is not None and more(self):
+                    waited = False
+                else:
+                    return
+
+        # Can't be found with a script, so fetch them all and hand them out in batches
+        found = elem.find(context or self.w)
+        for i in range(0, len(found), batch):
+            yield found[i:i + batch]
+
+    @_instrumented('fill')
+    def fill(self, *fields, **values):
+        """ Set the values of several Page Elements with a single call to the
+            browser. Any elements not already cached are looked up in the same call.
+            The values are set in the order given, so fields that depend on
+            others, like a select whose options are filled in by another's
+            ``change`` event, can come after them.
+
+            Unlike setting the Page Element attributes, which types into the
+            elements with ``send_keys``, this replaces their values directly and
+            fires ``input`` and ``change`` events. Boolean values set the
+            ``checked`` state of checkboxes and radio buttons. Keep to attribute
+            assignment for fields that need real keystrokes.
+
+            No values are set unless all of the elements are found. If caching
+            is enabled for the page, the elements found are cached.
+
+        :param fields:
+            Mapping of Page Element names to the values to set on them, such as
+            a `collections.OrderedDict`, for Pythons that don't keep the order
+            of keyword arguments. Set before any keyword arguments.
+        :param values:
+            Page Element names and the values to set on them
+        """
+        if len(fields) > 1:
+            raise TypeError("fill() takes at most one mapping of fields")
+        items = list(fields[0].items()) if fields else []
+        items.extend(values.items())
+        elements = _page_elements(self.__class__)
+        names = [name for name, _ in items]
+        targets = [elements[name] for name in names]
+        for name, elem in zip(names, targets):
+            if elem.has_context:
+                raise ValueError("Sorry, can't fill elements with context: %s" % name)
+        args = targets, [value for _, value in items]
+        try:
+            found = self._fill(*args)
+        except _errors.StaleElementReferenceException:
+            # Cached elements passed to the script have gone stale
+            self.invalidate(*names)
+            found = self._fill(*args)
+
+        cache = self._element_cache
+        for elem, res in zip(targets, found):
+            if self.cache_elements or elem.shared:
+                cache[(elem, None)] = _cache_entry(self, elem, None, res)
+
+    def _fill(self, elements, values):
+        cache = self._element_cache
+        queries = []
+        for elem, value in zip(elements, values):
+            target = _unwrap(cache.get((elem, None)))
+            if target is None and (not elem.script_locator or elem.wait):
+                target = elem.find(self.w)
+                elem._check_found(target)
+            using, selector = elem.script_locator or (None, None)
+            queries.append([target, using, selector, elem.multiple, value])
+
+        found, ok = self.w.execute_script(_FILL_SCRIPT, queries)
+        if ok:
+            return found
+
+        # Look up anything the browser couldn't in the usual way and try again
+        for elem, query, res in zip(elements, queries, found):
+            if res is False:
+                res = query[0] = elem.find(self.w)
+            elem._check_found(res)
+        found, ok = self.w.execute_script(_FILL_SCRIPT, queries)
+        return found
+
+    def _drop_stale(self, key, entry):
+        """ Drop a cache entry with a stale element, unless another element from
+            the entry has already been looked up again.
         """
-        root_uri = self.root_uri or ''
-        self.w.get(root_uri + uri)
+        cache = self._element_cache
+        if cache.get(key) is entry:
+            del cache[key]
+
+    def _refresh(self, elem):
+        """ Look up a stale cached element again. Returns ``None`` if the element
+            didn't come from the cache, or can no longer be found.
+        """
+        cache = self._element_cache
+        for key, value in list(cache.items()):
+            if isinstance(value, list):
+                if any(v._element is elem for v in value):
+                    # Can't tell which of the new results it corresponds to
+                    del cache[key]
+            elif value._element is elem:
+                del cache[key]
+                descriptor, context = key
+                return descriptor._get(self, self.__class__, context)
+        return None
+
+
+class _ComponentCache(object):
+    """ Elements found by the Page Elements of components on a webdriver's
+        current document, shared by all the Page Objects using the webdriver.
+    """
+    def __init__(self):
+        self.new_document()
+
+    def __repr__(self):
+        return '<ComponentCache {0} elements={1}>'.format(self.document, len(self.elements))
+
+    def new_document(self):
+        """ Drop the elements, as the browser has loaded another document.
+        """
+        self.document = _token()
+        self.elements = {}
+
+
+def _component_cache(driver):
+    cache = getattr(driver, '_po_components', None)
+    if cache is None:
+        cache = driver._po_components = _ComponentCache()
+    return cache
+
+
+class Component(_PageObjectBase):
+    """ Page Elements for a part of the page shared by many Page Objects, such
+        as a header or navigation bar. Components are mixed into Page Object
+        classes, listed before `PageObject`:
+
+        >>> class Header(Component):
+                logo = PageElement(id_='logo')
+                search = PageElement(name='q')
+
+        >>> class HomePage(Header, PageObject):
+                news = MultiPageElement(css='#news li')
+
+        >>> class SearchPage(Header, PageObject):
+                results = MultiPageElement(css='#results li')
+
+    The elements found by a component's Page Elements are always cached, and
+    shared by all the Page Objects using the same webdriver until the document
+    changes, so flows moving between Page Objects on a page don't look them up
+    again. Multi Page Elements aren't cached, as their lists can't tell when the
+    document has changed. Set ``shared_cache`` to false on a component for its
+    Page Elements to be cached only on pages with caching enabled, like the
+    page's own. Pages with components keep the elements of their own Page
+    Elements in the same cache, if they have caching enabled.
+
+    The document is taken to change when a Page Object on the webdriver
+    navigates with ``PageObject.get`` or drops its cache with
+    ``PageObject.invalidate``. After navigating in other ways, such as by
+    clicking a link, the cached elements are stale: the first one used is
+    looked up again, and the rest of the cache is dropped along with it.
+    """
+    shared_cache = True
+
+    @property
+    def _element_cache(self):
+        return _component_cache(self.w).elements
+
+    def _drop_stale(self, key, entry):
+        # Most likely the browser has loaded another document
+        _component_cache(self.w).new_document()
+
+    def invalidate(self, *names):
+        if not names:
+            _component_cache(self.w).new_document()
+            return
+        super(Component, self).invalidate(*names)
 
 
 class PageElement(object):
@@ -57,6 +1233,14 @@ class PageElement(object):
 
     :param context: `bool`
         This element is expected to be called with context
+    :param wait: `float`
+        Seconds to wait for the element when it's looked up
+    :param until: `str`
+        What to wait for: ``'present'`` (the default), ``'visible'`` or ``'enabled'``
+    :param lazy: `bool`
+        Return a `LazyElement` that isn't looked up until it's used
+    :param parent: `PageElement`
+        Look this element up inside the element found by another Page Element
 
     Page Elements are used to access elements on a page. The are constructed
     using this factory method to specify the locator for the element.
@@ -69,40 +1253,269 @@ class PageElement(object):
 
     Page Elements act as property descriptors for their Page Object, you can get
     and set them as normal attributes.
+
+    If the Page Object has caching enabled, found elements are kept until they
+    go stale, the page is navigated with ``PageObject.get`` or the cache is
+    dropped with ``PageObject.invalidate``. Cached elements are returned as
+    proxies, which look them up again if they've gone stale when they're used.
+
+    Waiting Page Elements wait inside the browser for the DOM to change, rather
+    than polling the webdriver. If the wait can't be done with a script, such as
+    for link text locators, they fall back to looking the element up every half
+    second. They return ``None`` if the element isn't ready in time.
+
+        >>> class MyPage(PageObject):
+                results = PageElement(css='div.results', wait=5, until='visible')
+
+    Lazy Page Elements return a `LazyElement` proxy, which is only looked up
+    when one of its element methods or properties is used.
+
+    Page Elements with a parent are looked up inside the first element found by
+    the parent, and take its context. Rather than looking up each element in
+    the chain in turn, their locators are combined into a single CSS or XPath
+    locator where that gives the same result, or else found with one script.
+
+        >>> class MyPage(PageObject):
+                sidebar = PageElement(id_='sidebar')
+                menu = PageElement(css='ul.menu', parent=sidebar)
+                items = MultiPageElement(xpath='./li', parent=menu)
     """
-    def __init__(self, context=False, **kwargs):
+    __slots__ = ('locator', 'script_locator', 'has_context', 'wait', 'until', 'lazy', 'parent',
+                 'own', 'compiled', 'name', 'shared', '_key', '_access')
+    multiple = False
+
+    def __init__(self, context=False, wait=None, until='present', lazy=False, parent=None,
+                 **kwargs):
         if not kwargs:
             raise ValueError("Please specify a locator")
         if len(kwargs) > 1:
             raise ValueError("Please specify only one locator")
         k, v = next(iter(kwargs.items()))
         self.locator = (_LOCATOR_MAP[k], v)
+        self.script_locator = _script_locator(*self.locator)
         self.has_context = bool(context)
+        if until not in _WAIT_CONDITIONS:
+            raise ValueError("Please specify one of %s to wait until" % ', '.join(_WAIT_CONDITIONS))
+        self.wait = wait
+        self.until = until
+        self.lazy = bool(lazy)
+        self.parent = parent
+        self.own = self
+        self.compiled = False
+        # Set to the attribute name when the Page Object class is created
+        self.name = None
+        # Set when declared on a `Component`, whose single elements are always cached
+        self.shared = False
+        self._key = (self, None)
+        if parent is not None:
+            if parent.multiple:
+                raise ValueError("Sorry, the parent of a Page Element can't be a MultiPageElement")
+            if context:
+                raise ValueError("Please specify the context flag on the parent")
+            self.has_context = parent.has_context
+            # The same element without the parent, to look up inside the parent element
+            self.own = self.__class__(wait=wait, until=until, **kwargs)
+            locator = _compound_locator(parent, self.own)
+            self.compiled = locator is not None
+            if self.compiled:
+                self.locator = locator
+                self.script_locator = _script_locator(*locator)
+            else:
+                self.script_locator = None
+        self._access = self._accessor()
+
+    def _accessor(self):
+        """ Pick the method getting this element from a page without context, so
+            the options don't have to be checked on every access.
+        """
+        if self.has_context:
+            return self._context_getter
+        if self.lazy:
+            return self._lazy_getter
+        if self.parent is not None:
+            return self._get
+        return self._get_plain
+
+    @property
+    def chain(self):
+        """ This Page Element and its parents, from the outermost.
+        """
+        return (self.parent.chain if self.parent is not None else []) + [self]
 
     def find(self, context):
+        if self.parent is not None and not self.compiled:
+            return self._find_in_parent(context)
+        if self.wait:
+            return self._wait(context)
+        return self._lookup(context)
+
+    def exists(self, context):
+        """ Whether this element is under a context, found with a single script
+            that doesn't wait. See `PageObject.has`.
+        """
+        if self.parent is not None and not self.compiled:
+            found = _find_chain(context, self.chain)
+            if found is not False:
+                return bool(found)
+            if not self.parent.exists(context):
+                return False
+            return self.own.exists(self.parent.find(context))
+
+        driver = _driver(context)
+        root = context if context is not driver else None
+        using, value = self.script_locator or self.locator
+        try:
+            found = driver.execute_script(_EXISTS_SCRIPT, root, using, value)
+        except _errors.StaleElementReferenceException:
+            raise
+        except _errors.WebDriverException:
+            found = None
+        if found is None:
+            return bool(self._lookup(context))
+        return bool(found)
+
+    def _find_in_parent(self, context):
+        found = _find_chain(context, self.chain)
+        if found is not False:
+            return found
+        parent = self.parent.find(context)
+        if not parent:
+            return [] if self.multiple else None
+        return self.own.find(parent)
+
+    def _lookup(self, context):
         try:
             return context.find_element(*self.locator)
-        except NoSuchElementException:
+        except _errors.NoSuchElementException:
             return None
 
+    def _wait_args(self, context, driver):
+        """ Arguments to `_WAIT_SCRIPT` to wait for this element under a context.
+        """
+        return (context if context is not driver else None, self.script_locator[0],
+                self.script_locator[1], self.multiple, self.until, int(self.wait * 1000))
+
+    def _wait(self, context):
+        deadline = time.time() + self.wait
+        if self.script_locator:
+            driver = _driver(context)
+            try:
+                found = driver.execute_async_script(_WAIT_SCRIPT,
+                                                    *self._wait_args(context, driver))
+            except _errors.StaleElementReferenceException:
+                raise
+            except _errors.WebDriverException:
+                # Usually the script timeout is shorter than the wait
+                found = False
+            if found is not False:
+                return found
+        while True:
+            found = self._lookup(context)
+            try:
+                if self._ready(found):
+                    return found
+            except _errors.StaleElementReferenceException:
+                pass
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                return [] if self.multiple else None
+            time.sleep(min(_POLL_INTERVAL, remaining))
+
+    def _ready(self, found):
+        elems = found if self.multiple else [found] if found else []
+        if self.until == 'visible':
+            return any(e.is_displayed() for e in elems)
+        if self.until == 'enabled':
+            return any(e.is_enabled() for e in elems)
+        return bool(elems)
+
     def __get__(self, instance, owner, context=None):
-        if not instance:
+        if instance is None:
             return None
+        if context is None:
+            return self._access(instance, owner)
+        if self.lazy:
+            return LazyElement(instance, self, context)
+        return self._get(instance, owner, context)
 
-        if not context and self.has_context:
-            return lambda ctx: self.__get__(instance, owner, context=ctx)
+    def _context_getter(self, instance, owner):
+        return functools.partial(self.__get__, instance, owner)
 
-        if not context:
-            context = instance.w
+    def _lazy_getter(self, instance, owner):
+        return LazyElement(instance, self)
 
-        return self.find(context)
+    def _get_plain(self, instance, owner):
+        cache = instance._element_cache
+        elem = cache.get(self._key)
+        if elem is not None:
+            return elem
+        if _recorder is None:
+            elem = self.find(instance.w)
+        else:
+            elem = _recorder.call('find', instance, self, self.locator, self.find, instance.w)
+        if elem and (instance.cache_elements or self.shared):
+            elem = cache[self._key] = _cache_entry(instance, self, None, elem)
+        return elem
+
+    def _get(self, instance, owner, context=None):
+        if isinstance(context, LazyElement):
+            context = context.resolve()
+            if not context:
+                return [] if self.multiple else None
+
+        cache = instance._element_cache
+        key = (self, context)
+        if key in cache:
+            return cache[key]
+
+        parent = _unwrap(cache.get((self.parent, context))) if self.parent is not None else None
+        try:
+            if parent is not None:
+                elem = self._find(instance, parent, self.own.find)
+            else:
+                elem = self._find(instance, context or instance.w)
+        except _errors.StaleElementReferenceException:
+            if parent is not None:
+                del cache[(self.parent, context)]
+                return self._get(instance, owner, context)
+            # The context element was cached and has since gone stale
+            context = instance._refresh(context)
+            if not context:
+                raise
+            return self._get(instance, owner, context)
+
+        if elem and (instance.cache_elements or self.shared):
+            elem = cache[key] = _cache_entry(instance, self, context, elem)
+        return elem
+
+    def _find(self, instance, context, find=None):
+        find = find or self.find
+        if _recorder is None:
+            return find(context)
+        return _recorder.call('find', instance, self, self.locator, find, context)
 
     def __set__(self, instance, value):
+        if _recorder is None:
+            self._set(instance, value)
+        else:
+            _recorder.call('set', instance, self, self.locator, self._set, instance, value)
+
+    def _set(self, instance, value):
         if self.has_context:
             raise ValueError("Sorry, the set descriptor doesn't support elements with context.")
-        elem = self.__get__(instance, instance.__class__)
+        try:
+            self._send_keys(self._get(instance, instance.__class__), value)
+        except _errors.StaleElementReferenceException:
+            if not instance._element_cache.pop((self, None), None):
+                raise
+            self._send_keys(self._get(instance, instance.__class__), value)
+
+    def _check_found(self, elem):
         if not elem:
             raise ValueError("Can't set value, element not found")
+
+    def _send_keys(self, elem, value):
+        self._check_found(elem)
         elem.send_keys(value)
 
 
@@ -115,21 +1528,329 @@ class MultiPageElement(PageElement):
                 elem2 = PageElement(id_='foo')
                 elem_with_context = PageElement(tag='tr', context=True)
     """
-    def find(self, context):
+    __slots__ = ()
+    multiple = True
+
+    def _lookup(self, context):
         try:
             return context.find_elements(*self.locator)
-        except NoSuchElementException:
+        except _errors.NoSuchElementException:
             return []
 
-    def __set__(self, instance, value):
-        if self.has_context:
-            raise ValueError("Sorry, the set descriptor doesn't support elements with context.")
-        elems = self.__get__(instance, instance.__class__)
+    def _check_found(self, elems):
         if not elems:
             raise ValueError("Can't set value, no elements found")
+
+    def _send_keys(self, elems, value):
+        self._check_found(elems)
         [elem.send_keys(value) for elem in elems]
 
 
+class LazyElement(object):
+    """ Proxy for the element(s) of a lazy Page Element, which looks them up on
+        first use. Element methods and properties are passed through to the
+        element, and if it has gone stale it's looked up again and the call retried.
+
+        >>> class MyPage(PageObject):
+                table = PageElement(id_='results', lazy=True)
+                rows = MultiPageElement(tag_name='tr', context=True, lazy=True)
+
+        >>> rows = page.rows(page.table)   # No lookups yet
+        >>> len(rows)                      # Looks up the table, then its rows
+        12
+
+    Testing the proxy for truth, comparing or hashing it looks it up. It's false
+    if nothing was found, and equal to the element it finds.
+    Using an attribute of a proxy that finds nothing raises ``NoSuchElementException``.
+    Use ``resolve()`` to get the underlying element, for example to pass to
+    ``execute_script``.
+
+    :param page: `PageObject`
+        Page the element is on
+    :param descriptor: `PageElement`
+        Page Element to look up
+    :param context: `LazyElement` or element
+        Context to look the element up in
+    """
+    def __init__(self, page, descriptor, context=None):
+        self._page = page
+        self._descriptor = descriptor
+        self._context = context
+        self._element = None
+
+    def __repr__(self):
+        state = 'unresolved' if self._element is None else repr(self._element)
+        return '<LazyElement {0}={1} {2}>'.format(self._descriptor.locator[0],
+                                                  self._descriptor.locator[1], state)
+
+    @property
+    def locators(self):
+        """ The chain of ``(by, value)`` locators from the page, or from the first
+            context that isn't lazy, to this element.
+        """
+        chain = self._context.locators if isinstance(self._context, LazyElement) else []
+        return chain + [elem.own.locator for elem in self._descriptor.chain]
+
+    def resolve(self):
+        """ Look the element up, if it hasn't been already. If its lazy contexts
+            haven't been looked up either, the whole chain is found with one
+            script where possible.
+
+        :returns: the element or list of elements, or ``None`` if not found
+        """
+        if self._element is None:
+            page = self._page
+            descriptors = self._descriptor.chain
+            context = self._context
+            while isinstance(context, LazyElement) and context._element is None:
+                descriptors = context._descriptor.chain + descriptors
+                context = context._context
+            if context is not self._context:
+                root = context.resolve() if isinstance(context, LazyElement) else context
+                found = _find_chain(root or page.w, descriptors)
+                if found is not False:
+                    self._element = found
+                    return found
+            self._element = _unwrap(self._descriptor._get(page, page.__class__, self._context))
+        return self._element
+
+    def _reset(self):
+        """ Forget the stale element, and any lazy contexts it was found in.
+        """
+        context = self._context
+        if isinstance(context, LazyElement):
+            resolved = context._element
+            context._reset()
+        else:
+            resolved = context
+        self._page._element_cache.pop((self._descriptor, resolved), None)
+        self._element = None
+
+    def _target(self):
+        elem = self.resolve()
+        if elem is None:
+            raise _errors.NoSuchElementException('Unable to locate element: {0}={1}'.format(
+                *self._descriptor.locator))
+        return elem
+
+    def _call(self, func, *args, **kwargs):
+        try:
+            return func(self._target(), *args, **kwargs)
+        except _errors.StaleElementReferenceException:
+            self._reset()
+            return func(self._target(), *args, **kwargs)
+
+    def __getattr__(self, name):
+        if name.startswith('__'):
+            raise AttributeError(name)
+        value = self._call(getattr, name)
+        if not callable(value):
+            return value
+
+        @functools.wraps(value)
+        def method(*args, **kwargs):
+            return self._call(lambda elem: getattr(elem, name)(*args, **kwargs))
+        return method
+
+    def __bool__(self):
+        return bool(self.resolve())
+
+    __nonzero__ = __bool__
+
+    def __eq__(self, other):
+        if isinstance(other, LazyElement):
+            other = other.resolve()
+        return self.resolve() == other
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __hash__(self):
+        # Equal to the element, so has to hash the same
+        return hash(self.resolve())
+
+    def __len__(self):
+        return len(self._target())
+
+    def __iter__(self):
+        return iter(self._target())
+
+    def __getitem__(self, index):
+        return self._target()[index]
+
+
+class _CachedElement(LazyElement):
+    """ Element kept in a Page Object's element cache, which passes element
+        methods and properties through like a `LazyElement`. If the element has
+        gone stale, as when the page re-renders it, it's dropped from the cache,
+        looked up again and the call retried. Elements of a Multi Page Element
+        are looked up again by their index.
+    """
+    def __init__(self, page, descriptor, context, element, index=None):
+        LazyElement.__init__(self, page, descriptor, context)
+        self._element = element
+        self._index = index
+        # The cache entry this is, or is in for Multi Page Elements
+        self._entry = self
+
+    def resolve(self):
+        if self._element is None:
+            page = self._page
+            found = _unwrap(self._descriptor._get(page, page.__class__, self._context))
+            if self._index is not None:
+                found = found[self._index] if self._index < len(found) else None
+            self._element = found
+        return self._element
+
+    def _reset(self):
+        self._page._drop_stale((self._descriptor, self._context), self._entry)
+        self._element = None
+
+
+def _cache_entry(page, descriptor, context, found):
+    """ Wrap the element, or list of elements, found by a Page Element for the
+        element cache.
+    """
+    if not isinstance(found, list):
+        return _CachedElement(page, descriptor, context, found)
+    entry = [_CachedElement(page, descriptor, context, elem, i) for i, elem in enumerate(found)]
+    for elem in entry:
+        elem._entry = entry
+    return entry
+
+
+def _unwrap(found):
+    """ The element, or list of elements, behind a cache entry or `LazyElement`.
+    """
+    if isinstance(found, list):
+        return [_unwrap(elem) for elem in found]
+    if isinstance(found, LazyElement):
+        return found.resolve()
+    return found
+
+
+class Watch(object):
+    """ Changes to Page Elements, pushed from an observer in the browser. Made
+        by `PageObject.watch`.
+
+        >>> with page.watch('status', 'count') as watch:
+                for event in watch.events(timeout=60):
+                    if event.name == 'status' and event.new == 'Done':
+                        break
+
+    :param page: `PageObject`
+        Page with the Page Elements
+    :param names: `list`
+        Names of the Page Elements to watch
+    :param field: `str`
+        Field of the elements to watch, as for ``PageObject.extract``
+    :param interval: `float`
+        Seconds between polls for events when there weren't any
+
+    ``values`` holds the latest value of each Page Element: the field of its
+    element, ``None`` if it isn't on the page, or a list for Multi Page
+    Elements. If the browser loads another document, the watch moves to it,
+    and any values that differ are reported as events.
+    """
+    def __init__(self, page, names, field='text', interval=0.5):
+        elements = _page_elements(page.__class__)
+        self.queries = []
+        for name in names:
+            elem = elements[name]
+            if elem.has_context:
+                raise ValueError("Sorry, can't watch elements with context: %s" % name)
+            if not elem.script_locator:
+                raise ValueError("Sorry, can't watch %s as its locator can't be used in a script"
+                                 % name)
+            self.queries.append([name, elem.script_locator[0], elem.script_locator[1],
+                                 elem.multiple])
+        self.page = page
+        self.field = field
+        self.interval = interval
+        self.values = {}
+        self.token = None
+
+    def __repr__(self):
+        return '<Watch {0}>'.format(', '.join(q[0] for q in self.queries))
+
+    def _install_args(self):
+        self.token = _token()
+        return _WATCH_SCRIPT, self.token, self.queries, self.field
+
+    def _installed(self, values):
+        events = [WatchEvent(q[0], self.values[q[0]], value, time.time())
+                  for q, value in zip(self.queries, values)
+                  if q[0] in self.values and self.values[q[0]] != value]
+        self.values = dict((q[0], value) for q, value in zip(self.queries, values))
+        return events
+
+    def _drained(self, events):
+        events = [WatchEvent(name, old, new, ms / 1000.0) for name, old, new, ms in events]
+        for event in events:
+            self.values[event.name] = event.new
+        return events
+
+    def start(self):
+        """ Install the observer in the browser, if it isn't already.
+
+        :returns: the watch
+        """
+        if self.token is None:
+            self._installed(self.page.w.execute_script(*self._install_args()))
+        return self
+
+    def poll(self):
+        """ Fetch the changes since the last poll, with one call to the browser.
+
+        :returns: `list` of `WatchEvent`
+        """
+        if self.token is None:
+            self.start()
+        events = self.page.w.execute_script(_DRAIN_SCRIPT, self.token, False)
+        if events is None:
+            # The browser has loaded another document, so watch that instead
+            return self._installed(self.page.w.execute_script(*self._install_args()))
+        return self._drained(events)
+
+    def events(self, timeout=None):
+        """ Generate changes as they happen, polling every ``interval`` seconds
+            while there aren't any.
+
+        :param timeout: `float`
+            Seconds after which to stop, or ``None`` to go on until the
+            generator is closed
+        """
+        deadline = None if timeout is None else time.time() + timeout
+        while True:
+            events = self.poll()
+            for event in events:
+                yield event
+            if deadline is not None and time.time() >= deadline:
+                return
+            if not events:
+                time.sleep(self.interval if deadline is None else
+                           max(0, min(self.interval, deadline - time.time())))
+
+    def __iter__(self):
+        return self.events()
+
+    def stop(self):
+        """ Remove the observer from the browser.
+        """
+        if self.token is not None:
+            try:
+                self.page.w.execute_script(_DRAIN_SCRIPT, self.token, True)
+            except _errors.WebDriverException:
+                pass
+            self.token = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+
 # Backwards compatibility with previous versions that used factory methods
 page_element = PageElement
 multi_page_element = MultiPageElement
@@ -0,0 +1,498 @@
+""" Asyncio versions of the Page Object classes.
+
+Page Elements on an `AsyncPageObject` return awaitables, so a single event loop
+can drive many browser sessions at once:
+
+    >>> from page_objects.aio import AsyncPageObject, AsyncPageElement, AsyncWebDriver
+    >>> class LoginPage(AsyncPageObject):
+            username = AsyncPageElement(id_='username')
+            login = AsyncPageElement(css='input[type="submit"]')
+
+    >>> driver = await AsyncWebDriver.start('http://localhost:4444', {'browserName': 'firefox'})
+    >>> page = LoginPage(driver, root_uri='http://example.com')
+    >>> await page.get('/login')
+    >>> await page.set('username', 'secret')
+    >>> await (await page.login).click()
+
+`AsyncWebDriver` speaks the W3C WebDriver protocol through a transport, which
+defaults to a small HTTP client built on asyncio streams. Any object with
+``request`` and ``close`` coroutines can be used in its place.
+"""
+import asyncio
+import json
+import time
+from urllib.parse import urlsplit
+
+from . import (PageElement, Watch, _DRAIN_SCRIPT, _POLL_INTERVAL, _WAIT_SCRIPT, _PageObjectType,
+               _page_elements, _script_locator)
+from .exceptions import (NoSuchElementException, StaleElementReferenceException, TimeoutException,
+                         WebDriverException)
+
+# Key for element references in the W3C protocol
+_ELEMENT_KEY = 'element-6066-11e4-a52e-4f735466cecf'
+
+# Map W3C error codes to the exceptions raised by the sync webdriver
+_ERRORS = {'no such element': NoSuchElementException,
+           'stale element reference': StaleElementReferenceException,
+           'timeout': TimeoutException,
+           'script timeout': TimeoutException,
+           }
+
+
+class HTTPTransport(object):
+    """ Minimal HTTP/1.1 client for talking to a WebDriver server. Requests are
+        sent one at a time over a single keep-alive connection.
+
+    :param url: `str`
+        URL of the WebDriver server, eg ``http://localhost:4444``, or an
+        ``https`` URL to connect with TLS
+    """
+    def __init__(self, url):
+        parts = urlsplit(url)
+        if parts.scheme not in ('http', 'https'):
+            raise ValueError("Sorry, can only connect to http or https WebDriver URLs: %s" % url)
+        self.host = parts.hostname
+        self.tls = parts.scheme == 'https'
+        self.port = parts.port or (443 if self.tls else 80)
+        self.prefix = parts.path.rstrip('/')
+        self._conn = None
+        # Created on first use, in the running loop
+        self._lock = None
+
+    def _locked(self):
+        # Before Python 3.10 locks are bound to the current loop when they're
+        # made, so one made outside of asyncio.run() fails inside it
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        return self._lock
+
+    async def request(self, method, path, body=None):
+        """ Send a request and return the decoded JSON response.
+        """
+        payload = json.dumps(body).encode('utf-8') if body is not None else b''
+        head = ('{0} {1}{2} HTTP/1.1\r\n'
+                'Host: {3}:{4}\r\n'
+                'Content-Type: application/json; charset=utf-8\r\n'
+                'Content-Length: {5}\r\n'
+                'Connection: keep-alive\r\n\r\n').format(method, self.prefix, path, self.host,
+                                                          self.port, len(payload))
+        async with self._locked():
+            for attempt in (0, 1):
+                if self._conn is None:
+                    self._conn = await asyncio.open_connection(self.host, self.port,
+                                                               ssl=self.tls or None)
+                reader, writer = self._conn
+                try:
+                    writer.write(head.encode('latin-1') + payload)
+                    await writer.drain()
+                    status, headers, data = await self._read_response(reader)
+                    break
+                except (ConnectionError, asyncio.IncompleteReadError):
+                    # The server may have dropped an idle keep-alive connection
+                    await self._disconnect()
+                    if attempt:
+                        raise
+            if headers.get('connection', '').lower() == 'close':
+                await self._disconnect()
+        if not data:
+            return {'value': None}
+        return json.loads(data.decode('utf-8'))
+
+    async def _read_response(self, reader):
+        status = int((await reader.readline()).split()[1])
+        headers = {}
+        while True:
+            line = (await reader.readline()).decode('latin-1').strip()
+            if not line:
+                break
+            name, _, value = line.partition(':')
+            headers[name.strip().lower()] = value.strip()
+
+        if headers.get('transfer-encoding', '').lower() == 'chunked':
+            chunks = []
+            while True:
+                size = int((await reader.readline()).split(b';')[0], 16)
+                chunk = await reader.readexactly(size + 2)
+                if not size:
+                    break
+                chunks.append(chunk[:-2])
+            data = b''.join(chunks)
+        else:
+            data = await reader.readexactly(int(headers.get('content-length', 0)))
+        return status, headers, data
+
+    async def _disconnect(self):
+        if self._conn is not None:
+            writer = self._conn[1]
+            self._conn = None
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+    async def close(self):
+        async with self._locked():
+            await self._disconnect()
+
+
+class _Commands(object):
+    """ Shared helpers for the driver and its elements.
+    """
+    def _wrap(self, value):
+        if isinstance(value, list):
+            return [self._wrap(v) for v in value]
+        if isinstance(value, dict):
+            if _ELEMENT_KEY in value:
+                return AsyncWebElement(self._driver, value[_ELEMENT_KEY])
+            return dict((k, self._wrap(v)) for k, v in value.items())
+        return value
+
+    def _unwrap(self, value):
+        if isinstance(value, AsyncWebElement):
+            return {_ELEMENT_KEY: value.id}
+        if isinstance(value, (list, tuple)):
+            return [self._unwrap(v) for v in value]
+        if isinstance(value, dict):
+            return dict((k, self._unwrap(v)) for k, v in value.items())
+        return value
+
+    def _locator(self, by, value):
+        # The W3C protocol only has CSS, XPath, link text and tag name strategies
+        using, value = _script_locator(by, value) or (by, value)
+        return {'using': using, 'value': value}
+
+    async def find_element(self, by, value):
+        return self._wrap(await self._driver.execute('POST', self._path + '/element',
+                                                     self._locator(by, value)))
+
+    async def find_elements(self, by, value):
+        return self._wrap(await self._driver.execute('POST', self._path + '/elements',
+                                                     self._locator(by, value)))
+
+
+class AsyncWebDriver(_Commands):
+    """ Asyncio WebDriver client for an existing session.
+
+    :param transport: `HTTPTransport` or `str`
+        Transport to send commands through, or the URL of the WebDriver server
+    :param session_id: `str`
+        ID of the WebDriver session
+    """
+    def __init__(self, transport, session_id):
+        if isinstance(transport, str):
+            transport = HTTPTransport(transport)
+        self.transport = transport
+        self.session_id = session_id
+        self._driver = self
+        self._path = '/session/{0}'.format(session_id)
+
+    @classmethod
+    async def start(cls, transport, capabilities=None):
+        """ Create a new session on the WebDriver server.
+
+        :param capabilities: `dict`
+            Capabilities the session must match
+        """
+        if isinstance(transport, str):
+            transport = HTTPTransport(transport)
+        body = {'capabilities': {'alwaysMatch': capabilities or {}}}
+        res = cls._check(await transport.request('POST', '/session', body))
+        return cls(transport, res['sessionId'])
+
+    @staticmethod
+    def _check(response):
+        value = response.get('value')
+        if isinstance(value, dict) and value.get('error'):
+            exc = _ERRORS.get(value['error'], WebDriverException)
+            raise exc(value.get('message'), stacktrace=value.get('stacktrace'))
+        return value
+
+    async def execute(self, method, path, body=None):
+        """ Send a command to the WebDriver server and return its value.
+        """
+        return self._check(await self.transport.request(method, path, body))
+
+    async def get(self, url):
+        await self.execute('POST', self._path + '/url', {'url': url})
+
+    @property
+    async def current_url(self):
+        return await self.execute('GET', self._path + '/url')
+
+    @property
+    async def title(self):
+        return await self.execute('GET', self._path + '/title')
+
+    async def execute_script(self, script, *args):
+        return self._wrap(await self.execute('POST', self._path + '/execute/sync',
+                                             {'script': script, 'args': self._unwrap(args)}))
+
+    async def execute_async_script(self, script, *args):
+        return self._wrap(await self.execute('POST', self._path + '/execute/async',
+                                             {'script': script, 'args': self._unwrap(args)}))
+
+    async def quit(self):
+        try:
+            await self.execute('DELETE', self._path)
+        finally:
+            await self.transport.close()
+
+
+class AsyncWebElement(_Commands):
+    """ Element reference returned by `AsyncWebDriver`.
+    """
+    def __init__(self, driver, id_):
+        self._driver = driver
+        self.id = id_
+        self._path = '{0}/element/{1}'.format(driver._path, id_)
+
+    def __eq__(self, other):
+        return isinstance(other, AsyncWebElement) and self.id == other.id
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __hash__(self):
+        return hash(self.id)
+
+    def __repr__(self):
+        return '<{0} id={1!r}>'.format(self.__class__.__name__, self.id)
+
+    @property
+    async def text(self):
+        return await self._driver.execute('GET', self._path + '/text')
+
+    @property
+    async def tag_name(self):
+        return await self._driver.execute('GET', self._path + '/name')
+
+    async def get_attribute(self, name):
+        return await self._driver.execute('GET', self._path + '/attribute/' + name)
+
+    async def get_property(self, name):
+        return await self._driver.execute('GET', self._path + '/property/' + name)
+
+    async def is_enabled(self):
+        return await self._driver.execute('GET', self._path + '/enabled')
+
+    async def is_displayed(self):
+        return await self._driver.execute('GET', self._path + '/displayed')
+
+    async def click(self):
+        await self._driver.execute('POST', self._path + '/click', {})
+
+    async def clear(self):
+        await self._driver.execute('POST', self._path + '/clear', {})
+
+    async def send_keys(self, value):
+        await self._driver.execute('POST', self._path + '/value', {'text': str(value)})
+
+
+class AsyncPageObject(metaclass=_PageObjectType):
+    """ Page Object for use with asyncio.
+
+    :param webdriver: `AsyncWebDriver`
+        Asyncio webdriver instance
+    :param root_uri: `str`
+        Root URI to base any calls to the ``AsyncPageObject.get`` method. If not
+        defined in the constructor it will try and look it from the webdriver object.
+    """
+    def __init__(self, webdriver, root_uri=None):
+        self.w = webdriver
+        self.root_uri = root_uri if root_uri else getattr(self.w, 'root_uri', None)
+
+    async def get(self, uri):
+        """
+        :param uri:  URI to GET, based off of the root_uri attribute.
+        """
+        root_uri = self.root_uri or ''
+        await self.w.get(root_uri + uri)
+
+    async def set(self, name, value):
+        """ Send keys to a Page Element, the equivalent of setting the attribute
+            on a sync Page Object.
+
+        :param name: `str`
+            Name of the Page Element
+        :param value: `str`
+            Text to send
+        """
+        elem = _page_elements(self.__class__).get(name)
+        if not isinstance(elem, AsyncPageElement):
+            raise AttributeError(name)
+        await elem.set(self, value)
+
+    def watch(self, *names, field='text', interval=0.5):
+        """ Watch Page Elements for changes with an observer in the browser,
+            like ``PageObject.watch``. The observer is installed when the watch
+            is started or first polled.
+
+        :returns: `AsyncWatch`
+        """
+        return AsyncWatch(self, names, field, interval)
+
+
+class AsyncWatch(Watch):
+    """ `page_objects.Watch` for an `AsyncPageObject`, with coroutine methods
+        and an async iterator of the events.
+
+        >>> async with page.watch('status', 'count') as watch:
+                async for event in watch:
+                    print(event.name, event.old, event.new)
+    """
+    async def start(self):
+        if self.token is None:
+            self._installed(await self.page.w.execute_script(*self._install_args()))
+        return self
+
+    async def poll(self):
+        if self.token is None:
+            await self.start()
+        events = await self.page.w.execute_script(_DRAIN_SCRIPT, self.token, False)
+        if events is None:
+            return self._installed(await self.page.w.execute_script(*self._install_args()))
+        return self._drained(events)
+
+    async def events(self, timeout=None):
+        deadline = None if timeout is None else time.time() + timeout
+        while True:
+            events = await self.poll()
+            for event in events:
+                yield event
+            if deadline is not None and time.time() >= deadline:
+                return
+            if not events:
+                await asyncio.sleep(self.interval if deadline is None else
+                                    max(0, min(self.interval, deadline - time.time())))
+
+    def __iter__(self):
+        raise TypeError("Please use `async for` with async watches")
+
+    def __aiter__(self):
+        return self.events()
+
+    async def stop(self):
+        if self.token is not None:
+            try:
+                await self.page.w.execute_script(_DRAIN_SCRIPT, self.token, True)
+            except WebDriverException:
+                pass
+            self.token = None
+
+    async def __aenter__(self):
+        return await self.start()
+
+    async def __aexit__(self, *exc_info):
+        await self.stop()
+
+
+class AsyncPageElement(PageElement):
+    """ Page Element descriptor for `AsyncPageObject`. Takes the same arguments
+        as `PageElement`, but accessing it returns an awaitable.
+
+        >>> elem = await page.elem1
+        >>> child = await page.elem_with_context(elem)
+    """
+    __slots__ = ()
+
+    def __init__(self, context=False, wait=None, until='present', lazy=False, parent=None,
+                 **kwargs):
+        if lazy:
+            raise ValueError("Sorry, async Page Elements can't be lazy")
+        super().__init__(context=context, wait=wait, until=until, parent=parent, **kwargs)
+
+    async def find(self, context):
+        if self.parent is not None and not self.compiled:
+            parent = await self.parent.find(context)
+            if not parent:
+                return [] if self.multiple else None
+            return await self.own.find(parent)
+        if self.wait:
+            return await self._wait(context)
+        return await self._lookup(context)
+
+    async def _lookup(self, context):
+        try:
+            return await context.find_element(*self.locator)
+        except NoSuchElementException:
+            return None
+
+    async def _wait(self, context):
+        deadline = time.time() + self.wait
+        if self.script_locator:
+            driver = context._driver
+            try:
+                found = await driver.execute_async_script(_WAIT_SCRIPT,
+                                                          *self._wait_args(context, driver))
+            except StaleElementReferenceException:
+                raise
+            except WebDriverException:
+                found = False
+            if found is not False:
+                return found
+        while True:
+            found = await self._lookup(context)
+            try:
+                if await self._ready(found):
+                    return found
+            except StaleElementReferenceException:
+                pass
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                return [] if self.multiple else None
+            await asyncio.sleep(min(_POLL_INTERVAL, remaining))
+
+    async def _ready(self, found):
+        elems = found if self.multiple else [found] if found else []
+        for elem in elems:
+            if self.until == 'visible':
+                ready = await elem.is_displayed()
+            elif self.until == 'enabled':
+                ready = await elem.is_enabled()
+            else:
+                ready = True
+            if ready:
+                return True
+        return False
+
+    def __get__(self, instance, owner, context=None):
+        if not instance:
+            return None
+
+        if not context and self.has_context:
+            return lambda ctx: self.__get__(instance, owner, context=ctx)
+
+        return self.find(context or instance.w)
+
+    def __set__(self, instance, value):
+        raise AttributeError("Sorry, async Page Elements are set with "
+                             "`await page.set(name, value)`")
+
+    async def set(self, instance, value):
+        if self.has_context:
+            raise ValueError("Sorry, the set descriptor doesn't support elements with context.")
+        elem = await self.find(instance.w)
+        self._check_found(elem)
+        await elem.send_keys(value)
+
+
+class AsyncMultiPageElement(AsyncPageElement):
+    """ Like `AsyncPageElement` but returns multiple results.
+    """
+    __slots__ = ()
+    multiple = True
+
+    async def _lookup(self, context):
+        try:
+            return await context.find_elements(*self.locator)
+        except NoSuchElementException:
+            return []
+
+    async def set(self, instance, value):
+        if self.has_context:
+            raise ValueError("Sorry, the set descriptor doesn't support elements with context.")
+        elems = await self.find(instance.w)
+        if not elems:
+            raise ValueError("Can't set value, no elements found")
+        await asyncio.gather(*[elem.send_keys(value) for elem in elems])
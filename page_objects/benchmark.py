@@ -0,0 +1,458 @@
+""" Benchmarks of Page Object overhead and round-trips, using `page_objects.testing.FakeWebDriver`.
+
+    $ python -m page_objects.benchmark --rows 5000 --latency 0.001
+    name               ops  commands  budget  per_op_ms  overhead_ms
+    descriptor         10   1.00      1       1.0927     0.0927
+    ...
+
+Each benchmark runs an operation against a generated page and counts the
+commands sent to the driver. Every benchmark has a budget of commands per
+operation; the command exits with a non-zero status if any goes over, so it
+can run in CI to catch round-trip regressions. With a ``latency``, the
+overhead is the time spent per operation on top of the simulated round-trips.
+
+    $ python -m page_objects.benchmark --imports
+    module                 import_ms  selenium
+    page_objects           3.1024     -
+    ...
+
+With ``--imports``, it times importing the package's modules in new
+interpreters instead, and checks they don't load more of Selenium than they're
+allowed to: none of it for the core package, so Page Objects for other webdriver
+backends start quickly.
+"""
+import argparse
+import os
+import subprocess
+import sys
+import timeit
+
+from page_objects import Component, PageObject, PageElement, MultiPageElement
+from page_objects.testing import FakeWebDriver, make_page
+
+# name -> `Benchmark`, in the order they were defined
+BENCHMARKS = {}
+_ORDER = []
+
+
+class Benchmark(object):
+    """ An operation to time against a page.
+
+    :param name: `str`
+        Benchmark name
+    :param func: `callable`
+        Called with the page for every operation
+    :param budget: `int`
+        Maximum commands per operation, or a callable returning it for the page
+    :param setup: `callable`
+        Called with the page once before timing, the commands it sends aren't counted
+    :param cache: `bool`
+        Enable the element cache on the page
+    """
+    def __init__(self, name, func, budget, setup=None, cache=False):
+        self.name = name
+        self.func = func
+        self.budget = budget
+        self.setup = setup
+        self.cache = cache
+
+    def run(self, page, repeat):
+        """ :returns: `Result` of calling the benchmark ``repeat`` times on the page
+        """
+        if self.setup is not None:
+            self.setup(page)
+        page.w.reset_commands()
+        started = timeit.default_timer()
+        for _ in range(repeat):
+            self.func(page)
+        duration = timeit.default_timer() - started
+        budget = self.budget(page) if callable(self.budget) else self.budget
+        return Result(self.name, repeat, page.w.command_count, duration, budget, page.w.latency)
+
+
+def benchmark(budget, setup=None, cache=False):
+    """ Decorator registering a function as a `Benchmark` with the function's name.
+    """
+    def decorator(func):
+        bench = Benchmark(func.__name__, func, budget, setup, cache)
+        BENCHMARKS[bench.name] = bench
+        _ORDER.append(bench.name)
+        return func
+    return decorator
+
+
+class Result(object):
+    """ Commands sent and time taken by a benchmark. Times are in seconds.
+    """
+    columns = ('name', 'ops', 'commands', 'budget', 'per_op_ms', 'overhead_ms')
+
+    def __init__(self, name, ops, commands, seconds, budget, latency=0.0):
+        self.name = name
+        self.ops = ops
+        self.commands = commands
+        self.seconds = seconds
+        self.budget = budget
+        self.latency = latency
+
+    def __repr__(self):
+        return '<Result {0} {1:.2f} commands/op>'.format(self.name, self.commands_per_op)
+
+    @property
+    def commands_per_op(self):
+        return float(self.commands) / self.ops
+
+    @property
+    def per_op(self):
+        return self.seconds / self.ops
+
+    @property
+    def overhead_per_op(self):
+        """ Time per operation not spent waiting on simulated round-trips.
+        """
+        return self.per_op - self.commands_per_op * self.latency
+
+    @property
+    def over_budget(self):
+        return self.commands_per_op > self.budget
+
+    def row(self):
+        return {'name': self.name,
+                'ops': self.ops,
+                'commands': self.commands_per_op,
+                'budget': self.budget,
+                'per_op_ms': self.per_op * 1000,
+                'overhead_ms': self.overhead_per_op * 1000,
+                }
+
+
+def report(results):
+    """ :returns: `str` table of results
+    """
+    columns = type(results[0]).columns if results else Result.columns
+    lines = [columns]
+    for result in results:
+        row = result.row()
+        lines.append(tuple('{0:.2f}'.format(row[c]) if c == 'commands' else
+                           '{0:.4f}'.format(row[c]) if isinstance(row[c], float) else
+                           str(row[c]) for c in columns))
+    widths = [max(len(line[i]) for line in lines) for i in range(len(columns))]
+    return '\n'.join('  '.join(cell.ljust(w) for cell, w in zip(line, widths)).rstrip()
+                     for line in lines)
+
+
+def page_class(fields=20):
+    """ Make a Page Object class for pages from `make_page`, with ``field0`` ...
+        Page Elements for each of the form fields.
+    """
+    form = PageElement(id_='form')
+    label = PageElement(css='label:nth-child(2)', parent=form)
+    attrs = {'header': PageElement(id_='header'),
+             'status': PageElement(css='#header .status'),
+             'rows': MultiPageElement(css='tr.row'),
+             'names': MultiPageElement(xpath='//tr/td[1]'),
+             'cell': PageElement(css='td.value', context=True),
+             'link': PageElement(tag_name='a', context=True),
+             'submit': PageElement(id_='submit'),
+             'missing': PageElement(id_='missing'),
+             'footer': PageElement(css='#footer', wait=1, until='visible'),
+             'table': PageElement(id_='rows', lazy=True),
+             'form': form,
+             'label': label,
+             'label_input': PageElement(tag_name='input', parent=label),
+             }
+    for i in range(fields):
+        attrs['field{0}'.format(i)] = PageElement(name='field{0}'.format(i))
+    cls = type('BenchmarkPage', (PageObject,), attrs)
+    cls.fields = ['field{0}'.format(i) for i in range(fields)]
+    return cls
+
+
+class _Layout(Component):
+    layout_header = PageElement(id_='header')
+
+
+class _LayoutPage(_Layout, PageObject):
+    pass
+
+
+# Benchmarks ------------------------------------------------------------------
+
+@benchmark(budget=1)
+def descriptor(page):
+    page.header
+
+
+@benchmark(budget=0, setup=descriptor, cache=True)
+def cached_descriptor(page):
+    page.header
+
+
+@benchmark(budget=0)
+def lazy(page):
+    page.table
+
+
+def _find_layout(page):
+    _LayoutPage(page.w).layout_header
+
+
+@benchmark(budget=0, setup=_find_layout)
+def component(page):
+    # A new Page Object on the same document, as when a flow moves between them
+    _LayoutPage(page.w).layout_header
+
+
+@benchmark(budget=1)
+def nested_css(page):
+    page.status
+
+
+def _last_row(page):
+    page.row = page.rows[-1]
+
+
+@benchmark(budget=1, setup=_last_row)
+def context(page):
+    page.cell(page.row)
+
+
+@benchmark(budget=2)
+def context_lookup(page):
+    page.link(page.rows[0])
+
+
+@benchmark(budget=1)
+def wait(page):
+    page.footer
+
+
+@benchmark(budget=1)
+def compound(page):
+    page.label_input
+
+
+@benchmark(budget=1)
+def absent(page):
+    page.has('missing')
+
+
+@benchmark(budget=1)
+def multi_css(page):
+    page.rows
+
+
+@benchmark(budget=1)
+def multi_xpath(page):
+    page.names
+
+
+@benchmark(budget=1)
+def iterate(page):
+    list(page.iterate('rows', batch=50, limit=50))
+
+
+@benchmark(budget=1)
+def extract(page):
+    page.extract('rows', ['text', 'data-id'])
+
+
+def _load(page):
+    page.get('/page')
+
+
+@benchmark(budget=1, setup=_load)
+def navigate(page):
+    page.get('/page', reload=False)
+
+
+def _watch(page):
+    page.watcher = page.watch('header', 'status', 'submit')
+
+
+@benchmark(budget=1, setup=_watch)
+def watch(page):
+    page.watcher.poll()
+
+
+@benchmark(budget=1)
+def snapshot(page):
+    snap = page.snapshot()
+    snap.header.text
+    [row.get_attribute('data-id') for row in snap.rows]
+
+
+@benchmark(budget=1)
+def resolve(page):
+    page.invalidate()
+    page.resolve('header', 'rows', 'submit')
+
+
+@benchmark(budget=lambda page: 2 * len(page.fields))
+def set_fields(page):
+    for name in page.fields:
+        setattr(page, name, 'x')
+
+
+@benchmark(budget=1)
+def fill(page):
+    page.invalidate()
+    page.fill(**dict((name, 'x') for name in page.fields))
+
+
+# Imports ---------------------------------------------------------------------
+
+# Modules timed by ``--imports``, with the Selenium packages each may load
+IMPORTS = (('page_objects', ()),
+           ('page_objects.replay', ('selenium.common',)),
+           ('page_objects.snapshot', ('selenium.common',)),
+           ('page_objects.testing', ('selenium.common',)),
+           )
+
+# Run in a new interpreter to time an import, printing the seconds it took and
+# the Selenium modules it loaded
+_IMPORT_SCRIPT = """
+import sys, timeit
+started = timeit.default_timer()
+__import__(sys.argv[1])
+print(timeit.default_timer() - started)
+print(' '.join(sorted(m for m in sys.modules if m.split('.')[0] == 'selenium')))
+"""
+
+
+class ImportResult(object):
+    """ Time taken to import a module, and the Selenium modules it loaded.
+
+    :param module: `str`
+        Name of the module
+    :param seconds: `float`
+        Fastest time to import it
+    :param selenium: `list`
+        Names of the Selenium modules loaded by importing it
+    :param allowed: `tuple`
+        Selenium packages the module may load
+    """
+    columns = ('module', 'import_ms', 'selenium')
+
+    def __init__(self, module, seconds, selenium, allowed=()):
+        self.module = module
+        self.seconds = seconds
+        self.selenium = selenium
+        self.allowed = allowed
+
+    def __repr__(self):
+        return '<ImportResult {0} {1:.1f}ms>'.format(self.module, self.seconds * 1000)
+
+    @property
+    def disallowed(self):
+        """ Selenium modules loaded that aren't in, or parents of, the allowed packages.
+        """
+        return [m for m in self.selenium
+                if not any(m == a or m.startswith(a + '.') or a.startswith(m + '.')
+                           for a in self.allowed)]
+
+    @property
+    def over_budget(self):
+        return bool(self.disallowed)
+
+    def row(self):
+        return {'module': self.module,
+                'import_ms': self.seconds * 1000,
+                'selenium': ','.join(self.selenium) or '-',
+                }
+
+
+def import_time(module='page_objects', repeat=3, allowed=()):
+    """ Time importing a module in new interpreters.
+
+    :param module: `str`
+        Name of the module to import
+    :param repeat: `int`
+        Number of interpreters to time it in
+    :param allowed: `tuple`
+        Selenium packages the module may load
+    :returns: `ImportResult` with the fastest time
+    """
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join([root] + [p for p in [env.get('PYTHONPATH')] if p])
+    times = []
+    for _ in range(repeat):
+        out = subprocess.check_output([sys.executable, '-c', _IMPORT_SCRIPT, module], env=env)
+        lines = out.decode('ascii').splitlines()
+        times.append(float(lines[0]))
+    return ImportResult(module, min(times), lines[1].split() if len(lines) > 1 else [],
+                        allowed)
+
+
+def run_imports(repeat=3):
+    """ :returns: `list` of `ImportResult` for each of the ``IMPORTS``
+    """
+    return [import_time(module, repeat, allowed) for module, allowed in IMPORTS]
+
+
+def run(names=None, rows=1000, fields=20, latency=0.0, repeat=10, cache=False):
+    """ Run benchmarks, each on a new driver.
+
+    :param names: `list`
+        Names of the benchmarks to run, defaults to all of them
+    :param rows: `int`
+        Rows in the page's table, see `make_page`
+    :param fields: `int`
+        Fields in the page's form
+    :param latency: `float`
+        Seconds of latency added to each command
+    :param repeat: `int`
+        Number of times to run each benchmark
+    :param cache: `bool`
+        Enable the element cache on the pages
+    :returns: `list` of `Result`
+    """
+    html = make_page(rows=rows, fields=fields)
+    cls = page_class(fields)
+    results = []
+    for name in names or _ORDER:
+        bench = BENCHMARKS[name]
+        page = cls(FakeWebDriver(html, latency=latency), cache=cache or bench.cache)
+        results.append(bench.run(page, repeat))
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark Page Objects against a fake webdriver')
+    parser.add_argument('names', nargs='*', metavar='NAME', help='benchmarks to run')
+    parser.add_argument('--rows', type=int, default=1000, help='rows in the page table')
+    parser.add_argument('--fields', type=int, default=20, help='fields in the page form')
+    parser.add_argument('--latency', type=float, default=0.0, help='seconds per command')
+    parser.add_argument('--repeat', type=int, default=10, help='runs of each benchmark')
+    parser.add_argument('--list', action='store_true', help='list the benchmarks and exit')
+    parser.add_argument('--imports', action='store_true',
+                        help='time importing the modules instead')
+    args = parser.parse_args(argv)
+
+    if args.list:
+        print('\n'.join(_ORDER))
+        return 0
+    if args.imports:
+        results = run_imports(repeat=args.repeat)
+        print(report(results))
+        over = [r.module for r in results if r.over_budget]
+        if over:
+            print('\nImports Selenium: {0}'.format(', '.join(over)))
+            return 1
+        return 0
+    unknown = [n for n in args.names if n not in BENCHMARKS]
+    if unknown:
+        parser.error('unknown benchmarks: {0}'.format(', '.join(unknown)))
+
+    results = run(args.names, rows=args.rows, fields=args.fields, latency=args.latency,
+                  repeat=args.repeat)
+    print(report(results))
+    over = [r.name for r in results if r.over_budget]
+    if over:
+        print('\nOver budget: {0}'.format(', '.join(over)))
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,203 @@
+""" Checkpoints of browser state, to restore instead of running setup flows again.
+
+    >>> from page_objects.checkpoint import CheckpointStore
+    >>> checkpoints = CheckpointStore(ttl=600)
+    >>> def login(page, user):
+            page.get('/login')
+            page.fill(username=user, password='squirrel')
+            page.login.click()
+
+    >>> page = LoginPage(driver, root_uri='http://example.com')
+    >>> checkpoints.restore_or_run(('login', 'alice'), page, login, 'alice')
+
+The first call runs the flow and saves the browser's cookies, local and session
+storage and URL under the key. Later calls, on the same or any other webdriver,
+load that state into the browser instead. Stores are safe to share between the
+threads of a `page_objects.pool.SessionPool`.
+"""
+import threading
+import time
+
+try:
+    from urllib.parse import urlsplit
+except ImportError:
+    from urlparse import urlsplit
+
+# Path loaded to set cookies on when the browser isn't on the checkpoint's origin.
+# Its response doesn't matter, so a small one avoids loading a full page.
+_LANDING_PATH = '/favicon.ico'
+
+# Returns [URL, local storage, session storage] of the current document
+_SAVE_SCRIPT = """
+var dump = function(storage) {
+    var items = {};
+    for (var i = 0; i < storage.length; i++) {
+        var key = storage.key(i);
+        items[key] = storage.getItem(key);
+    }
+    return items;
+};
+try {
+    return [document.URL, dump(window.localStorage), dump(window.sessionStorage)];
+} catch (e) {
+    return [document.URL, {}, {}];
+}
+"""
+
+# Replaces local and session storage with the items in arguments[0] and arguments[1]
+_RESTORE_SCRIPT = """
+var fill = function(storage, items) {
+    storage.clear();
+    for (var key in items) {
+        storage.setItem(key, items[key]);
+    }
+};
+fill(window.localStorage, arguments[0]);
+fill(window.sessionStorage, arguments[1]);
+"""
+
+
+def _origin(url):
+    parts = urlsplit(url)
+    return parts.scheme, parts.netloc
+
+
+class Checkpoint(object):
+    """ Browser state saved by a `CheckpointStore`.
+
+    :param url: `str`
+        URL the browser was on
+    :param cookies: `list`
+        Cookies of the URL's domain, as returned by ``get_cookies``
+    :param local_storage: `dict`
+        Local storage items of the URL's origin
+    :param session_storage: `dict`
+        Session storage items of the URL's origin
+    :param ttl: `float`
+        Seconds until the checkpoint expires, or ``None`` for never
+    """
+    def __init__(self, url, cookies, local_storage, session_storage, ttl=None):
+        self.url = url
+        self.cookies = cookies
+        self.local_storage = local_storage
+        self.session_storage = session_storage
+        self.ttl = ttl
+        self.created = time.time()
+
+    def __repr__(self):
+        return '<Checkpoint {0} cookies={1}>'.format(self.url, len(self.cookies))
+
+    @property
+    def expired(self):
+        return self.ttl is not None and time.time() - self.created >= self.ttl
+
+
+class CheckpointStore(object):
+    """ Checkpoints of browser state by key.
+
+    :param ttl: `float`
+        Seconds checkpoints are kept for by default, or ``None`` for as long as
+        the store is
+    """
+    def __init__(self, ttl=None):
+        self.ttl = ttl
+        self._checkpoints = {}
+        self._lock = threading.Lock()
+
+    def __contains__(self, key):
+        return self.get(key) is not None
+
+    def __len__(self):
+        with self._lock:
+            return len(self._checkpoints)
+
+    def get(self, key):
+        """ :returns: the `Checkpoint` saved under the key, or ``None`` if there
+            isn't one or it's expired
+        """
+        with self._lock:
+            checkpoint = self._checkpoints.get(key)
+            if checkpoint is not None and checkpoint.expired:
+                del self._checkpoints[key]
+                return None
+            return checkpoint
+
+    def save(self, key, page, ttl=None):
+        """ Save the state of a Page Object's browser under a key, replacing any
+            checkpoint already saved under it.
+
+        :param key: Any hashable key, such as ``('login', user)``
+        :param page: `PageObject`
+            Page Object whose webdriver to save the state of
+        :param ttl: `float`
+            Seconds to keep the checkpoint for, instead of the store's ``ttl``
+        :returns: the `Checkpoint`
+        """
+        driver = page.w
+        url, local_storage, session_storage = driver.execute_script(_SAVE_SCRIPT)
+        checkpoint = Checkpoint(url, driver.get_cookies(), local_storage, session_storage,
+                                self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._checkpoints[key] = checkpoint
+        return checkpoint
+
+    def restore(self, key, page, navigate=True, landing=_LANDING_PATH):
+        """ Load the state saved under a key into a Page Object's browser,
+            replacing its cookies and storage for the checkpoint's origin.
+
+        :param key: Key the checkpoint was saved under
+        :param page: `PageObject`
+            Page Object whose webdriver to restore the state to
+        :param navigate: `bool`
+            Load the checkpoint's URL afterwards
+        :param landing: `str`
+            Path on the checkpoint's origin to load first if the browser is
+            elsewhere, as cookies can only be set for the current domain
+        :returns: `bool`, whether there was a checkpoint to restore
+        """
+        checkpoint = self.get(key)
+        if checkpoint is None:
+            return False
+
+        driver = page.w
+        if _origin(driver.current_url) != _origin(checkpoint.url):
+            scheme, netloc = _origin(checkpoint.url)
+            driver.get('%s://%s%s' % (scheme, netloc, landing))
+        driver.delete_all_cookies()
+        for cookie in checkpoint.cookies:
+            driver.add_cookie(cookie)
+        driver.execute_script(_RESTORE_SCRIPT, checkpoint.local_storage,
+                              checkpoint.session_storage)
+        page.invalidate()
+        if navigate:
+            driver.get(checkpoint.url)
+        return True
+
+    def restore_or_run(self, key, page, flow, *args, **kwargs):
+        """ Restore the checkpoint saved under a key, or if there isn't one run
+            the flow and save a checkpoint after it.
+
+        :param key: Key of the checkpoint
+        :param page: `PageObject`
+            Page Object to restore the state to, or run the flow with
+        :param flow: `callable`
+            Called with the Page Object and any other arguments given
+        :returns: `bool`, whether the checkpoint was restored rather than the flow run
+        """
+        if self.restore(key, page):
+            return True
+        flow(page, *args, **kwargs)
+        self.save(key, page)
+        return False
+
+    def invalidate(self, *keys):
+        """ Drop checkpoints, so their flows are run again next time.
+
+        :param keys: Keys of the checkpoints to drop. If none are given all of
+            them are dropped.
+        """
+        with self._lock:
+            if not keys:
+                self._checkpoints.clear()
+            for key in keys:
+                self._checkpoints.pop(key, None)
@@ -0,0 +1,511 @@
+""" Lightweight in-process DOM, with enough of CSS and XPath to evaluate
+Page Element locators without a browser.
+
+    >>> from page_objects import dom
+    >>> doc = dom.parse_html('<div id="a"><a href="/x">Home</a></div>')
+    >>> [n.attrs['href'] for n in dom.query(doc, 'css selector', '#a > a')]
+    ['/x']
+
+Supported CSS: type, universal, ``#id``, ``.class`` and attribute selectors
+(``=``, ``~=``, ``|=``, ``^=``, ``$=``, ``*=``), the ``:first-child``,
+``:last-child``, ``:nth-child(n)`` and ``:nth-of-type(n)`` pseudo-classes,
+all four combinators and selector groups.
+
+Supported XPath: absolute and relative location paths using the child,
+descendant (``//``), self (``.``) and parent (``..``) steps, name tests, a
+leading parenthesised path with a position, like ``(//div)[1]//a``, and
+predicates of positions, child names, ``@attr``, ``text()``, ``.`` and ``normalize-space()``
+with ``=``, ``!=``, ``contains()`` and ``starts-with()``, combined with
+``and``/``or``.
+
+Anything else raises `ValueError`.
+"""
+import re
+
+try:
+    from html.parser import HTMLParser
+except ImportError:
+    from HTMLParser import HTMLParser
+
+
+# Elements that never have children
+_VOID = frozenset(['area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input', 'link',
+                   'meta', 'param', 'source', 'track', 'wbr'])
+
+# Elements closed by an opening tag of any of the given ones
+_IMPLIED_END = {'li': ('li',),
+                'p': ('p',),
+                'option': ('option',),
+                'tr': ('tr', 'td', 'th'),
+                'td': ('td', 'th'),
+                'th': ('td', 'th'),
+                }
+
+# Elements whose content isn't part of the text
+_NO_TEXT = frozenset(['script', 'style', 'template', 'head'])
+
+
+class Node(object):
+    """ Element or text node. Text nodes have a ``tag`` of ``None``.
+    """
+    __slots__ = ('tag', 'attrs', 'children', 'parent', 'data')
+
+    def __init__(self, tag, attrs=None, data=None):
+        self.tag = tag
+        self.attrs = attrs if attrs is not None else {}
+        self.children = []
+        self.parent = None
+        self.data = data
+
+    def __repr__(self):
+        if self.tag is None:
+            return '<Text {0!r}>'.format(self.data)
+        return '<Node {0}>'.format(self.tag)
+
+    def append(self, child):
+        child.parent = self
+        self.children.append(child)
+        return child
+
+    @property
+    def elements(self):
+        """ Child element nodes.
+        """
+        return [c for c in self.children if c.tag is not None]
+
+    def iter(self):
+        """ Descendant element nodes, in document order, not including this one.
+        """
+        stack = list(reversed(self.elements))
+        while stack:
+            node = stack.pop()
+            yield node
+            stack.extend(reversed(node.elements))
+
+    @property
+    def root(self):
+        node = self
+        while node.parent is not None:
+            node = node.parent
+        return node
+
+    @property
+    def text_content(self):
+        """ All the text in the node, like the DOM ``textContent`` property.
+        """
+        if self.tag is None:
+            return self.data
+        return ''.join(c.text_content for c in self.children)
+
+    @property
+    def text(self):
+        """ Rendered text approximation: whitespace collapsed, and script and
+            style contents skipped.
+        """
+        parts = []
+        stack = [self]
+        while stack:
+            node = stack.pop()
+            if node.tag is None:
+                parts.append(node.data)
+            elif node.tag not in _NO_TEXT or node is self:
+                stack.extend(reversed(node.children))
+        return ' '.join(''.join(parts).split())
+
+    @property
+    def classes(self):
+        return (self.attrs.get('class') or '').split()
+
+    def to_html(self):
+        """ Serialise the node back to HTML.
+        """
+        if self.tag is None:
+            if self.parent is not None and self.parent.tag in ('script', 'style'):
+                return self.data
+            return _escape(self.data)
+        inner = ''.join(c.to_html() for c in self.children)
+        if self.tag == '#document':
+            return inner
+        attrs = ''.join(' {0}="{1}"'.format(k, _escape(v, True)) if v is not None else ' ' + k
+                        for k, v in self.attrs.items())
+        if self.tag in _VOID:
+            return '<{0}{1}>'.format(self.tag, attrs)
+        return '<{0}{1}>{2}</{0}>'.format(self.tag, attrs, inner)
+
+
+def _escape(text, quote=False):
+    text = text.replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;')
+    if quote:
+        text = text.replace('"', '&quot;')
+    return text
+
+
+class _TreeBuilder(HTMLParser):
+
+    def __init__(self):
+        HTMLParser.__init__(self)
+        self.convert_charrefs = True
+        self.document = Node('#document')
+        self.stack = [self.document]
+
+    def handle_starttag(self, tag, attrs):
+        closes = _IMPLIED_END.get(tag)
+        if closes and self.stack[-1].tag in closes:
+            self.stack.pop()
+        node = self.stack[-1].append(Node(tag, dict(attrs)))
+        if tag not in _VOID:
+            self.stack.append(node)
+
+    def handle_startendtag(self, tag, attrs):
+        self.stack[-1].append(Node(tag, dict(attrs)))
+
+    def handle_endtag(self, tag):
+        for i in range(len(self.stack) - 1, 0, -1):
+            if self.stack[i].tag == tag:
+                del self.stack[i:]
+                return
+
+    def handle_data(self, data):
+        self.stack[-1].append(Node(None, data=data))
+
+
+def parse_html(html):
+    """ Parse an HTML document or fragment.
+
+    :returns: `Node` for the document, with a tag of ``#document``
+    """
+    builder = _TreeBuilder()
+    builder.feed(html)
+    builder.close()
+    return builder.document
+
+
+def query(root, by, value, multi=True):
+    """ Find elements under a node.
+
+    :param root: `Node` to search from, the element or document
+    :param by: `str`
+        Webdriver locator strategy, eg ``'css selector'``
+    :param value: `str`
+        Locator value
+    :param multi: `bool`
+        Return all the matches, or just the first
+    :returns: list of `Node`, or a `Node` or ``None`` if not ``multi``
+    """
+    if by == 'xpath':
+        found = _xpath(root, value)
+        if multi:
+            return found
+        return found[0] if found else None
+    match = _matcher(by, value)
+    if multi:
+        return [n for n in root.iter() if match(n)]
+    return next((n for n in root.iter() if match(n)), None)
+
+
+def _matcher(by, value):
+    if by == 'css selector':
+        return _css(value)
+    if by == 'id':
+        return lambda n: n.attrs.get('id') == value
+    if by == 'name':
+        return lambda n: n.attrs.get('name') == value
+    if by == 'class name':
+        return lambda n: value in n.classes
+    if by == 'tag name':
+        return lambda n: n.tag == value.lower()
+    if by == 'link text':
+        return lambda n: n.tag == 'a' and n.text == value.strip()
+    if by == 'partial link text':
+        return lambda n: n.tag == 'a' and value in n.text
+    raise ValueError('Unsupported locator strategy: {0}'.format(by))
+
+
+# CSS -----------------------------------------------------------------------
+
+_CSS_TOKEN = re.compile(r'''
+    \s*(?P<comb>[>+~,])\s*
+  | (?P<space>\s+)
+  | (?P<tag>\*|[a-zA-Z][\w-]*)
+  | \#(?P<id>[\w-]+)
+  | \.(?P<cls>[\w-]+)
+  | \[\s*(?P<attr>[\w:-]+)\s*(?:(?P<op>[~|^$*]?=)\s*
+        (?:"(?P<dq>[^"]*)"|'(?P<sq>[^']*)'|(?P<bare>[\w-]+))\s*)?\]
+  | :(?P<pseudo>[\w-]+)(?:\(\s*(?P<arg>\d+)\s*\))?
+''', re.VERBOSE)
+
+_ATTR_OPS = {'=': lambda a, v: a == v,
+             '~=': lambda a, v: v in a.split(),
+             '|=': lambda a, v: a == v or a.startswith(v + '-'),
+             '^=': lambda a, v: bool(v) and a.startswith(v),
+             '$=': lambda a, v: bool(v) and a.endswith(v),
+             '*=': lambda a, v: bool(v) and v in a,
+             }
+
+
+def _siblings(node):
+    return node.parent.elements if node.parent is not None else [node]
+
+
+def _pseudo(name, arg):
+    if name == 'first-child' and arg is None:
+        return lambda n: _siblings(n)[0] is n
+    if name == 'last-child' and arg is None:
+        return lambda n: _siblings(n)[-1] is n
+    if name == 'nth-child' and arg is not None:
+        return lambda n: _index(_siblings(n), n) == int(arg) - 1
+    if name == 'nth-of-type' and arg is not None:
+        return lambda n: _index([s for s in _siblings(n) if s.tag == n.tag], n) == int(arg) - 1
+    raise ValueError('Unsupported CSS pseudo-class: :{0}'.format(name))
+
+
+def _index(nodes, node):
+    for i, n in enumerate(nodes):
+        if n is node:
+            return i
+    return -1
+
+
+def _compound(tests):
+    return lambda n: all(t(n) for t in tests)
+
+
+def _attr_test(name, op, value):
+    if op is None:
+        return lambda n: name in n.attrs
+    check = _ATTR_OPS[op]
+    return lambda n: n.attrs.get(name) is not None and check(n.attrs[name], value)
+
+
+def _parse_css(selector):
+    """ Parse a selector into groups of [(combinator, compound test), ...]
+        from left to right.
+    """
+    groups = [[]]
+    tests = []
+    comb = None
+    pos = 0
+    selector = selector.strip()
+    while pos < len(selector):
+        m = _CSS_TOKEN.match(selector, pos)
+        if not m or m.end() == pos:
+            raise ValueError('Unsupported CSS selector: {0}'.format(selector))
+        pos = m.end()
+        g = m.groupdict()
+        if g['comb'] or g['space']:
+            if not tests:
+                raise ValueError('Unsupported CSS selector: {0}'.format(selector))
+            groups[-1].append((comb, _compound(tests)))
+            tests = []
+            comb = None
+            if g['comb'] == ',':
+                groups.append([])
+            else:
+                comb = g['comb'] or ' '
+        elif g['tag']:
+            if tests:
+                raise ValueError('Unsupported CSS selector: {0}'.format(selector))
+            if g['tag'] != '*':
+                tag = g['tag'].lower()
+                tests.append(lambda n, tag=tag: n.tag == tag)
+            else:
+                tests.append(lambda n: True)
+        elif g['id']:
+            tests.append(lambda n, v=g['id']: n.attrs.get('id') == v)
+        elif g['cls']:
+            tests.append(lambda n, v=g['cls']: v in n.classes)
+        elif g['attr']:
+            value = next((v for v in (g['dq'], g['sq'], g['bare']) if v is not None), None)
+            tests.append(_attr_test(g['attr'].lower(), g['op'], value))
+        else:
+            tests.append(_pseudo(g['pseudo'], g['arg']))
+    if not tests:
+        raise ValueError('Unsupported CSS selector: {0}'.format(selector))
+    groups[-1].append((comb, _compound(tests)))
+    return groups
+
+
+def _match_chain(node, chain, i):
+    """ Match node against chain[i], then its combinator against chain[:i].
+    """
+    comb, test = chain[i]
+    if not test(node):
+        return False
+    if i == 0:
+        return True
+    if comb == '>':
+        return node.parent is not None and node.parent.tag != '#document' and \
+            _match_chain(node.parent, chain, i - 1)
+    if comb == ' ':
+        parent = node.parent
+        while parent is not None and parent.tag != '#document':
+            if _match_chain(parent, chain, i - 1):
+                return True
+            parent = parent.parent
+        return False
+    siblings = _siblings(node)
+    idx = _index(siblings, node)
+    if comb == '+':
+        return idx > 0 and _match_chain(siblings[idx - 1], chain, i - 1)
+    return any(_match_chain(s, chain, i - 1) for s in siblings[:idx])
+
+
+def _css(selector):
+    groups = _parse_css(selector)
+    return lambda n: any(_match_chain(n, chain, len(chain) - 1) for chain in groups)
+
+
+# XPath ---------------------------------------------------------------------
+
+_XPATH_STEP = re.compile(r'(//|/)?(\.\.|\.|\*|[a-zA-Z_][\w.-]*)((?:\[[^\]]*\])*)')
+_XPATH_PRED = re.compile(r'\[([^\]]*)\]')
+_XPATH_CMP = re.compile(r'''^\s*(?P<lhs>@[\w:-]+|text\(\)|\.|normalize-space\((?:\.)?\))\s*
+                            (?P<op>!?=)\s*(?:"(?P<dq>[^"]*)"|'(?P<sq>[^']*)')\s*$''', re.VERBOSE)
+_XPATH_FUNC = re.compile(r'''^\s*(?P<func>contains|starts-with)\(\s*
+                             (?P<lhs>@[\w:-]+|text\(\)|\.|normalize-space\((?:\.)?\))\s*,\s*
+                             (?:"(?P<dq>[^"]*)"|'(?P<sq>[^']*)')\s*\)\s*$''', re.VERBOSE)
+_XPATH_BOOL = re.compile(r'''\s+(and|or)\s+(?=(?:[^'"]|'[^']*'|"[^"]*")*$)''')
+
+
+def _xpath_value(lhs, node):
+    if lhs.startswith('@'):
+        return node.attrs.get(lhs[1:])
+    if lhs == 'text()':
+        return ''.join(c.data for c in node.children if c.tag is None)
+    if lhs == '.':
+        return node.text_content
+    return ' '.join(node.text_content.split())
+
+
+def _xpath_predicate(expr):
+    """ Returns (position, test) for a predicate expression.
+    """
+    expr = expr.strip()
+    if expr.isdigit():
+        return int(expr), None
+    if expr == 'last()':
+        return -1, None
+    parts = _XPATH_BOOL.split(expr)
+    if len(parts) > 1:
+        tests = [_xpath_predicate(p)[1] for p in parts[::2]]
+        ops = parts[1::2]
+        if any(t is None for t in tests):
+            raise ValueError('Unsupported XPath predicate: {0}'.format(expr))
+
+        def test(n):
+            res = tests[0](n)
+            for op, t in zip(ops, tests[1:]):
+                res = (res and t(n)) if op == 'and' else (res or t(n))
+            return res
+        return None, test
+    if re.match(r'^@[\w:-]+$', expr):
+        return None, lambda n: expr[1:] in n.attrs
+    if re.match(r'^[a-zA-Z_][\w-]*$', expr):
+        return None, lambda n: any(c.tag == expr.lower() for c in n.elements)
+    m = _XPATH_CMP.match(expr)
+    if m:
+        lhs, op = m.group('lhs'), m.group('op')
+        value = m.group('dq') if m.group('dq') is not None else m.group('sq')
+        if op == '=':
+            return None, lambda n: _xpath_value(lhs, n) == value
+        return None, lambda n: _xpath_value(lhs, n) not in (None, value)
+    m = _XPATH_FUNC.match(expr)
+    if m:
+        lhs, func = m.group('lhs'), m.group('func')
+        value = m.group('dq') if m.group('dq') is not None else m.group('sq')
+        if func == 'contains':
+            return None, lambda n: value in (_xpath_value(lhs, n) or '')
+        return None, lambda n: (_xpath_value(lhs, n) or '').startswith(value)
+    raise ValueError('Unsupported XPath predicate: {0}'.format(expr))
+
+
+def _close_paren(path):
+    """ Index of the parenthesis closing the one at the start of path.
+    """
+    depth = 0
+    quote = None
+    for i, c in enumerate(path):
+        if quote:
+            if c == quote:
+                quote = None
+        elif c in '\'"':
+            quote = c
+        elif c == '(':
+            depth += 1
+        elif c == ')':
+            depth -= 1
+            if not depth:
+                return i
+    raise ValueError('Unsupported XPath expression: {0}'.format(path))
+
+
+def _xpath(context, path):
+    path = path.strip()
+    pos = 0
+    if path.startswith('('):
+        end = _close_paren(path)
+        m = re.match(r'\[\s*(\d+)\s*\]', path[end + 1:])
+        if not m:
+            raise ValueError('Unsupported XPath expression: {0}'.format(path))
+        position = int(m.group(1))
+        nodes = _xpath(context, path[1:end])[position - 1:position]
+        pos = end + 1 + m.end()
+        if pos < len(path) and not path.startswith('/', pos):
+            raise ValueError('Unsupported XPath expression: {0}'.format(path))
+    elif path.startswith('/'):
+        nodes = [context.root]
+    else:
+        nodes = [context]
+    while pos < len(path):
+        m = _XPATH_STEP.match(path, pos)
+        if not m or m.end() == pos:
+            raise ValueError('Unsupported XPath expression: {0}'.format(path))
+        pos = m.end()
+        sep, name, preds = m.groups()
+        if sep is None and m.start() > 0:
+            raise ValueError('Unsupported XPath expression: {0}'.format(path))
+        predicates = [_xpath_predicate(p) for p in _XPATH_PRED.findall(preds)]
+
+        if sep == '//':
+            bases = []
+            for node in nodes:
+                bases.append(node)
+                bases.extend(node.iter())
+        else:
+            bases = nodes
+
+        found = []
+        for base in bases:
+            if name == '.':
+                candidates = [base]
+            elif name == '..':
+                candidates = [base.parent] if base.parent is not None else []
+            else:
+                candidates = [c for c in base.elements if name == '*' or c.tag == name.lower()]
+            for position, test in predicates:
+                if test is not None:
+                    candidates = [c for c in candidates if test(c)]
+                elif position == -1:
+                    candidates = candidates[-1:]
+                else:
+                    candidates = candidates[position - 1:position]
+            found.extend(candidates)
+        nodes = _unique(found)
+    return _document_order(nodes)
+
+
+def _unique(nodes):
+    seen = set()
+    res = []
+    for n in nodes:
+        if id(n) not in seen:
+            seen.add(id(n))
+            res.append(n)
+    return res
+
+
+def _document_order(nodes):
+    if len(nodes) < 2:
+        return nodes
+    order = dict((id(n), i) for i, n in enumerate(nodes[0].root.iter()))
+    return sorted(nodes, key=lambda n: order.get(id(n), -1))
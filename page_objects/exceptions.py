@@ -0,0 +1,45 @@
+""" The webdriver exceptions raised and caught by Page Objects.
+
+These are Selenium's exceptions when Selenium is installed, so errors from its
+webdrivers are handled as usual. Without it, they're stand-ins with the same
+names and hierarchy, for Page Objects driven by other webdriver backends such as
+`page_objects.testing.FakeWebDriver` or `page_objects.replay.ReplayDriver`.
+
+The core package doesn't import this module until an exception is raised or
+caught, so ``import page_objects`` doesn't load Selenium.
+"""
+try:
+    from selenium.common.exceptions import (InvalidSelectorException, NoSuchElementException,
+                                            StaleElementReferenceException, TimeoutException,
+                                            WebDriverException)
+except ImportError:
+    class WebDriverException(Exception):
+        """ Base webdriver exception.
+        """
+        def __init__(self, msg=None, screen=None, stacktrace=None):
+            Exception.__init__(self, msg)
+            self.msg = msg
+            self.screen = screen
+            self.stacktrace = stacktrace
+
+        def __str__(self):
+            return 'Message: %s\n' % self.msg
+
+    class NoSuchElementException(WebDriverException):
+        """ No element was found.
+        """
+
+    class StaleElementReferenceException(WebDriverException):
+        """ The element is no longer attached to the DOM.
+        """
+
+    class TimeoutException(WebDriverException):
+        """ A command didn't complete in time.
+        """
+
+    class InvalidSelectorException(WebDriverException):
+        """ A locator's selector isn't valid.
+        """
+
+__all__ = ['InvalidSelectorException', 'NoSuchElementException',
+           'StaleElementReferenceException', 'TimeoutException', 'WebDriverException']
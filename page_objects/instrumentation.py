@@ -0,0 +1,207 @@
+""" Timings and call counts for Page Element lookups.
+
+    >>> from page_objects import instrumentation
+    >>> with instrumentation.recording() as recorder:
+            run_my_tests()
+    >>> report = recorder.report()
+    >>> print(report)
+    >>> report.to_json()
+
+While recording, every ``PageElement`` and ``MultiPageElement`` lookup and set,
+and every ``PageObject.get``, ``resolve`` and ``fill`` is timed and counted,
+keyed by Page Object class, attribute name and locator. Cache hits aren't
+counted, as they don't go to the browser. When nothing is recording the
+overhead is a single check of a module global.
+"""
+import json
+import threading
+import timeit
+from contextlib import contextmanager
+
+import page_objects
+
+
+def enable(recorder=None):
+    """ Start recording.
+
+    :param recorder: `Recorder`
+        Recorder to use, a new one is created if not given
+    :returns: the active `Recorder`
+    """
+    if recorder is None:
+        recorder = Recorder()
+    page_objects._recorder = recorder
+    return recorder
+
+
+def disable():
+    """ Stop recording.
+    """
+    page_objects._recorder = None
+
+
+@contextmanager
+def recording(recorder=None):
+    """ Context manager that records for the duration of the block, and returns
+        the `Recorder`.
+    """
+    previous = page_objects._recorder
+    recorder = enable(recorder)
+    try:
+        yield recorder
+    finally:
+        page_objects._recorder = previous
+
+
+def _percentile(ordered, pct):
+    if not ordered:
+        return 0.0
+    idx = int(round(pct / 100.0 * (len(ordered) - 1)))
+    return ordered[idx]
+
+
+class Stats(object):
+    """ Call statistics for one key.
+    """
+    def __init__(self):
+        self.samples = []
+        self.not_found = 0
+        self.errors = 0
+
+    @property
+    def count(self):
+        return len(self.samples)
+
+    @property
+    def total(self):
+        return sum(self.samples)
+
+    def percentile(self, pct):
+        """ Latency percentile, in seconds.
+        """
+        return _percentile(sorted(self.samples), pct)
+
+    def merge(self, other):
+        self.samples.extend(other.samples)
+        self.not_found += other.not_found
+        self.errors += other.errors
+
+
+class Recorder(object):
+    """ Collects `Stats`, keyed by ``(operation, page class name, attribute name, locator)``.
+    """
+    def __init__(self):
+        self.stats = {}
+        self._names = {}
+        self._lock = threading.Lock()
+
+    def __getstate__(self):
+        # Only the stats are pickled, such as to send them between processes
+        with self._lock:
+            return {'stats': self.stats}
+
+    def __setstate__(self, state):
+        self.__init__()
+        self.stats = state['stats']
+
+    def _name(self, page_class, element):
+        key = (page_class, element)
+        if key not in self._names:
+            names = page_objects._page_elements(page_class)
+            self._names[key] = next((n for n, e in names.items() if e is element), None)
+        return self._names[key]
+
+    def call(self, op, page, element, locator, func, *args, **kwargs):
+        """ Call ``func`` and record how long it took against the given page,
+            element and locator.
+        """
+        started = timeit.default_timer()
+        error = False
+        res = None
+        try:
+            res = func(*args, **kwargs)
+            return res
+        except Exception:
+            error = True
+            raise
+        finally:
+            duration = timeit.default_timer() - started
+            page_class = page.__class__
+            name = self._name(page_class, element) if element is not None else None
+            if isinstance(locator, tuple):
+                locator = '{0}={1}'.format(*locator)
+            key = (op, page_class.__name__, name, locator)
+            with self._lock:
+                stats = self.stats.get(key)
+                if stats is None:
+                    stats = self.stats[key] = Stats()
+                stats.samples.append(duration)
+                if error:
+                    stats.errors += 1
+                elif op == 'find' and not res:
+                    stats.not_found += 1
+
+    def merge(self, other):
+        """ Add the stats from another recorder to this one.
+        """
+        with self._lock:
+            for key, stats in other.stats.items():
+                self.stats.setdefault(key, Stats()).merge(stats)
+
+    def reset(self):
+        with self._lock:
+            self.stats.clear()
+
+    def report(self):
+        """ :returns: `Report` of the stats recorded so far
+        """
+        with self._lock:
+            rows = []
+            for (op, page, name, locator), stats in self.stats.items():
+                ordered = sorted(stats.samples)
+                rows.append({'op': op,
+                             'page': page,
+                             'name': name,
+                             'locator': locator,
+                             'count': len(ordered),
+                             'total': sum(ordered),
+                             'mean': sum(ordered) / len(ordered),
+                             'p50': _percentile(ordered, 50),
+                             'p90': _percentile(ordered, 90),
+                             'p99': _percentile(ordered, 99),
+                             'max': ordered[-1],
+                             'not_found': stats.not_found,
+                             'errors': stats.errors,
+                             })
+        return Report(rows)
+
+
+class Report(object):
+    """ Recorded stats as a list of row dicts, most expensive first. Times are in seconds.
+    """
+    columns = ('op', 'page', 'name', 'locator', 'count', 'total', 'mean', 'p50', 'p90',
+               'p99', 'max', 'not_found', 'errors')
+
+    def __init__(self, rows):
+        self.rows = sorted(rows, key=lambda r: r['total'], reverse=True)
+
+    def __iter__(self):
+        return iter(self.rows)
+
+    def __len__(self):
+        return len(self.rows)
+
+    def to_json(self, **kwargs):
+        """ :returns: `str` of the rows as JSON. Keyword arguments are passed to `json.dumps`.
+        """
+        return json.dumps(self.rows, **kwargs)
+
+    def __str__(self):
+        lines = [self.columns]
+        for row in self.rows:
+            lines.append(tuple(
+                '{0:.4f}'.format(row[c]) if isinstance(row[c], float) else str(row[c])
+                for c in self.columns))
+        widths = [max(len(line[i]) for line in lines) for i in range(len(self.columns))]
+        return '\n'.join('  '.join(cell.ljust(w) for cell, w in zip(line, widths)).rstrip()
+                         for line in lines)
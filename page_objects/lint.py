@@ -0,0 +1,465 @@
+""" Linting Page Element locators for speed and ambiguity.
+
+    $ python -m page_objects.lint myproject.pages --html saved/login.html
+    page       name      locator                    rule        ms      matches  suggestion
+    LoginPage  username  xpath=//input[@id="user"]  slow-xpath  0.4120  1        id_='user'
+    LoginPage  errors    css=div .error             unanchored  0.2210  2        css='#login .error'
+
+    >>> from page_objects import lint
+    >>> findings = lint.lint([LoginPage], driver)
+    >>> print(lint.rewrite(findings))
+
+Locators are checked against rules for the kinds that browsers find slowly, or
+that this package can't look up with its scripts. Given a webdriver on a page,
+which can be a `page_objects.snapshot.SnapshotDriver` of a saved page or a
+`page_objects.replay.ReplayDriver`, each locator is also timed, and Page
+Elements that match more than one element are flagged. Faster locators are
+suggested where one finds the same elements on the page, such as the element's
+``id`` or a CSS selector anchored on an ancestor's ``id``, and ``rewrite`` makes
+the suggested changes to the Page Object classes' source.
+"""
+import argparse
+import difflib
+import importlib
+import inspect
+import re
+import sys
+import timeit
+
+from page_objects import By, Component, PageObject, _LOCATOR_MAP
+from page_objects.exceptions import WebDriverException
+
+# Page Element keyword argument for each locator strategy
+_KEYWORDS = dict((by, k) for k, by in _LOCATOR_MAP.items())
+
+# Ancestors looked at for an ``id`` to anchor CSS suggestions on
+_ANCHOR_DEPTH = 5
+
+# XPath steps that can be written as CSS: separator, tag and attribute predicates
+_XPATH_STEP = re.compile(r'''(//?)([\w-]+|\*)((?:\[@[\w-]+(?:\s*=\s*(?:"[^"]*"|'[^']*'))?\])*)''')
+_XPATH_ATTR = re.compile(r'''\[@([\w-]+)(?:\s*=\s*(?:"([^"]*)"|'([^']*)'))?\]''')
+
+_CSS_IDENT = re.compile(r'^[A-Za-z_][\w-]*$')
+
+# Errors looking locators up or reading elements. Replays raise AttributeError
+# for commands that weren't recorded at all, such as ``find_elements`` when the
+# flow only used ``find_element``.
+_LOOKUP_ERRORS = (WebDriverException, AttributeError)
+
+
+class Finding(object):
+    """ A problem found with a Page Element's locator.
+
+    :param page: `str`
+        Name of the Page Object class
+    :param name: `str`
+        Name of the Page Element
+    :param locator: `tuple`
+        ``(by, value)`` locator of the Page Element, as declared
+    :param rule: `str`
+        Name of the rule, one of ``RULES``
+    :param message: `str`
+        Description of the problem
+    :param seconds: `float`
+        Time taken to look the locator up on the page, if it was timed
+    :param matches: `int`
+        Number of elements the locator matched on the page, if it was timed
+    :param suggestion: `tuple`
+        ``(keyword, value)`` of a faster locator finding the same elements, if any
+    :param page_class: `PageObject` or `Component` subclass the Page Element is
+        declared on
+    """
+    def __init__(self, page, name, locator, rule, message, seconds=None, matches=None,
+                 suggestion=None, page_class=None):
+        self.page = page
+        self.name = name
+        self.locator = locator
+        self.rule = rule
+        self.message = message
+        self.seconds = seconds
+        self.matches = matches
+        self.suggestion = suggestion
+        self.page_class = page_class
+
+    def __repr__(self):
+        return '<Finding {0}.{1} {2}>'.format(self.page, self.name, self.rule)
+
+    def row(self):
+        return {'page': self.page,
+                'name': self.name,
+                'locator': '{0}={1}'.format(*self.locator),
+                'rule': self.rule,
+                'ms': '' if self.seconds is None else '{0:.4f}'.format(self.seconds * 1000),
+                'matches': '' if self.matches is None else str(self.matches),
+                'suggestion': '' if self.suggestion is None else '{0}={1!r}'.format(
+                    *self.suggestion),
+                }
+
+
+# Rule name -> description
+RULES = {
+    'partial-link-text': "partial link text compares the text of every link on the page",
+    'link-text': "link text can't be looked up in scripts, so batched lookups fall back "
+                 "to a call per element",
+    'slow-xpath': "XPath is evaluated slower than CSS, and text or function predicates "
+                  "slower still",
+    'unanchored': "descendant CSS selectors without an id are matched against every element",
+    'ambiguous': "the Page Element matches more than one element, and only the first is used",
+    'slow': "the lookup took longer than the slow threshold",
+}
+
+
+def page_classes(modules=None):
+    """ :returns: `list` of the `PageObject` and `Component` subclasses defined
+        so far, optionally only those in the given modules and their submodules,
+        sorted by name
+    """
+    found = []
+    todo = list(PageObject.__subclasses__()) + list(Component.__subclasses__())
+    while todo:
+        cls = todo.pop()
+        todo.extend(cls.__subclasses__())
+        if not modules or any(cls.__module__ == m or cls.__module__.startswith(m + '.')
+                              for m in modules):
+            found.append(cls)
+    return sorted(set(found), key=lambda cls: (cls.__module__, cls.__name__))
+
+
+def static_rules(locator):
+    """ :returns: `list` of rule names a ``(by, value)`` locator breaks, without
+        looking at a page
+    """
+    by, value = locator
+    if by == By.PARTIAL_LINK_TEXT:
+        return ['partial-link-text']
+    if by == By.LINK_TEXT:
+        return ['link-text']
+    if by == By.XPATH:
+        return ['slow-xpath']
+    if by == By.CSS_SELECTOR and _unanchored(value):
+        return ['unanchored']
+    return []
+
+
+def _unanchored(selector):
+    for part in selector.split(','):
+        part = re.sub(r'\s*([>+~])\s*', r'\1', part.strip())
+        if ' ' in part and '#' not in part and '[id=' not in part:
+            return True
+    return False
+
+
+def xpath_to_css(xpath):
+    """ Translate an XPath of tag steps and attribute predicates to the
+        equivalent CSS selector.
+
+    :returns: `str` CSS selector, or ``None`` if the XPath can't be translated
+    """
+    path = xpath.strip()
+    if path.startswith('.//'):
+        path = path[1:]
+    elif not path.startswith('/'):
+        return None
+    steps = []
+    pos = 0
+    while pos < len(path):
+        m = _XPATH_STEP.match(path, pos)
+        if not m:
+            return None
+        pos = m.end()
+        sep, tag, preds = m.groups()
+        css = '' if tag == '*' else tag
+        for attr in _XPATH_ATTR.finditer(preds):
+            name = attr.group(1)
+            value = attr.group(2) if attr.group(2) is not None else attr.group(3)
+            if value is None:
+                css += '[{0}]'.format(name)
+            elif name == 'id' and _CSS_IDENT.match(value):
+                css += '#' + value
+            elif '"' in value:
+                return None
+            else:
+                css += '[{0}="{1}"]'.format(name, value)
+        steps.append((sep, css or '*'))
+    if not steps:
+        return None
+    # Only descendant steps are the same in CSS when not started from the root
+    if steps[0][0] == '/' and not steps[0][1].startswith('html'):
+        return None
+    selector = steps[0][1]
+    for sep, css in steps[1:]:
+        selector += (' > ' if sep == '/' else ' ') + css
+    return selector
+
+
+def _time(root, locator, repeat):
+    """ :returns: ``(best seconds, elements found)`` for a locator
+    """
+    best = None
+    for _ in range(repeat):
+        started = timeit.default_timer()
+        found = root.find_elements(*locator)
+        duration = timeit.default_timer() - started
+        best = duration if best is None else min(best, duration)
+    return best, found
+
+
+def _root(elem, driver):
+    """ Element to look a Page Element's own locator up in, and that locator.
+    """
+    if elem.parent is None or elem.compiled:
+        return driver, elem.locator
+    return elem.parent.find(driver), elem.own.locator
+
+
+def _read(elem, name):
+    """ An element's tag name or attribute, or ``None`` if it can't be read.
+    """
+    try:
+        return elem.tag_name if name == 'tag_name' else elem.get_attribute(name)
+    except _LOOKUP_ERRORS:
+        return None
+
+
+def _candidates(root, found, multiple, locator):
+    """ Faster locators that might find the same elements.
+    """
+    first = found[0]
+    if not multiple:
+        for attr, keyword, by in (('id', 'id_', By.ID), ('name', 'name', By.NAME)):
+            value = _read(first, attr)
+            if value:
+                yield keyword, (by, value)
+    tag = _read(first, 'tag_name')
+    if not tag:
+        return
+    classes = [c for c in (_read(first, 'class') or '').split() if _CSS_IDENT.match(c)]
+    # Classes the locator selects on are kept, so that the suggestion doesn't
+    # match other elements that are added to the page later
+    kept = [c for c in classes
+            if re.search(r'(?<![\w-]){0}(?![\w-])'.format(re.escape(c)), locator[1])]
+    ancestor = first
+    for _ in range(_ANCHOR_DEPTH):
+        try:
+            ancestor = ancestor.find_element(By.XPATH, '..')
+        except _LOOKUP_ERRORS:
+            return
+        anchor = _read(ancestor, 'id')
+        if anchor and _CSS_IDENT.match(anchor):
+            prefix = '#{0} {1}'.format(anchor, tag)
+            if kept:
+                yield 'css', (By.CSS_SELECTOR, prefix + ''.join('.' + c for c in kept))
+                return
+            yield 'css', (By.CSS_SELECTOR, prefix)
+            if classes:
+                yield 'css', (By.CSS_SELECTOR, '{0}.{1}'.format(prefix, classes[0]))
+            return
+
+
+def _suggest(elem, root, locator, seconds, found, repeat):
+    """ :returns: ``(keyword, value)`` of the fastest locator finding the same
+        elements as the Page Element, if one is faster
+    """
+    expected = found if elem.multiple else found[:1]
+    candidates = list(_candidates(root, found, elem.multiple, locator))
+    if locator[0] == By.XPATH:
+        css = xpath_to_css(locator[1])
+        if css is not None:
+            candidates.insert(0, ('css', (By.CSS_SELECTOR, css)))
+    best = None
+    for keyword, candidate in candidates:
+        if candidate == locator:
+            continue
+        try:
+            duration, matches = _time(root, candidate, repeat)
+        except _LOOKUP_ERRORS:
+            continue
+        if matches == expected and duration < seconds and (best is None or duration < best[0]):
+            best = duration, (keyword, candidate[1])
+    return best[1] if best is not None else None
+
+
+def lint_element(page_class, info, driver=None, repeat=5, slow=0.01):
+    """ Check one Page Element.
+
+    :param page_class: `PageObject` or `Component` subclass declaring the element
+    :param info: `page_objects.ElementInfo` of the Page Element
+    :param driver: Webdriver on a page with the element, to time and check it on
+    :param repeat: `int`
+        Times to look each locator up, the fastest is used
+    :param slow: `float`
+        Seconds above which a lookup is flagged as slow
+    :returns: `list` of `Finding`
+    """
+    elem = info.descriptor
+    declared = elem.own.locator
+
+    def finding(rule, seconds=None, matches=None, suggestion=None):
+        return Finding(page_class.__name__, info.name, declared, rule, RULES[rule], seconds,
+                       matches, suggestion, page_class)
+
+    rules = static_rules(declared)
+    # Elements with context need an element to be looked up in, so they're not timed
+    if driver is None or info.context:
+        return [finding(rule) for rule in rules]
+
+    try:
+        root, locator = _root(elem, driver)
+        seconds, found = _time(root, locator, repeat) if root else (None, [])
+    except _LOOKUP_ERRORS:
+        seconds, found = None, []
+    if not found:
+        return [finding(rule) for rule in rules]
+
+    suggestion = None
+    if rules or seconds > slow or (not elem.multiple and len(found) > 1):
+        suggestion = _suggest(elem, root, locator, seconds, found, repeat)
+    if seconds > slow:
+        rules.append('slow')
+    if not elem.multiple and len(found) > 1:
+        rules.insert(0, 'ambiguous')
+    return [finding(rule, seconds, len(found), suggestion) for rule in rules]
+
+
+def lint(classes=None, driver=None, repeat=5, slow=0.01):
+    """ Check the locators of the Page Elements of Page Object classes.
+
+    :param classes: `list`
+        `PageObject` and `Component` subclasses to check, by default all of them.
+        Page Elements they inherit are checked on the class declaring them.
+    :param driver: Webdriver on a page to time and check the locators on.
+        Page Elements that aren't on the page are only checked against the
+        static rules.
+    :param repeat: `int`
+        Times to look each locator up, the fastest is used
+    :param slow: `float`
+        Seconds above which a lookup is flagged as slow
+    :returns: `list` of `Finding`
+    """
+    findings = []
+    done = set()
+    for cls in page_classes() if classes is None else classes:
+        for info in cls.page_elements():
+            owner = _declaring_class(cls, info)
+            if (owner, info.name) in done:
+                continue
+            done.add((owner, info.name))
+            findings.extend(lint_element(owner, info, driver, repeat, slow))
+    return findings
+
+
+def _declaring_class(cls, info):
+    """ The class in ``cls``'s bases that a Page Element is declared on, so
+        inherited Page Elements, such as those of components, are checked once.
+    """
+    for klass in cls.__mro__:
+        if vars(klass).get(info.name) is info.descriptor:
+            return klass
+    return cls
+
+
+def report(findings):
+    """ :returns: `str` table of findings
+    """
+    columns = ('page', 'name', 'locator', 'rule', 'ms', 'matches', 'suggestion')
+    lines = [columns] + [tuple(f.row()[c] for c in columns) for f in findings]
+    widths = [max(len(line[i]) for line in lines) for i in range(len(columns))]
+    return '\n'.join('  '.join(cell.ljust(w) for cell, w in zip(line, widths)).rstrip()
+                     for line in lines)
+
+
+def _replace_locator(source, name, keyword, value, new_keyword, new_value):
+    """ Replace a Page Element's locator keyword in the source of its class.
+
+    :returns: `str` of the new source, or ``None`` if the declaration wasn't found
+    """
+    declaration = re.search(r'^\s*%s\s*=\s*(?:Multi)?PageElement\(' % re.escape(name), source,
+                            re.MULTILINE)
+    if declaration is None:
+        return None
+    literal = re.compile(r'''\b%s\s*=\s*(?:'%s'|"%s")''' % (
+        re.escape(keyword), re.escape(value).replace("'", "\\'"),
+        re.escape(value).replace('"', '\\"')))
+    m = literal.search(source, declaration.end())
+    # The locator has to be in this declaration, not a later one
+    if m is None or source.count('\n', declaration.end(), m.start()) > 5:
+        return None
+    quote = '"' if "'" in new_value else "'"
+    return '%s%s=%s%s%s%s' % (source[:m.start()], new_keyword, quote, new_value, quote,
+                              source[m.end():])
+
+
+def rewrite(findings, write=False):
+    """ Change the Page Elements with suggested locators to use them, in the
+        source files of their Page Object classes.
+
+    :param findings: `list` of `Finding`, from `lint`
+    :param write: `bool`
+        Write the changes to the files, rather than only returning them
+    :returns: `str` unified diff of the changes
+    """
+    originals = {}
+    sources = {}
+    done = set()
+    for f in findings:
+        if f.suggestion is None or f.page_class is None or (f.page_class, f.name) in done:
+            continue
+        done.add((f.page_class, f.name))
+        path = inspect.getsourcefile(f.page_class)
+        if path not in sources:
+            with open(path) as fh:
+                originals[path] = sources[path] = fh.read()
+        lines, start = inspect.getsourcelines(f.page_class)
+        source = sources[path].splitlines(True)
+        end = start - 1 + len(lines)
+        block = _replace_locator(''.join(source[start - 1:end]), f.name, _KEYWORDS[f.locator[0]],
+                                 f.locator[1], f.suggestion[0], f.suggestion[1])
+        if block is not None:
+            sources[path] = ''.join(source[:start - 1]) + block + ''.join(source[end:])
+
+    diff = []
+    for path in sorted(sources):
+        if sources[path] == originals[path]:
+            continue
+        diff.extend(difflib.unified_diff(originals[path].splitlines(True),
+                                         sources[path].splitlines(True), path, path))
+        if write:
+            with open(path, 'w') as fh:
+                fh.write(sources[path])
+    return ''.join(diff)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Lint the locators of Page Object classes')
+    parser.add_argument('modules', nargs='+', metavar='MODULE',
+                        help='modules with the Page Object classes to check')
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument('--html', help='saved HTML page to time the locators on')
+    source.add_argument('--replay', help='recording from RecordingDriver.save to time them on')
+    parser.add_argument('--url', default='about:blank', help='URL of the saved page')
+    parser.add_argument('--repeat', type=int, default=5, help='lookups of each locator')
+    parser.add_argument('--slow', type=float, default=10, help='milliseconds of a slow lookup')
+    parser.add_argument('--diff', action='store_true', help='print the suggested changes')
+    parser.add_argument('--write', action='store_true', help='make the suggested changes')
+    args = parser.parse_args(argv)
+
+    for module in args.modules:
+        importlib.import_module(module)
+    driver = None
+    if args.html:
+        from page_objects.snapshot import SnapshotDriver
+        with open(args.html) as f:
+            driver = SnapshotDriver(f.read(), args.url)
+    elif args.replay:
+        from page_objects.replay import ReplayDriver
+        driver = ReplayDriver.load(args.replay)
+
+    findings = lint(page_classes(args.modules), driver, args.repeat, args.slow / 1000.0)
+    print(report(findings))
+    if args.diff or args.write:
+        print(rewrite(findings, write=args.write))
+    return 1 if findings else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,306 @@
+""" Blocking and shaping the network traffic of page loads.
+
+    >>> class ArticlePage(PageObject):
+            blocked_resources = ['*google-analytics.com*', '*.woff2', '*/ads/*']
+            network_conditions = {'latency': 20, 'download_throughput': 500 * 1024}
+
+``PageObject.get`` applies the page class's settings to its webdriver before
+navigating. Chromium webdrivers are configured with DevTools commands. Other
+browsers can be pointed at a `NetworkProxy` running on the local machine, which
+is attached to the webdriver so pages configure it instead:
+
+    >>> proxy = NetworkProxy().start()
+    >>> options.set_preference('network.proxy.http', proxy.host) ...
+    >>> driver = proxy.attach(webdriver.Firefox(options=options))
+
+Patterns are matched against the whole URL, with ``*`` matching anything.
+Settings are only sent to the browser when they differ from the last ones
+applied to it, so pages with the same settings don't add round-trips.
+"""
+import re
+import select
+import socket
+import threading
+import time
+
+try:
+    from http.client import HTTPConnection
+    from http.server import BaseHTTPRequestHandler, HTTPServer
+    from socketserver import ThreadingMixIn
+    from urllib.parse import urlsplit
+except ImportError:
+    from httplib import HTTPConnection
+    from BaseHTTPServer import BaseHTTPRequestHandler, HTTPServer
+    from SocketServer import ThreadingMixIn
+    from urlparse import urlsplit
+
+from page_objects.exceptions import WebDriverException
+
+# Keys of ``network_conditions``, as for Chrome's ``set_network_conditions``
+_CONDITIONS = ('offline', 'latency', 'download_throughput', 'upload_throughput')
+
+# Headers that only apply to a single connection, and aren't forwarded
+_HOP_HEADERS = frozenset(['connection', 'keep-alive', 'proxy-connection', 'proxy-authorization',
+                          'te', 'trailer', 'transfer-encoding', 'upgrade'])
+
+# Bytes relayed at a time through the proxy
+_CHUNK_SIZE = 16 * 1024
+
+# Seconds between checks for the proxy being stopped
+_POLL_INTERVAL = 0.05
+
+
+def _settings(blocked, conditions):
+    """ Hashable form of a page's network settings, to compare with the last applied.
+    """
+    conditions = conditions or {}
+    unknown = set(conditions) - set(_CONDITIONS)
+    if unknown:
+        raise ValueError("Please specify network conditions from %s" % ', '.join(_CONDITIONS))
+    return tuple(blocked or ()), tuple(sorted(conditions.items()))
+
+
+def matcher(patterns):
+    """ :returns: `callable` returning true for URLs matching any of the patterns
+    """
+    if not patterns:
+        return lambda url: False
+    regex = re.compile('|'.join('(?:%s)$' % re.escape(p).replace(r'\*', '.*') for p in patterns))
+    return lambda url: regex.match(url) is not None
+
+
+def apply(driver, blocked=(), conditions=None):
+    """ Block URL patterns and emulate network conditions on a webdriver, through
+        its attached `NetworkProxy` or else DevTools commands.
+
+    :param driver: `selenium.webdriver.WebDriver`
+        Webdriver to configure
+    :param blocked: `list`
+        URL patterns to block
+    :param conditions: `dict`
+        ``latency`` in milliseconds, ``download_throughput`` and ``upload_throughput``
+        in bytes per second and ``offline``
+    :returns: `bool`, whether anything was sent to the browser or proxy
+    """
+    settings = _settings(blocked, conditions)
+    if getattr(driver, '_po_network', ((), ())) == settings:
+        return False
+
+    proxy = getattr(driver, 'network_proxy', None)
+    if proxy is not None:
+        proxy.block(blocked)
+        proxy.shape(conditions)
+    else:
+        try:
+            _devtools(driver, blocked, dict(conditions or {}))
+        except (AttributeError, WebDriverException):
+            raise ValueError("Sorry, blocking resources and network conditions need a Chromium "
+                             "webdriver or a NetworkProxy attached to the webdriver")
+    driver._po_network = settings
+    return True
+
+
+def _devtools(driver, blocked, conditions):
+    driver.execute_cdp_cmd('Network.enable', {})
+    driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': list(blocked or ())})
+    driver.execute_cdp_cmd('Network.emulateNetworkConditions', {
+        'offline': bool(conditions.get('offline')),
+        'latency': conditions.get('latency', 0),
+        'downloadThroughput': conditions.get('download_throughput', -1),
+        'uploadThroughput': conditions.get('upload_throughput', -1),
+    })
+
+
+class _ThreadingHTTPServer(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+
+class _ProxyHandler(BaseHTTPRequestHandler):
+    """ Forwards plain HTTP requests, and tunnels HTTPS ones, for `NetworkProxy`.
+    """
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        pass
+
+    @property
+    def proxy(self):
+        return self.server.proxy
+
+    def do_CONNECT(self):
+        host, _, port = self.path.partition(':')
+        # Only the host of HTTPS requests is known
+        if self.proxy._blocked('https://%s/' % host):
+            self._stub(403)
+            return
+        try:
+            upstream = socket.create_connection((host, int(port or 443)))
+        except (socket.error, ValueError):
+            self._stub(502)
+            return
+        self.proxy._delay()
+        self.send_response(200, 'Connection established')
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+        self.close_connection = True
+        self._relay(upstream)
+
+    def _relay(self, upstream):
+        sockets = [self.connection, upstream]
+        try:
+            while True:
+                readable, _, failed = select.select(sockets, [], sockets, 30)
+                if failed or not readable:
+                    return
+                for sock in readable:
+                    data = sock.recv(_CHUNK_SIZE)
+                    if not data:
+                        return
+                    downloading = sock is upstream
+                    self.proxy._throttle(len(data), downloading)
+                    (self.connection if downloading else upstream).sendall(data)
+        except socket.error:
+            pass
+        finally:
+            upstream.close()
+
+    def _forward(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        body = self.rfile.read(length) if length else None
+        if self.proxy._blocked(self.path):
+            self._stub(204)
+            return
+        url = urlsplit(self.path)
+        headers = dict((k, v) for k, v in self.headers.items() if k.lower() not in _HOP_HEADERS)
+        self.proxy._delay()
+        self.proxy._throttle(length, False)
+        try:
+            upstream = HTTPConnection(url.hostname, url.port or 80, timeout=30)
+            path = (url.path or '/') + ('?' + url.query if url.query else '')
+            upstream.request(self.command, path, body, headers)
+            response = upstream.getresponse()
+            data = response.read()
+        except (socket.error, ValueError):
+            self._stub(502)
+            return
+        self.proxy._throttle(len(data), True)
+        self.send_response(response.status, response.reason)
+        for key, value in response.getheaders():
+            if key.lower() not in _HOP_HEADERS and key.lower() != 'content-length':
+                self.send_header(key, value)
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        if self.command != 'HEAD':
+            self.wfile.write(data)
+        upstream.close()
+
+    do_GET = do_POST = do_PUT = do_DELETE = do_PATCH = do_HEAD = do_OPTIONS = _forward
+
+    def _stub(self, status):
+        self.send_response(status)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+
+class NetworkProxy(object):
+    """ HTTP proxy on the local machine, which answers requests to blocked URL
+        patterns itself instead of forwarding them, and can add latency and limit
+        throughput. It uses no external services.
+
+    :param host: `str`
+        Interface to listen on
+    :param port: `int`
+        Port to listen on, by default any free port
+
+    Blocked HTTP requests get an empty ``204`` response. HTTPS requests are only
+    matched on their host, as ``https://host/``, and blocked ones are refused.
+    """
+    def __init__(self, host='127.0.0.1', port=0):
+        self._server = _ThreadingHTTPServer((host, port), _ProxyHandler)
+        self._server.proxy = self
+        self._thread = None
+        self._is_blocked = matcher(())
+        self.blocked = ()
+        self.conditions = {}
+        self.requests = 0
+        self.blocked_requests = 0
+        self._lock = threading.Lock()
+
+    def __repr__(self):
+        return '<NetworkProxy {0}>'.format(self.address)
+
+    @property
+    def host(self):
+        return self._server.server_address[0]
+
+    @property
+    def port(self):
+        return self._server.server_address[1]
+
+    @property
+    def address(self):
+        """ ``host:port`` of the proxy, for the browser's proxy settings.
+        """
+        return '%s:%d' % (self.host, self.port)
+
+    def start(self):
+        """ Start serving in a background thread.
+
+        :returns: the proxy
+        """
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._server.serve_forever,
+                                            args=(_POLL_INTERVAL,), name='NetworkProxy')
+            self._thread.daemon = True
+            self._thread.start()
+        return self
+
+    def stop(self):
+        if self._thread is not None:
+            self._server.shutdown()
+            self._thread.join()
+            self._thread = None
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def attach(self, driver):
+        """ Have Page Objects using the webdriver configure this proxy, rather
+            than the browser. The browser must already be using the proxy.
+
+        :returns: the webdriver
+        """
+        driver.network_proxy = self
+        return driver
+
+    def block(self, patterns):
+        """ Replace the URL patterns that are blocked.
+        """
+        self.blocked = tuple(patterns or ())
+        self._is_blocked = matcher(self.blocked)
+
+    def shape(self, conditions):
+        """ Replace the network conditions, see `apply`.
+        """
+        self.conditions = dict(conditions or {})
+
+    def _blocked(self, url):
+        blocked = self._is_blocked(url) or bool(self.conditions.get('offline'))
+        with self._lock:
+            self.requests += 1
+            self.blocked_requests += blocked
+        return blocked
+
+    def _delay(self):
+        latency = self.conditions.get('latency')
+        if latency:
+            time.sleep(latency / 1000.0)
+
+    def _throttle(self, size, downloading):
+        limit = self.conditions.get('download_throughput' if downloading else 'upload_throughput')
+        if limit and limit > 0 and size:
+            time.sleep(float(size) / limit)
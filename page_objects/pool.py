@@ -0,0 +1,373 @@
+""" Pool of webdrivers for running Page Object flows in parallel.
+
+    >>> from page_objects.pool import SessionPool
+    >>> def login(page, user):
+            page.get('/login')
+            page.fill(username=user, password='squirrel')
+            page.login.click()
+
+    >>> with SessionPool(webdriver.Firefox, size=4, root_uri='http://example.com') as pool:
+            futures = [pool.submit(LoginPage, login, user) for user in users]
+            [f.result() for f in futures]
+    >>> pool.results
+    [<FlowResult login driver=0 0.812s ok>, ...]
+
+Drivers are started once and reused between flows, with their cookies and
+storage cleared in between instead of relaunching the browser.
+
+`ProcessPool` has the same interface, but runs the flows in worker processes
+that each own a webdriver, so CPU-bound work in flows isn't limited by the GIL.
+It needs Python 3.7 or later.
+"""
+import sys
+import threading
+import timeit
+import zlib
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
+
+try:
+    import queue
+except ImportError:
+    import Queue as queue
+
+import page_objects
+from page_objects import instrumentation
+from page_objects.exceptions import WebDriverException
+
+# Clears storage for the current origin, ignoring pages that don't allow it
+_RESET_SCRIPT = """
+try {
+    window.localStorage.clear();
+    window.sessionStorage.clear();
+} catch (e) {}
+"""
+
+
+class FlowResult(object):
+    """ Timing and outcome of a flow run on a `SessionPool`.
+
+    :param name: `str`
+        Name of the flow function
+    :param driver: `int`
+        Index of the pooled driver the flow ran on
+    :param started: `float`
+        Start time, from ``timeit.default_timer``
+    :param duration: `float`
+        Time taken by the flow, in seconds. Doesn't include resetting the driver.
+    :param error: `Exception`
+        Exception raised by the flow, if any
+    """
+    def __init__(self, name, driver, started, duration, error=None):
+        self.name = name
+        self.driver = driver
+        self.started = started
+        self.duration = duration
+        self.error = error
+
+    @property
+    def ok(self):
+        return self.error is None
+
+    def __repr__(self):
+        return '<FlowResult {0} driver={1} {2:.3f}s {3}>'.format(
+            self.name, self.driver, self.duration, 'ok' if self.ok else 'failed')
+
+
+class SessionPool(object):
+    """ Pool of webdrivers that hands out Page Objects bound to a free driver.
+
+    :param factory: `callable`
+        Called with no arguments to create each webdriver
+    :param size: `int`
+        Number of drivers, and so the number of flows run at once
+    :param root_uri: `str`
+        Root URI for the Page Objects created by the pool
+    :param reset: `bool`
+        Clear cookies and storage when a driver is returned to the pool
+    """
+    def __init__(self, factory, size, root_uri=None, reset=True):
+        self.factory = factory
+        self.size = size
+        self.root_uri = root_uri
+        self.reset = reset
+        self.results = []
+        self._drivers = []
+        self._free = queue.Queue()
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=size)
+
+    def start(self):
+        """ Start all the drivers in parallel. Called on first use if needed.
+        """
+        with self._lock:
+            if self._drivers:
+                return
+            with ThreadPoolExecutor(max_workers=self.size) as executor:
+                self._drivers = list(executor.map(lambda _: self.factory(), range(self.size)))
+            for i in range(self.size):
+                self._free.put(i)
+
+    def close(self):
+        """ Wait for running flows, then quit all the drivers.
+        """
+        self._executor.shutdown(wait=True)
+        with self._lock:
+            for driver in self._drivers:
+                if driver is None:
+                    continue
+                try:
+                    driver.quit()
+                except WebDriverException:
+                    pass
+            self._drivers = []
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    @contextmanager
+    def driver(self):
+        """ Context manager that checks out a free driver, as ``(index, driver)``.
+        """
+        self.start()
+        i = self._free.get()
+        try:
+            if self._drivers[i] is None:
+                # Its session broke, and couldn't be replaced when it was returned
+                self._drivers[i] = self.factory()
+            try:
+                yield i, self._drivers[i]
+            finally:
+                self._recycle(i)
+        finally:
+            self._free.put(i)
+
+    @contextmanager
+    def page(self, page_class, **kwargs):
+        """ Context manager that returns a Page Object bound to a free driver.
+
+        :param page_class: `PageObject` subclass to create
+        :param kwargs: Extra arguments for the Page Object
+        """
+        with self.driver() as (_, driver):
+            kwargs.setdefault('root_uri', self.root_uri)
+            yield page_class(driver, **kwargs)
+
+    def submit(self, page_class, flow, *args, **kwargs):
+        """ Run a flow on the next free driver.
+
+        :param page_class: `PageObject` subclass to create for the flow
+        :param flow: `callable`
+            Called with the Page Object and any other arguments given
+        :returns: `concurrent.futures.Future` for the flow's return value. Its timing
+            is added to ``results`` when it completes.
+        """
+        self.start()
+        return self._executor.submit(self._run, page_class, flow, args, kwargs)
+
+    def _run(self, page_class, flow, args, kwargs):
+        with self.driver() as (i, driver):
+            page = page_class(driver, root_uri=self.root_uri)
+            started = timeit.default_timer()
+            error = None
+            try:
+                return flow(page, *args, **kwargs)
+            except Exception as e:
+                error = e
+                raise
+            finally:
+                result = FlowResult(getattr(flow, '__name__', repr(flow)), i, started,
+                                    timeit.default_timer() - started, error)
+                with self._lock:
+                    self.results.append(result)
+
+    def _recycle(self, i):
+        if not self.reset:
+            return
+        driver = self._drivers[i]
+        try:
+            driver.delete_all_cookies()
+            driver.execute_script(_RESET_SCRIPT)
+        except WebDriverException:
+            # The session is broken, replace it
+            try:
+                driver.quit()
+            except WebDriverException:
+                pass
+            self._drivers[i] = None
+            self._drivers[i] = self.factory()
+
+
+# `SessionPool` of the current worker process of a `ProcessPool`
+_worker_pool = None
+
+
+def _start_worker(factory, root_uri, reset):
+    global _worker_pool
+    _worker_pool = SessionPool(factory, size=1, root_uri=root_uri, reset=reset)
+    _worker_pool.start()
+
+
+def _stop_worker():
+    global _worker_pool
+    if _worker_pool is not None:
+        _worker_pool.close()
+        _worker_pool = None
+
+
+@contextmanager
+def _no_recording():
+    yield None
+
+
+def _run_in_worker(page_class, flow, args, kwargs, record):
+    """ Run a flow on the worker's driver.
+
+    :returns: ``(value, FlowResult, Recorder)``, with any exception the flow
+        raised in the `FlowResult` rather than raised, so its timing and stats
+        get back to the parent too
+    """
+    pool = _worker_pool
+    value = None
+    with instrumentation.recording() if record else _no_recording() as recorder:
+        try:
+            value = pool._run(page_class, flow, args, kwargs)
+        except Exception:
+            pass
+    return value, pool.results.pop(), recorder
+
+
+class ProcessPool(object):
+    """ Pool of worker processes that each own a webdriver, and run the flows
+        sent to them one at a time.
+
+    :param factory: `callable`
+        Called with no arguments in each worker to create its webdriver. It has
+        to be picklable, such as a module level function, a class or a
+        `functools.partial` of one.
+    :param processes: `int`
+        Number of worker processes, by default the number of CPUs
+    :param root_uri: `str`
+        Root URI for the Page Objects created by the pool
+    :param reset: `bool`
+        Clear cookies and storage between the flows run on a driver
+
+    Page classes, flows and their arguments and return values are pickled to
+    and from the workers, so flows have to be module level functions. Each
+    worker keeps its browser running between flows, and ``submit_to`` sends
+    flows with the same key to the same worker, so they can reuse state it has
+    built up, like the checkpoints of a `page_objects.checkpoint.CheckpointStore`
+    in the worker's module globals. If instrumentation is recording when a flow
+    is submitted, the flow is recorded in the worker and its stats are merged
+    into the recorder when it completes.
+    """
+    def __init__(self, factory, processes=None, root_uri=None, reset=True):
+        if sys.version_info < (3, 7):
+            # Workers start their drivers with the executor's initializer
+            raise RuntimeError("Sorry, ProcessPool needs Python 3.7 or later")
+        # Imported here, as they're slow to import and only process pools need them
+        import multiprocessing
+        self.factory = factory
+        self.size = processes or multiprocessing.cpu_count()
+        self.root_uri = root_uri
+        self.reset = reset
+        self.results = []
+        self._workers = []
+        self._pending = [0] * self.size
+        self._lock = threading.Lock()
+
+    def start(self):
+        """ Start all the workers and their drivers. Called on first use if needed.
+        """
+        with self._lock:
+            if self._workers:
+                return
+            from concurrent.futures import ProcessPoolExecutor
+            self._workers = [ProcessPoolExecutor(max_workers=1, initializer=_start_worker,
+                                                 initargs=(self.factory, self.root_uri,
+                                                           self.reset))
+                             for _ in range(self.size)]
+            # Wait for the drivers, so they start in parallel and failures show here
+            [f.result() for f in [w.submit(int) for w in self._workers]]
+
+    def close(self):
+        """ Wait for running flows, then quit the drivers and stop the workers.
+        """
+        with self._lock:
+            workers, self._workers = self._workers, []
+        for worker in workers:
+            try:
+                worker.submit(_stop_worker).result()
+            finally:
+                worker.shutdown(wait=True)
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def submit(self, page_class, flow, *args, **kwargs):
+        """ Run a flow on the worker with the fewest flows waiting.
+
+        :param page_class: `PageObject` subclass to create for the flow
+        :param flow: `callable`
+            Called with the Page Object and any other arguments given
+        :returns: `concurrent.futures.Future` for the flow's return value. Its timing
+            is added to ``results`` when it completes, with the worker's index as
+            the driver.
+        """
+        self.start()
+        with self._lock:
+            i = self._pending.index(min(self._pending))
+        return self._submit(i, page_class, flow, args, kwargs)
+
+    def submit_to(self, key, page_class, flow, *args, **kwargs):
+        """ Run a flow on the worker for a key, so flows with the same key run
+            one after another on the same browser.
+
+        :param key: Any key with a stable ``repr``, such as ``('login', user)``
+        :returns: `concurrent.futures.Future` for the flow's return value, see ``submit``
+        """
+        self.start()
+        return self._submit(self.worker_for(key), page_class, flow, args, kwargs)
+
+    def worker_for(self, key):
+        """ :returns: `int` index of the worker that flows submitted with the key run on
+        """
+        return zlib.crc32(repr(key).encode('utf-8')) % self.size
+
+    def _submit(self, i, page_class, flow, args, kwargs):
+        recorder = page_objects._recorder
+        future = Future()
+        with self._lock:
+            self._pending[i] += 1
+            worker = self._workers[i]
+        done = worker.submit(_run_in_worker, page_class, flow, args, kwargs,
+                             recorder is not None)
+        done.add_done_callback(lambda done: self._collect(i, done, future, recorder))
+        return future
+
+    def _collect(self, i, done, future, recorder):
+        with self._lock:
+            self._pending[i] -= 1
+        try:
+            value, result, stats = done.result()
+        except Exception as e:
+            # The worker died, or the flow's arguments or return value couldn't be pickled
+            future.set_exception(e)
+            return
+        result.driver = i
+        with self._lock:
+            self.results.append(result)
+        if stats is not None:
+            recorder.merge(stats)
+        if result.error is not None:
+            future.set_exception(result.error)
+        else:
+            future.set_result(value)
@@ -0,0 +1,302 @@
+""" Recording webdriver commands, and replaying them without a browser.
+
+    >>> from page_objects.replay import RecordingDriver, ReplayDriver
+    >>> driver = RecordingDriver(webdriver.Firefox())
+    >>> login(LoginPage(driver, root_uri='http://example.com'), 'alice')
+    >>> driver.save('login.json.gz')
+
+    >>> replay = ReplayDriver.load('login.json.gz')
+    >>> login(LoginPage(replay, root_uri='http://example.com'), 'alice')
+
+`RecordingDriver` passes every command through to the webdriver, and to the
+elements it returns, and logs it with its response. `ReplayDriver` answers the
+same commands from the log, so Page Object code can be run and benchmarked at
+memory speed on machines without a browser.
+
+Commands are matched on their element, name and arguments, keyword arguments
+included, apart from the unique names this package gives things in the browser.
+Repeated commands get their recorded responses in order, and then start again
+from the first, so a replayed flow can be run many times over. Commands that
+weren't recorded raise `ReplayError`.
+"""
+import base64
+import gzip
+import json
+import re
+import time
+
+from page_objects import exceptions
+
+# Version of the recording file format
+_FORMAT = 1
+
+# Unique names made by `page_objects._token`, which differ between runs
+_TOKEN = re.compile(r'__page_objects_[0-9a-f]{32}')
+
+
+class ReplayError(exceptions.WebDriverException):
+    """ A command was sent to a `ReplayDriver` that wasn't recorded.
+    """
+
+
+def _is_element(value):
+    return hasattr(type(value), 'find_element') and hasattr(value, 'id')
+
+
+def _open(path, mode):
+    if path.endswith('.gz'):
+        return gzip.open(path, mode + 't')
+    return open(path, mode)
+
+
+def _error(encoded):
+    cls = getattr(exceptions, encoded['__error__'], exceptions.WebDriverException)
+    return cls(encoded['message'])
+
+
+class _Recorded(object):
+    """ Proxy logging the commands sent to a webdriver or element.
+    """
+    def __init__(self, recorder, obj, ref):
+        self.__dict__.update(_recorder=recorder, _obj=obj, _ref=ref)
+
+    def __repr__(self):
+        return '<Recorded {0!r}>'.format(self._obj)
+
+    def __eq__(self, other):
+        return isinstance(other, _Recorded) and self._obj == other._obj
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __hash__(self):
+        return hash(self._obj)
+
+    def __getattr__(self, name):
+        if name.startswith('__'):
+            raise AttributeError(name)
+        recorder = self._recorder
+        started = time.time()
+        try:
+            value = getattr(self._obj, name)
+        except Exception as e:
+            recorder._log(self._ref, name, None, e, started)
+            raise
+        if not callable(value):
+            return recorder._log(self._ref, name, None, value, started)
+
+        def command(*args, **kwargs):
+            started = time.time()
+            try:
+                result = value(*recorder._unwrap(args), **recorder._unwrap(kwargs))
+            except Exception as e:
+                recorder._log(self._ref, name, args, e, started, kwargs)
+                raise
+            return recorder._log(self._ref, name, args, result, started, kwargs)
+        return command
+
+
+class RecordingDriver(_Recorded):
+    """ Webdriver wrapper logging every command, and its response, for `ReplayDriver`.
+
+    :param driver: `selenium.webdriver.WebDriver`
+        Webdriver to send the commands to
+    """
+    def __init__(self, driver):
+        _Recorded.__init__(self, self, driver, None)
+        self.__dict__.update(entries=[], _elements={})
+
+    def __repr__(self):
+        return '<RecordingDriver {0!r} commands={1}>'.format(self._obj, len(self.entries))
+
+    def save(self, path):
+        """ Write the recorded commands to a JSON file, compressed if the path
+            ends with ``.gz``.
+        """
+        with _open(path, 'w') as f:
+            json.dump({'format': _FORMAT, 'commands': self.entries}, f, separators=(',', ':'))
+
+    def _log(self, ref, name, args, result, started, kwargs=None):
+        duration = round(time.time() - started, 6)
+        args = None if args is None else self._encode(args)
+        if isinstance(result, Exception):
+            encoded = {'__error__': type(result).__name__, 'message': getattr(result, 'msg', None)
+                       or str(result)}
+        else:
+            encoded = self._encode(result)
+            result = self._wrap(result)
+        entry = [ref, name, args, encoded, duration]
+        if kwargs:
+            # Only commands with keyword arguments have them, as a last item
+            entry.append(self._encode(kwargs))
+        self.entries.append(entry)
+        return result
+
+    def _element(self, obj):
+        key = obj.id
+        if key not in self._elements:
+            self._elements[key] = _Recorded(self, obj, str(len(self._elements) + 1))
+        return self._elements[key]
+
+    def _encode(self, value):
+        if isinstance(value, _Recorded):
+            value = value._obj
+        if isinstance(value, (list, tuple)):
+            return [self._encode(v) for v in value]
+        if isinstance(value, dict):
+            return dict((k, self._encode(v)) for k, v in value.items())
+        if value is self._obj:
+            return {'__driver__': True}
+        if _is_element(value):
+            return {'__element__': self._element(value)._ref}
+        if isinstance(value, bytes) and not isinstance(value, str):
+            return {'__bytes__': base64.b64encode(value).decode('ascii')}
+        return value
+
+    def _wrap(self, value):
+        if isinstance(value, list):
+            return [self._wrap(v) for v in value]
+        if isinstance(value, dict):
+            return dict((k, self._wrap(v)) for k, v in value.items())
+        if value is self._obj:
+            return self
+        if _is_element(value):
+            return self._element(value)
+        return value
+
+    def _unwrap(self, value):
+        if isinstance(value, _Recorded):
+            return value._obj
+        if isinstance(value, (list, tuple)):
+            return type(value)(self._unwrap(v) for v in value)
+        if isinstance(value, dict):
+            return dict((k, self._unwrap(v)) for k, v in value.items())
+        return value
+
+
+class ReplayElement(object):
+    """ Element of a `ReplayDriver`, answering its commands from the recording.
+    """
+    def __init__(self, driver, ref):
+        self.__dict__.update(_driver=driver, _ref=ref)
+
+    def __repr__(self):
+        return '<ReplayElement {0}>'.format(self._ref)
+
+    def __getattr__(self, name):
+        return self._driver._answer(self._ref, name)
+
+
+class ReplayDriver(object):
+    """ Webdriver answering commands from a recording made with `RecordingDriver`.
+
+    :param commands: `list`
+        Recorded commands, as saved by ``RecordingDriver.save``
+    :param latency: `float`
+        Seconds to sleep for every command, to simulate a remote browser
+
+    Like `page_objects.testing.FakeWebDriver`, the commands sent are counted in
+    ``commands``. ``recorded_seconds`` adds up the time the recorded responses
+    took, to compare with the time taken by the replay.
+    """
+    def __init__(self, commands, latency=0.0):
+        self.__dict__.update(latency=latency, commands=[], recorded_seconds=0.0,
+                             _responses={}, _methods=set(), _served={}, _elements={})
+        for entry in commands:
+            ref, name, args, result, duration = entry[:5]
+            key = self._key(ref, name, args, entry[5] if len(entry) > 5 else None)
+            self._responses.setdefault(key, []).append((result, duration))
+            if args is not None:
+                self._methods.add((ref, name))
+
+    def __repr__(self):
+        return '<ReplayDriver commands={0}>'.format(len(self.commands))
+
+    @classmethod
+    def load(cls, path, latency=0.0):
+        """ Load a recording saved by ``RecordingDriver.save``.
+        """
+        with _open(path, 'r') as f:
+            recording = json.load(f)
+        if recording.get('format') != _FORMAT:
+            raise ValueError("Sorry, can't replay recordings in format %s"
+                             % recording.get('format'))
+        return cls(recording['commands'], latency=latency)
+
+    @property
+    def command_count(self):
+        """ Number of commands sent to the driver so far.
+        """
+        return len(self.commands)
+
+    def reset_commands(self):
+        del self.commands[:]
+
+    def __getattr__(self, name):
+        return self._answer(None, name)
+
+    def _key(self, ref, name, args, kwargs=None):
+        key = json.dumps([ref, name, args] + ([kwargs] if kwargs else []), sort_keys=True,
+                         separators=(',', ':'))
+        return _TOKEN.sub('__page_objects_', key)
+
+    def _answer(self, ref, name):
+        if name.startswith('__'):
+            raise AttributeError(name)
+        if (ref, name) in self._methods:
+            return lambda *args, **kwargs: self._respond(ref, name, self._encode(args),
+                                                         self._encode(kwargs))
+        if self._key(ref, name, None) in self._responses:
+            return self._respond(ref, name, None)
+        raise AttributeError(name)
+
+    def _respond(self, ref, name, args, kwargs=None):
+        key = self._key(ref, name, args, kwargs)
+        responses = self._responses.get(key)
+        if responses is None:
+            shown = [json.dumps(a)[:80] for a in args or []]
+            shown += ['%s=%s' % (k, json.dumps(v)[:80]) for k, v in sorted((kwargs or {}).items())]
+            raise ReplayError("Sorry, nothing was recorded for %s(%s)" % (name, ', '.join(shown)))
+        served = self._served.get(key, 0)
+        result, duration = responses[served % len(responses)]
+        self._served[key] = served + 1
+        error = isinstance(result, dict) and '__error__' in result
+        if error and result['__error__'] == 'AttributeError':
+            # Attributes the webdriver doesn't have, not commands sent to it
+            raise AttributeError(name)
+        self.commands.append(name)
+        self.recorded_seconds += duration
+        if self.latency:
+            time.sleep(self.latency)
+        if error:
+            raise _error(result)
+        return self._decode(result)
+
+    def _element(self, ref):
+        if ref not in self._elements:
+            self._elements[ref] = ReplayElement(self, ref)
+        return self._elements[ref]
+
+    def _encode(self, value):
+        if isinstance(value, ReplayElement):
+            return {'__element__': value._ref}
+        if isinstance(value, (list, tuple)):
+            return [self._encode(v) for v in value]
+        if isinstance(value, dict):
+            return dict((k, self._encode(v)) for k, v in value.items())
+        if value is self:
+            return {'__driver__': True}
+        return value
+
+    def _decode(self, value):
+        if isinstance(value, list):
+            return [self._decode(v) for v in value]
+        if isinstance(value, dict):
+            if '__element__' in value:
+                return self._element(value['__element__'])
+            if '__driver__' in value:
+                return self
+            if '__bytes__' in value:
+                return base64.b64decode(value['__bytes__'])
+            return dict((k, self._decode(v)) for k, v in value.items())
+        return value
@@ -0,0 +1,293 @@
+""" Read-only snapshots of a page, queried locally without round-trips to the browser.
+
+    >>> snap = page.snapshot()
+    >>> snap.price.text
+    '9.99'
+    >>> [a.get_attribute('href') for a in snap.links]
+    ['http://example.com/a', 'http://example.com/b']
+
+``PageObject.snapshot`` fetches the page's HTML with one call and returns a copy
+of the Page Object whose webdriver is a `SnapshotDriver` over the parsed HTML.
+Its Page Elements evaluate their locators with `page_objects.dom` and return
+`SnapshotElement` views, which have the read-only parts of the ``WebElement`` API.
+
+Snapshots don't know about stylesheets, so elements are only hidden by the
+``hidden`` attribute, an inline ``display: none`` style or being in the head.
+Form fields keep the values and checked or selected states they had when the
+snapshot was taken, as their ``value``, ``checked`` and ``selected`` attributes.
+"""
+try:
+    from urllib.parse import urljoin
+except ImportError:
+    from urlparse import urljoin
+
+import page_objects
+from page_objects import dom
+from page_objects.exceptions import (InvalidSelectorException, NoSuchElementException,
+                                     WebDriverException)
+
+# Attributes returned as 'true' or None by get_attribute
+_BOOLEAN_ATTRS = frozenset(['checked', 'selected', 'disabled', 'readonly', 'required',
+                            'multiple', 'hidden'])
+
+# Attributes returned as absolute URLs by get_attribute
+_URL_ATTRS = frozenset(['href', 'src', 'action'])
+
+
+def _attribute(node, name):
+    """ Attribute of a node as returned by ``get_attribute``.
+    """
+    if name in _BOOLEAN_ATTRS:
+        return 'true' if name in node.attrs else None
+    if name == 'value' and 'value' not in node.attrs and node.tag == 'input':
+        return ''
+    return node.attrs.get(name)
+
+
+def _displayed(node):
+    while node is not None and node.tag != '#document':
+        style = (node.attrs.get('style') or '').replace(' ', '')
+        if 'hidden' in node.attrs or 'display:none' in style or node.tag == 'head':
+            return False
+        node = node.parent
+    return True
+
+
+def _find(document, root, by, value, multi):
+    try:
+        found = dom.query(root if root is not None else document, by, value, multi)
+    except ValueError as e:
+        raise InvalidSelectorException(str(e))
+    if not multi and found is None:
+        raise NoSuchElementException('Unable to locate element: {0}={1}'.format(by, value))
+    return found
+
+
+class SnapshotElement(object):
+    """ Read-only view of an element in a `SnapshotDriver`.
+    """
+    __slots__ = ('parent', 'node')
+
+    def __init__(self, driver, node):
+        self.parent = driver
+        self.node = node
+
+    def __eq__(self, other):
+        return isinstance(other, SnapshotElement) and self.node is other.node
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __hash__(self):
+        return id(self.node)
+
+    def __repr__(self):
+        return '<SnapshotElement {0}>'.format(self.node.tag)
+
+    @property
+    def tag_name(self):
+        return self.node.tag
+
+    @property
+    def text(self):
+        return self.node.text if _displayed(self.node) else ''
+
+    def get_attribute(self, name):
+        return self.parent._attribute(self.node, name)
+
+    def get_dom_attribute(self, name):
+        return self.node.attrs.get(name)
+
+    def get_property(self, name):
+        return self.get_attribute(name)
+
+    def is_displayed(self):
+        return _displayed(self.node)
+
+    def is_enabled(self):
+        return 'disabled' not in self.node.attrs
+
+    def is_selected(self):
+        return 'checked' in self.node.attrs or 'selected' in self.node.attrs
+
+    def find_element(self, by, value):
+        return SnapshotElement(self.parent, _find(None, self.node, by, value, False))
+
+    def find_elements(self, by, value):
+        return [SnapshotElement(self.parent, n) for n in _find(None, self.node, by, value, True)]
+
+
+class SnapshotDriver(object):
+    """ Read-only webdriver over a snapshot of a page's HTML.
+
+    :param html: `str`
+        HTML of the page, or part of it
+    :param url: `str`
+        URL of the page, which relative links are resolved against
+    :param title: `str`
+        Title of the page
+    """
+    def __init__(self, html, url='about:blank', title=''):
+        self.document = dom.parse_html(html)
+        self.url = url
+        self.window = {}
+        self._title = title
+
+    def __repr__(self):
+        return '<SnapshotDriver {0}>'.format(self.url)
+
+    @property
+    def current_url(self):
+        return self.url
+
+    @property
+    def title(self):
+        return self._title
+
+    @property
+    def page_source(self):
+        return self.document.to_html()
+
+    def find_element(self, by, value):
+        return SnapshotElement(self, _find(self.document, None, by, value, False))
+
+    def find_elements(self, by, value):
+        return [SnapshotElement(self, n) for n in _find(self.document, None, by, value, True)]
+
+    def execute_script(self, script, *args):
+        """ Run one of the read-only scripts used by this package, by emulating
+            it in Python.
+        """
+        func = _SCRIPTS.get(script)
+        if func is None:
+            raise WebDriverException("Snapshots can't run scripts: {0}".format(script[:80]))
+        return self._to_elements(func(self, *self._to_nodes(args)))
+
+    def execute_async_script(self, script, *args):
+        return self.execute_script(script, *args)
+
+    def _attribute(self, node, name):
+        value = _attribute(node, name)
+        if name in _URL_ATTRS and value is not None:
+            return urljoin(self.url, value)
+        return value
+
+    def _scroll(self):
+        pass
+
+    def _to_nodes(self, value):
+        if isinstance(value, SnapshotElement):
+            return value.node
+        if isinstance(value, (list, tuple)):
+            return [self._to_nodes(v) for v in value]
+        return value
+
+    def _to_elements(self, value):
+        if isinstance(value, dom.Node):
+            return SnapshotElement(self, value)
+        if isinstance(value, list):
+            return [self._to_elements(v) for v in value]
+        return value
+
+
+# Script emulations ------------------------------------------------------
+
+def _js_find(driver, root, using, value, multi):
+    return dom.query(root if root is not None else driver.document, using, value, multi)
+
+
+def _resolve(driver, queries):
+    res = []
+    for root, using, value, multi in queries:
+        try:
+            res.append(_js_find(driver, root, using, value, multi))
+        except ValueError:
+            res.append(False)
+    return res
+
+
+def _ready(until):
+    return {'visible': _displayed,
+            'enabled': lambda n: 'disabled' not in n.attrs,
+            }.get(until, lambda n: True)
+
+
+def _wait(driver, root, using, value, multi, until, timeout):
+    # Snapshots don't change, so there's nothing to wait for
+    try:
+        found = _js_find(driver, root, using, value, multi)
+    except ValueError:
+        return False
+    if any(_ready(until)(n) for n in (found if multi else [found] if found else [])):
+        return found
+    return [] if multi else None
+
+
+def _chain(driver, root, steps, multi):
+    try:
+        for using, value in steps[:-1]:
+            root = _js_find(driver, root, using, value, False)
+            if root is None:
+                return [] if multi else None
+        return _js_find(driver, root, steps[-1][0], steps[-1][1], multi)
+    except ValueError:
+        return False
+
+
+def _exists(driver, root, using, value):
+    try:
+        return _js_find(driver, root, using, value, False) is not None
+    except ValueError:
+        return None
+
+
+def _read(driver, node, field):
+    if field == 'text':
+        return node.text if _displayed(node) else ''
+    if field == 'tag_name':
+        return node.tag
+    return driver._attribute(node, field)
+
+
+def _extract(driver, root, nodes, using, value, fields, multi):
+    if nodes is None:
+        try:
+            nodes = _js_find(driver, root, using, value, multi)
+        except ValueError:
+            return False
+        if not multi:
+            nodes = [nodes] if nodes is not None else []
+    return [[_read(driver, n, field) for n in nodes] for field in fields]
+
+
+def _iter(driver, root, using, value, token, batch, key, scroll):
+    try:
+        nodes = _js_find(driver, root, using, value, True)
+    except ValueError:
+        return False
+    seen = driver.window.setdefault(token, set())
+    found = []
+    for node in nodes:
+        if len(found) == batch:
+            break
+        if key is None:
+            value = id(node)
+        elif key == 'text':
+            value = node.text
+        else:
+            value = node.attrs.get(key)
+        if value not in seen:
+            seen.add(value)
+            found.append(node)
+    if scroll and len(found) < batch and nodes:
+        driver._scroll()
+    return found
+
+
+_SCRIPTS = {page_objects._RESOLVE_SCRIPT: _resolve,
+            page_objects._WAIT_SCRIPT: _wait,
+            page_objects._CHAIN_SCRIPT: _chain,
+            page_objects._EXISTS_SCRIPT: _exists,
+            page_objects._EXTRACT_SCRIPT: _extract,
+            page_objects._ITER_SCRIPT: _iter,
+            }
@@ -0,0 +1,482 @@
+""" Fake webdriver for testing and benchmarking Page Objects without a browser.
+
+    >>> from page_objects.testing import FakeWebDriver, make_page
+    >>> driver = FakeWebDriver(make_page(rows=1000), latency=0.002)
+    >>> page = MyPage(driver)
+    >>> page.rows
+    >>> driver.command_count
+    1
+
+`FakeWebDriver` serves documents parsed with `page_objects.dom` and counts every
+command sent to it, optionally sleeping to simulate the round-trip to a remote
+browser. It can't run arbitrary Javascript; instead the scripts used by this
+package are emulated in Python, and others can be added with ``add_script``.
+"""
+import itertools
+import time
+import uuid
+
+import page_objects
+from page_objects import checkpoint, dom, pool, snapshot
+from page_objects.exceptions import (InvalidSelectorException, NoSuchElementException,
+                                     StaleElementReferenceException, WebDriverException)
+from page_objects.snapshot import _displayed, _js_find
+
+
+def make_page(rows=100, fields=20):
+    """ Generate an HTML page with a form and a table, for benchmarks.
+
+    :param rows: `int`
+        Number of rows in the ``table#rows`` table. Each ``tr.row`` has a ``td.name``,
+        a ``td.value`` and a ``td.link`` with a link.
+    :param fields: `int`
+        Number of text inputs in ``form#form``, with IDs of ``field-0``, ``field-1``, ...
+        and names of ``field0``, ``field1``, ...
+    """
+    parts = ['<html><head><title>Fake Page</title></head><body>',
+             '<div id="header"><a href="/">Home</a><span class="status">ok</span></div>',
+             '<form id="form">']
+    for i in range(fields):
+        parts.append('<label>Field {0}<input type="text" id="field-{0}" name="field{0}">'
+                     '</label>'.format(i))
+    parts.append('<input type="submit" id="submit"></form><table id="rows">')
+    for i in range(rows):
+        parts.append('<tr class="row" data-id="{0}"><td class="name">Row {0}</td>'
+                     '<td class="value">{1}</td><td class="link"><a href="/rows/{0}">View</a>'
+                     '</td></tr>'.format(i, i * 10))
+    parts.append('</table><div id="footer">Footer</div></body></html>')
+    return ''.join(parts)
+
+
+class FakeWebElement(object):
+    """ Element returned by `FakeWebDriver`, with the common parts of the Selenium
+        ``WebElement`` API.
+    """
+    def __init__(self, driver, node):
+        self.parent = driver
+        self.node = node
+
+    def __eq__(self, other):
+        return isinstance(other, FakeWebElement) and self.node is other.node
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __hash__(self):
+        return id(self.node)
+
+    def __repr__(self):
+        return '<FakeWebElement {0} id={1}>'.format(self.node.tag, self.id)
+
+    @property
+    def id(self):
+        return self.parent._element_id(self.node)
+
+    def _command(self, name):
+        self.parent._command(name)
+        self.parent._check_attached(self.node)
+
+    @property
+    def tag_name(self):
+        self._command('tag_name')
+        return self.node.tag
+
+    @property
+    def text(self):
+        self._command('text')
+        return self.node.text if _displayed(self.node) else ''
+
+    def get_attribute(self, name):
+        self._command('get_attribute')
+        return snapshot._attribute(self.node, name)
+
+    def get_dom_attribute(self, name):
+        self._command('get_dom_attribute')
+        return self.node.attrs.get(name)
+
+    def get_property(self, name):
+        self._command('get_property')
+        return snapshot._attribute(self.node, name)
+
+    def is_displayed(self):
+        self._command('is_displayed')
+        return _displayed(self.node)
+
+    def is_enabled(self):
+        self._command('is_enabled')
+        return 'disabled' not in self.node.attrs
+
+    def is_selected(self):
+        self._command('is_selected')
+        return 'checked' in self.node.attrs or 'selected' in self.node.attrs
+
+    @property
+    def rect(self):
+        self._command('rect')
+        return self.parent._layout(self.node)
+
+    @property
+    def location(self):
+        rect = self.rect
+        return {'x': rect['x'], 'y': rect['y']}
+
+    @property
+    def size(self):
+        rect = self.rect
+        return {'width': rect['width'], 'height': rect['height']}
+
+    def click(self):
+        self._command('click')
+        attrs = self.node.attrs
+        if self.node.tag == 'input' and attrs.get('type') in ('checkbox', 'radio'):
+            if 'checked' in attrs:
+                del attrs['checked']
+            else:
+                attrs['checked'] = ''
+        elif self.node.tag == 'a' and attrs.get('href') in self.parent.pages:
+            self.parent._navigate(attrs['href'])
+
+    def send_keys(self, *value):
+        self._command('send_keys')
+        self.node.attrs['value'] = (self.node.attrs.get('value') or '') + ''.join(map(str, value))
+
+    def clear(self):
+        self._command('clear')
+        self.node.attrs['value'] = ''
+
+    def find_element(self, by, value):
+        self._command('find_element')
+        return self.parent._find(self.node, by, value, multi=False)
+
+    def find_elements(self, by, value):
+        self._command('find_elements')
+        return self.parent._find(self.node, by, value, multi=True)
+
+
+class FakeWebDriver(object):
+    """ Fake webdriver serving HTML documents from memory.
+
+    :param html: `str`
+        The initial document
+    :param pages: `dict`
+        URL -> HTML for documents loaded by ``get()``. Values can also be callables
+        returning the HTML. Unknown URLs load an empty document.
+    :param latency: `float`
+        Seconds to sleep for every command, to simulate a remote browser
+
+    Set ``on_scroll`` to a callable to have it called with the driver when a
+    script scrolls to the end of a list, for example to add more items to
+    ``driver.document``. ``window`` holds the script globals of the document,
+    and ``devtools`` the last parameters sent with each DevTools command.
+    """
+    def __init__(self, html='', pages=None, latency=0.0):
+        self.pages = pages if pages is not None else {}
+        self.latency = latency
+        self.commands = []
+        self.session_id = uuid.uuid4().hex
+        self.cookies = []
+        self.local_storage = {}
+        self.session_storage = {}
+        self.implicit_wait = 0
+        self.window = {}
+        self.on_scroll = None
+        self.devtools = {}
+        self.scripts = dict(_SCRIPTS)
+        self._ids = {}
+        self._counter = itertools.count(1)
+        self._url = 'about:blank'
+        self._load(html)
+
+    # Bookkeeping --------------------------------------------------------
+
+    @property
+    def command_count(self):
+        """ Number of commands sent to the driver so far.
+        """
+        return len(self.commands)
+
+    def reset_commands(self):
+        del self.commands[:]
+
+    def _command(self, name):
+        self.commands.append(name)
+        if self.latency:
+            time.sleep(self.latency)
+
+    def add_script(self, script, func):
+        """ Emulate a script for ``execute_script``.
+
+        :param script: `str`
+            The exact script text
+        :param func: `callable`
+            Called with the driver and the script arguments, with elements as `dom.Node`.
+            Any nodes in the return value are converted to elements.
+        """
+        self.scripts[script] = func
+
+    def _load(self, html):
+        self.document = dom.parse_html(html)
+        self.window = {}
+        self._order = None
+
+    def _navigate(self, url):
+        self._url = url
+        html = self.pages.get(url, '')
+        self._load(html() if callable(html) else html)
+
+    def _element_id(self, node):
+        if id(node) not in self._ids:
+            self._ids[id(node)] = (node, str(next(self._counter)))
+        return self._ids[id(node)][1]
+
+    def _check_attached(self, node):
+        if node.root is not self.document:
+            raise StaleElementReferenceException('Element is no longer attached to the DOM')
+
+    def _find(self, root, by, value, multi):
+        try:
+            found = dom.query(root, by, value, multi)
+        except ValueError as e:
+            raise InvalidSelectorException(str(e))
+        if not found and self.implicit_wait:
+            time.sleep(self.implicit_wait)
+        if multi:
+            return [FakeWebElement(self, n) for n in found]
+        if found is None:
+            raise NoSuchElementException('Unable to locate element: {0}={1}'.format(by, value))
+        return FakeWebElement(self, found)
+
+    def _layout(self, node):
+        # Stack every element vertically in document order
+        if self._order is None:
+            self._order = dict((id(n), i) for i, n in enumerate(self.document.iter()))
+        return {'x': 0, 'y': self._order.get(id(node), 0) * 20, 'width': 800, 'height': 20}
+
+    def _attribute(self, node, name):
+        return snapshot._attribute(node, name)
+
+    def _scroll(self):
+        if self.on_scroll is not None:
+            self.on_scroll(self)
+
+    def _to_nodes(self, value):
+        if isinstance(value, FakeWebElement):
+            self._check_attached(value.node)
+            return value.node
+        if isinstance(value, (list, tuple)):
+            return [self._to_nodes(v) for v in value]
+        if isinstance(value, dict):
+            return dict((k, self._to_nodes(v)) for k, v in value.items())
+        return value
+
+    def _to_elements(self, value):
+        if isinstance(value, dom.Node):
+            return FakeWebElement(self, value)
+        if isinstance(value, (list, tuple)):
+            return [self._to_elements(v) for v in value]
+        if isinstance(value, dict):
+            return dict((k, self._to_elements(v)) for k, v in value.items())
+        return value
+
+    # WebDriver API ------------------------------------------------------
+
+    def get(self, url):
+        self._command('get')
+        self._navigate(url)
+
+    def refresh(self):
+        self._command('refresh')
+        self._navigate(self._url)
+
+    @property
+    def current_url(self):
+        self._command('current_url')
+        return self._url
+
+    @property
+    def title(self):
+        self._command('title')
+        title = dom.query(self.document, 'tag name', 'title', multi=False)
+        return title.text_content.strip() if title is not None else ''
+
+    @property
+    def page_source(self):
+        self._command('page_source')
+        return self.document.to_html()
+
+    def implicitly_wait(self, seconds):
+        self._command('implicitly_wait')
+        self.implicit_wait = seconds
+
+    def find_element(self, by, value):
+        self._command('find_element')
+        return self._find(self.document, by, value, multi=False)
+
+    def find_elements(self, by, value):
+        self._command('find_elements')
+        return self._find(self.document, by, value, multi=True)
+
+    def execute_script(self, script, *args):
+        self._command('execute_script')
+        func = self.scripts.get(script)
+        if func is None:
+            raise WebDriverException("FakeWebDriver can't run this script: {0}".format(script[:80]))
+        return self._to_elements(func(self, *self._to_nodes(args)))
+
+    def execute_async_script(self, script, *args):
+        self._command('execute_async_script')
+        func = self.scripts.get(script)
+        if func is None:
+            raise WebDriverException("FakeWebDriver can't run this script: {0}".format(script[:80]))
+        return self._to_elements(func(self, *self._to_nodes(args)))
+
+    def execute_cdp_cmd(self, cmd, params):
+        self._command('execute_cdp_cmd')
+        self.devtools[cmd] = params
+        return {}
+
+    def get_cookies(self):
+        self._command('get_cookies')
+        return [dict(c) for c in self.cookies]
+
+    def add_cookie(self, cookie):
+        self._command('add_cookie')
+        self.cookies = [c for c in self.cookies if c['name'] != cookie['name']] + [dict(cookie)]
+
+    def delete_all_cookies(self):
+        self._command('delete_all_cookies')
+        del self.cookies[:]
+
+    def quit(self):
+        self._command('quit')
+
+
+# Script emulations, on top of the read-only ones from snapshots ---------
+
+def _set_value(node, value):
+    if isinstance(value, bool):
+        if value:
+            node.attrs['checked'] = ''
+        else:
+            node.attrs.pop('checked', None)
+    else:
+        node.attrs['value'] = str(value)
+
+
+def _fill(driver, queries):
+    found = []
+    for target, using, value, multi, _ in queries:
+        if target is None:
+            try:
+                target = _js_find(driver, None, using, value, multi)
+            except ValueError:
+                target = False
+        found.append(target)
+    ok = all(found)
+    if ok:
+        for query, target in zip(queries, found):
+            for node in (target if query[3] else [target]):
+                _set_value(node, query[4])
+    return [found, ok]
+
+
+def _wait(driver, root, using, value, multi, until, timeout):
+    # Check the document until it's ready or the timeout, without sending commands
+    ready = snapshot._ready(until)
+    deadline = time.time() + timeout / 1000.0
+    while True:
+        try:
+            found = _js_find(driver, root, using, value, multi)
+        except ValueError:
+            return False
+        if any(ready(n) for n in (found if multi else [found] if found else [])):
+            return found
+        if time.time() >= deadline:
+            return [] if multi else None
+        time.sleep(0.01)
+
+
+def _snapshot(driver, root, using, value):
+    if root is None:
+        root = driver.document.elements[0] if using is None else \
+            _js_find(driver, None, using, value, False)
+    title = dom.query(driver.document, 'tag name', 'title', multi=False)
+    return [root.to_html() if root is not None else None, driver._url,
+            title.text_content.strip() if title is not None else '']
+
+
+def _navigate(driver, url, token, history):
+    if history:
+        # Single-page apps route in place, so only the URL changes
+        driver._url = url
+        return
+    driver.window[token] = True
+    driver._navigate(url)
+
+
+def _loaded(driver, token):
+    return token not in driver.window
+
+
+def _watched(driver, queries, field):
+    values = []
+    for _, using, value, multi in queries:
+        try:
+            found = _js_find(driver, None, using, value, multi)
+        except ValueError:
+            values.append(None)
+            continue
+        if multi:
+            values.append([snapshot._read(driver, n, field) for n in found])
+        else:
+            values.append(snapshot._read(driver, found, field) if found is not None else None)
+    return values
+
+
+def _watch(driver, token, queries, field):
+    # Without mutation events, changes are found by comparing values when drained
+    values = _watched(driver, queries, field)
+    driver.window[token] = (queries, field, values)
+    return values
+
+
+def _drain(driver, token, stop):
+    if token not in driver.window:
+        return None
+    queries, field, values = driver.window[token]
+    now = time.time() * 1000
+    current = _watched(driver, queries, field)
+    events = [[q[0], old, new, now] for q, old, new in zip(queries, values, current) if old != new]
+    if stop:
+        del driver.window[token]
+    else:
+        driver.window[token] = (queries, field, current)
+    return events
+
+
+def _save_state(driver):
+    return [driver._url, dict(driver.local_storage), dict(driver.session_storage)]
+
+
+def _restore_state(driver, local_storage, session_storage):
+    driver.local_storage = dict(local_storage)
+    driver.session_storage = dict(session_storage)
+
+
+def _reset(driver):
+    driver.local_storage.clear()
+    driver.session_storage.clear()
+
+
+_SCRIPTS = dict(snapshot._SCRIPTS)
+_SCRIPTS.update({page_objects._FILL_SCRIPT: _fill,
+                 page_objects._WAIT_SCRIPT: _wait,
+                 page_objects._SNAPSHOT_SCRIPT: _snapshot,
+                 page_objects._NAVIGATE_SCRIPT: _navigate,
+                 page_objects._LOADED_SCRIPT: _loaded,
+                 page_objects._WATCH_SCRIPT: _watch,
+                 page_objects._DRAIN_SCRIPT: _drain,
+                 pool._RESET_SCRIPT: _reset,
+                 checkpoint._SAVE_SCRIPT: _save_state,
+                 checkpoint._RESTORE_SCRIPT: _restore_state,
+                 })
@@ -0,0 +1,235 @@
+""" Visual checks of Page Elements against baseline screenshots.
+
+    >>> from page_objects.visual import BaselineStore
+    >>> baselines = BaselineStore('tests/baselines', threshold=8)
+    >>> comparison = baselines.check(page, 'header')
+    >>> assert comparison.ok, comparison
+
+``BaselineStore.check`` captures the element with ``PageObject.capture`` and
+compares it with the baseline saved for the page class and element name, saving
+the capture as the baseline if there isn't one yet. Images are compared in
+square tiles. A checksum of every baseline tile is saved next to the baseline,
+so tiles that haven't changed are skipped without loading the baseline image,
+and only the tiles that have are diffed pixel by pixel.
+
+This module needs numpy and Pillow, which are installed with the ``visual``
+extra: ``pip install page-objects[visual]``.
+"""
+import io
+import json
+import os
+import zlib
+
+import numpy
+from PIL import Image
+
+# Width and height of the tiles images are compared in, in pixels
+TILE_SIZE = 32
+
+
+def decode(png):
+    """ :returns: `numpy.ndarray` of RGBA pixels of a PNG image, with shape
+        ``(height, width, 4)``
+    """
+    with Image.open(io.BytesIO(png)) as image:
+        return numpy.asarray(image.convert('RGBA'))
+
+
+def encode(pixels):
+    """ :returns: `bytes` of a PNG image of an array of RGBA pixels
+    """
+    out = io.BytesIO()
+    Image.fromarray(numpy.ascontiguousarray(pixels, dtype=numpy.uint8), 'RGBA').save(out, 'PNG')
+    return out.getvalue()
+
+
+def _tiles(shape, size):
+    height, width = shape[:2]
+    for y in range(0, height, size):
+        for x in range(0, width, size):
+            yield y, x
+
+
+def tile_digests(pixels, size=TILE_SIZE):
+    """ :returns: `list` of rows of CRC-32 checksums of the image's tiles
+    """
+    height, width = pixels.shape[:2]
+    return [[zlib.crc32(pixels[y:y + size, x:x + size].tobytes()) & 0xffffffff
+             for x in range(0, width, size)]
+            for y in range(0, height, size)]
+
+
+def diff(a, b, threshold=0):
+    """ :returns: `numpy.ndarray` of bools, true for pixels of two images of the
+        same size with a channel that differs by more than the threshold
+    """
+    delta = numpy.abs(a.astype(numpy.int16) - b.astype(numpy.int16))
+    return (delta > threshold).any(axis=-1)
+
+
+class Comparison(object):
+    """ Result of comparing a capture with its baseline.
+
+    :param key: `tuple`
+        ``(page class name, baseline name)``
+    :param size: `tuple`
+        ``(width, height)`` of the capture
+    :param changed_pixels: `int`
+        Number of pixels that differ from the baseline
+    :param changed_tiles: `list`
+        ``(x, y, width, height)`` of the tiles with changed pixels
+    :param tolerance: `float`
+        Fraction of the pixels allowed to change
+    :param new: `bool`
+        There was no baseline, so the capture was saved as the baseline
+    :param baseline_size: `tuple`
+        ``(width, height)`` of the baseline, if different from the capture
+    """
+    def __init__(self, key, size, changed_pixels=0, changed_tiles=(), tolerance=0.0, new=False,
+                 baseline_size=None):
+        self.key = key
+        self.size = size
+        self.changed_pixels = changed_pixels
+        self.changed_tiles = list(changed_tiles)
+        self.tolerance = tolerance
+        self.new = new
+        self.baseline_size = baseline_size or size
+
+    def __repr__(self):
+        if self.baseline_size != self.size:
+            state = 'size {0[0]}x{0[1]} != baseline {1[0]}x{1[1]}'.format(self.size,
+                                                                          self.baseline_size)
+        else:
+            state = '{0} pixels changed in {1} tiles'.format(self.changed_pixels,
+                                                             len(self.changed_tiles))
+        return '<Comparison {0}.{1} {2}>'.format(self.key[0], self.key[1], state)
+
+    @property
+    def ratio(self):
+        """ Fraction of the capture's pixels that differ from the baseline.
+        """
+        width, height = self.size
+        return float(self.changed_pixels) / (width * height) if width and height else 0.0
+
+    @property
+    def ok(self):
+        return self.baseline_size == self.size and self.ratio <= self.tolerance
+
+
+class BaselineStore(object):
+    """ Baseline captures of Page Elements in a directory, keyed by page class
+        and element name.
+
+    :param directory: `str`
+        Directory to keep the baselines in, as ``PageClass/name.png``
+    :param threshold: `int`
+        Differences in a pixel's channels up to this are ignored, to allow for
+        anti-aliasing and other rendering noise
+    :param tolerance: `float`
+        Fraction of the pixels allowed to change before a comparison fails
+    :param update: `bool`
+        Replace the baselines with the captures instead of comparing them
+    :param tile_size: `int`
+        Width and height of the tiles images are compared in
+    """
+    def __init__(self, directory, threshold=0, tolerance=0.0, update=False, tile_size=TILE_SIZE):
+        self.directory = directory
+        self.threshold = threshold
+        self.tolerance = tolerance
+        self.update = update
+        self.tile_size = tile_size
+
+    def __repr__(self):
+        return '<BaselineStore {0}>'.format(self.directory)
+
+    def path(self, page_class, name):
+        """ :returns: `str` path of the baseline image for a page class and name
+        """
+        return os.path.join(self.directory, page_class.__name__, name + '.png')
+
+    def check(self, page, name, context=None, baseline=None):
+        """ Capture a Page Element and compare it with its baseline.
+
+        :param page: `PageObject`
+            Page Object with the element
+        :param name: `str`
+            Name of the Page Element
+        :param context: Element to look in, for Page Elements with context
+        :param baseline: `str`
+            Name of the baseline, if not the element's name, such as to keep
+            baselines of an element in different states or contexts
+        :returns: `Comparison`
+        """
+        png = page.capture(name, context)
+        return self.compare(page.__class__, baseline or name, png)
+
+    def compare(self, page_class, name, png):
+        """ Compare a PNG image with a baseline, or save it as the baseline if
+            there isn't one yet.
+
+        :returns: `Comparison`
+        """
+        key = (page_class.__name__, name)
+        pixels = decode(png)
+        height, width = pixels.shape[:2]
+        path = self.path(page_class, name)
+        if self.update or not os.path.exists(path):
+            self._save(path, png, pixels)
+            return Comparison(key, (width, height), tolerance=self.tolerance, new=True)
+
+        digests = self._digests(path)
+        if digests['size'] != [width, height]:
+            return Comparison(key, (width, height), width * height, tolerance=self.tolerance,
+                              baseline_size=tuple(digests['size']))
+        size = self.tile_size
+        current = tile_digests(pixels, size)
+        changed = [(y, x) for (y, x), old, new in zip(_tiles(pixels.shape, size),
+                                                      _flatten(digests['tiles']),
+                                                      _flatten(current))
+                   if old != new]
+        changed_pixels = 0
+        changed_tiles = []
+        if changed:
+            with open(path, 'rb') as f:
+                baseline = decode(f.read())
+            for y, x in changed:
+                tile = numpy.s_[y:y + size, x:x + size]
+                count = int(diff(pixels[tile], baseline[tile], self.threshold).sum())
+                if count:
+                    changed_pixels += count
+                    changed_tiles.append((x, y, min(size, width - x), min(size, height - y)))
+        return Comparison(key, (width, height), changed_pixels, changed_tiles, self.tolerance)
+
+    def _save(self, path, png, pixels):
+        directory = os.path.dirname(path)
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+        with open(path, 'wb') as f:
+            f.write(png)
+        self._write_digests(path, pixels)
+
+    def _write_digests(self, path, pixels):
+        height, width = pixels.shape[:2]
+        digests = {'size': [width, height], 'tile_size': self.tile_size,
+                   'tiles': tile_digests(pixels, self.tile_size)}
+        with open(path[:-len('.png')] + '.json', 'w') as f:
+            json.dump(digests, f, separators=(',', ':'))
+        return digests
+
+    def _digests(self, path):
+        """ Tile checksums of a baseline, recomputed if they're missing or for
+            another tile size.
+        """
+        try:
+            with open(path[:-len('.png')] + '.json') as f:
+                digests = json.load(f)
+            if digests.get('tile_size') == self.tile_size:
+                return digests
+        except (IOError, OSError, ValueError):
+            pass
+        with open(path, 'rb') as f:
+            return self._write_digests(path, decode(f.read()))
+
+
+def _flatten(rows):
+    return [value for row in rows for value in row]
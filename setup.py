@@ -1,5 +1,6 @@
 #!/usr/bin/env python
 import os
+import sys
 from codecs import open
 
 try:
@@ -18,6 +19,8 @@ with open('CHANGES.rst', 'r', 'utf-8') as f:
     changes = f.read()
 
 requires = ['selenium']
+if sys.version_info < (3,):
+    requires.append('futures')
 
 setup(
     name='page-objects',
@@ -48,5 +51,6 @@ setup(
         'Topic :: Software Development :: Testing',
     ),
     extras_require={
+        'visual': ['numpy', 'Pillow'],
     },
 )
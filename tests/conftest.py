@@ -0,0 +1,6 @@
+import sys
+
+# The asyncio Page Objects use async/await and asyncio.run
+collect_ignore = []
+if sys.version_info < (3, 7):
+    collect_ignore.append('test_aio.py')
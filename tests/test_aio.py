@@ -0,0 +1,341 @@
+import asyncio
+import json
+import subprocess
+import sys
+import textwrap
+
+import pytest
+
+from selenium.common.exceptions import NoSuchElementException, StaleElementReferenceException
+
+from page_objects.aio import (AsyncPageObject, AsyncPageElement, AsyncMultiPageElement,
+                              AsyncWebDriver, AsyncWebElement, HTTPTransport, _ELEMENT_KEY)
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def ref(id_):
+    return {_ELEMENT_KEY: id_}
+
+
+class FakeTransport(object):
+    """ Transport returning canned responses for (method, path) pairs.
+    """
+    def __init__(self, responses):
+        self.responses = responses
+        self.requests = []
+        self.closed = False
+
+    async def request(self, method, path, body=None):
+        self.requests.append((method, path, body))
+        value = self.responses.get((method, path))
+        if isinstance(value, Exception):
+            raise value
+        return {'value': value}
+
+    async def close(self):
+        self.closed = True
+
+
+def no_such_element():
+    return {'error': 'no such element', 'message': 'not found'}
+
+
+class TestPage(AsyncPageObject):
+    username = AsyncPageElement(id_='user')
+    rows = AsyncMultiPageElement(css='tr')
+    cell = AsyncPageElement(tag_name='td', context=True)
+    link = AsyncPageElement(link_text='Home')
+
+
+class WaitPage(AsyncPageObject):
+    ready = AsyncPageElement(css='#ready', wait=2, until='visible')
+    link = AsyncPageElement(link_text='Home', wait=2, until='enabled')
+    rows = AsyncMultiPageElement(css='tr', wait=0.01)
+
+
+class ParentPage(AsyncPageObject):
+    form = AsyncPageElement(id_='form')
+    input = AsyncPageElement(name='user', parent=form)
+    section = AsyncPageElement(css='div.section')
+    header = AsyncPageElement(css='h1', parent=section)
+
+
+class TestAsyncPageObject:
+
+    def test_get(self):
+        transport = FakeTransport({})
+        page = TestPage(AsyncWebDriver(transport, 's1'), root_uri='http://example.com')
+        run(page.get('/login'))
+        assert transport.requests == [
+            ('POST', '/session/s1/url', {'url': 'http://example.com/login'})]
+
+    def test_get_element(self):
+        transport = FakeTransport({('POST', '/session/s1/element'): ref('e1')})
+        page = TestPage(AsyncWebDriver(transport, 's1'))
+        elem = run(page.username)
+        assert elem == AsyncWebElement(page.w, 'e1')
+        assert transport.requests == [
+            ('POST', '/session/s1/element', {'using': 'css selector', 'value': '[id="user"]'})]
+
+    def test_link_text_passed_through(self):
+        transport = FakeTransport({('POST', '/session/s1/element'): ref('e1')})
+        page = TestPage(AsyncWebDriver(transport, 's1'))
+        run(page.link)
+        assert transport.requests[0][2] == {'using': 'link text', 'value': 'Home'}
+
+    def test_get_not_found(self):
+        transport = FakeTransport({('POST', '/session/s1/element'): no_such_element()})
+        page = TestPage(AsyncWebDriver(transport, 's1'))
+        assert run(page.username) is None
+
+    def test_get_multi(self):
+        transport = FakeTransport({('POST', '/session/s1/elements'): [ref('e1'), ref('e2')]})
+        page = TestPage(AsyncWebDriver(transport, 's1'))
+        assert [e.id for e in run(page.rows)] == ['e1', 'e2']
+
+    def test_get_with_context(self):
+        transport = FakeTransport({('POST', '/session/s1/element/e1/element'): ref('e2')})
+        page = TestPage(AsyncWebDriver(transport, 's1'))
+        row = AsyncWebElement(page.w, 'e1')
+        assert run(page.cell(row)).id == 'e2'
+        assert transport.requests == [
+            ('POST', '/session/s1/element/e1/element', {'using': 'css selector', 'value': 'td'})]
+
+    def test_set(self):
+        transport = FakeTransport({('POST', '/session/s1/element'): ref('e1')})
+        page = TestPage(AsyncWebDriver(transport, 's1'))
+        run(page.set('username', 'secret'))
+        assert transport.requests[-1] == ('POST', '/session/s1/element/e1/value',
+                                          {'text': 'secret'})
+
+    def test_set_multi(self):
+        transport = FakeTransport({('POST', '/session/s1/elements'): [ref('e1'), ref('e2')]})
+        page = TestPage(AsyncWebDriver(transport, 's1'))
+        run(page.set('rows', 'x'))
+        assert sorted(r[1] for r in transport.requests[1:]) == [
+            '/session/s1/element/e1/value', '/session/s1/element/e2/value']
+
+    def test_set_not_found(self):
+        transport = FakeTransport({('POST', '/session/s1/element'): no_such_element()})
+        page = TestPage(AsyncWebDriver(transport, 's1'))
+        with pytest.raises(ValueError) as e:
+            run(page.set('username', 'secret'))
+        assert "element not found" in e.value.args[0]
+
+    def test_set_with_context(self):
+        page = TestPage(AsyncWebDriver(FakeTransport({}), 's1'))
+        with pytest.raises(ValueError):
+            run(page.set('cell', 'x'))
+
+    def test_set_attribute(self):
+        page = TestPage(AsyncWebDriver(FakeTransport({}), 's1'))
+        with pytest.raises(AttributeError):
+            page.username = 'x'
+
+    def test_lazy(self):
+        with pytest.raises(ValueError):
+            AsyncPageElement(id_='foo', lazy=True)
+        with pytest.raises(ValueError):
+            AsyncMultiPageElement(css='tr', lazy=True)
+
+    def test_page_elements(self):
+        assert [(e.name, e.kind) for e in TestPage.page_elements()] == [
+            ('cell', 'single'), ('link', 'single'), ('rows', 'multi'), ('username', 'single')]
+
+    def test_wait_in_browser(self):
+        transport = FakeTransport({('POST', '/session/s1/execute/async'): ref('e1')})
+        page = WaitPage(AsyncWebDriver(transport, 's1'))
+        assert run(page.ready).id == 'e1'
+        [(method, path, body)] = transport.requests
+        assert body['args'] == [None, 'css selector', '#ready', False, 'visible', 2000]
+
+    def test_wait_falls_back_to_polling(self):
+        transport = FakeTransport({
+            ('POST', '/session/s1/element'): ref('e1'),
+            ('GET', '/session/s1/element/e1/enabled'): True,
+        })
+        page = WaitPage(AsyncWebDriver(transport, 's1'))
+        assert run(page.link).id == 'e1'
+        assert [r[1] for r in transport.requests] == ['/session/s1/element',
+                                                      '/session/s1/element/e1/enabled']
+
+    def test_wait_timeout(self):
+        transport = FakeTransport({
+            ('POST', '/session/s1/execute/async'): {'error': 'script timeout',
+                                                    'message': 'timed out'},
+            ('POST', '/session/s1/elements'): [],
+        })
+        page = WaitPage(AsyncWebDriver(transport, 's1'))
+        assert run(page.rows) == []
+        assert len(transport.requests) > 1
+
+    def test_parent(self):
+        transport = FakeTransport({
+            ('POST', '/session/s1/element'): ref('e1'),
+            ('POST', '/session/s1/element/e1/element'): ref('e2'),
+        })
+        page = ParentPage(AsyncWebDriver(transport, 's1'))
+        assert run(page.input).id == 'e1'
+        assert transport.requests[0][2] == {'using': 'css selector',
+                                            'value': '[id="form"] [name="user"]'}
+        assert run(page.header).id == 'e2'
+        assert [r[2]['value'] for r in transport.requests[1:]] == ['div.section', 'h1']
+
+    def test_concurrent_sessions(self):
+        transports = [FakeTransport({('POST', '/session/s{0}/element'.format(i)): ref('e')})
+                      for i in range(10)]
+        pages = [TestPage(AsyncWebDriver(t, 's{0}'.format(i))) for i, t in enumerate(transports)]
+
+        async def main():
+            return await asyncio.gather(*[page.username for page in pages])
+        assert len(run(main())) == 10
+
+
+class TestAsyncWebDriver:
+
+    def test_start(self):
+        transport = FakeTransport({('POST', '/session'): {'sessionId': 'abc', 'capabilities': {}}})
+        driver = run(AsyncWebDriver.start(transport, {'browserName': 'firefox'}))
+        assert driver.session_id == 'abc'
+        assert transport.requests[0][2] == {
+            'capabilities': {'alwaysMatch': {'browserName': 'firefox'}}}
+
+    def test_errors(self):
+        transport = FakeTransport({
+            ('GET', '/session/s1/element/e1/text'): {'error': 'stale element reference',
+                                                     'message': 'gone'}})
+        elem = AsyncWebElement(AsyncWebDriver(transport, 's1'), 'e1')
+        with pytest.raises(StaleElementReferenceException):
+            run(elem.text)
+        with pytest.raises(NoSuchElementException):
+            AsyncWebDriver._check({'value': no_such_element()})
+
+    def test_execute_script_elements(self):
+        transport = FakeTransport({('POST', '/session/s1/execute/sync'): [ref('e2'), 1]})
+        driver = AsyncWebDriver(transport, 's1')
+        res = run(driver.execute_script('return 1', AsyncWebElement(driver, 'e1')))
+        assert res == [AsyncWebElement(driver, 'e2'), 1]
+        assert transport.requests[0][2] == {'script': 'return 1', 'args': [ref('e1')]}
+
+    def test_quit(self):
+        transport = FakeTransport({})
+        run(AsyncWebDriver(transport, 's1').quit())
+        assert transport.requests == [('DELETE', '/session/s1', None)]
+        assert transport.closed
+
+    def test_without_selenium(self):
+        script = textwrap.dedent("""
+            import sys
+            sys.modules['selenium'] = None
+            from page_objects.aio import AsyncWebDriver
+            from page_objects.exceptions import NoSuchElementException
+            try:
+                AsyncWebDriver._check({'value': {'error': 'no such element', 'message': 'x'}})
+            except NoSuchElementException as e:
+                print(e.msg)
+        """)
+        out = subprocess.check_output([sys.executable, '-c', script])
+        assert out.decode('ascii').strip() == 'x'
+
+
+class TestHTTPTransport:
+
+    def test_request(self):
+        requests = []
+
+        async def handle(reader, writer):
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                headers = {}
+                while True:
+                    header = (await reader.readline()).decode().strip()
+                    if not header:
+                        break
+                    k, v = header.split(':', 1)
+                    headers[k.lower()] = v.strip()
+                body = await reader.readexactly(int(headers['content-length']))
+                requests.append((line.decode().split()[:2], json.loads(body.decode())))
+                payload = b'{"value": "ok"}'
+                writer.write(b'HTTP/1.1 200 OK\r\nTransfer-Encoding: chunked\r\n\r\n' +
+                             b'%x\r\n%s\r\n0\r\n\r\n' % (len(payload), payload))
+                await writer.drain()
+            writer.close()
+
+        async def main():
+            server = await asyncio.start_server(handle, '127.0.0.1', 0)
+            port = server.sockets[0].getsockname()[1]
+            transport = HTTPTransport('http://127.0.0.1:{0}/wd/hub'.format(port))
+            res = [await transport.request('POST', '/session', {'a': i}) for i in range(2)]
+            await transport.close()
+            server.close()
+            await server.wait_closed()
+            return res
+
+        assert run(main()) == [{'value': 'ok'}, {'value': 'ok'}]
+        assert requests == [(['POST', '/wd/hub/session'], {'a': 0}),
+                            (['POST', '/wd/hub/session'], {'a': 1})]
+
+    def test_https(self, monkeypatch):
+        connections = []
+
+        async def open_connection(host, port, **kwargs):
+            connections.append((host, port, kwargs))
+            raise ConnectionRefusedError
+
+        monkeypatch.setattr(asyncio, 'open_connection', open_connection)
+        transport = HTTPTransport('https://example.com/wd/hub')
+        with pytest.raises(ConnectionRefusedError):
+            run(transport.request('GET', '/status'))
+        assert connections == [('example.com', 443, {'ssl': True})]
+
+    def test_lock_made_in_loop(self, monkeypatch):
+        async def open_connection(host, port, **kwargs):
+            raise ConnectionRefusedError
+
+        monkeypatch.setattr(asyncio, 'open_connection', open_connection)
+        transport = HTTPTransport('http://example.com/wd/hub')
+        # Made outside of the loop asyncio.run() starts, so not bound to another one
+        assert transport._lock is None
+        with pytest.raises(ConnectionRefusedError):
+            run(transport.request('GET', '/status'))
+        assert transport._lock is not None
+
+    def test_unsupported_scheme(self):
+        with pytest.raises(ValueError):
+            HTTPTransport('ftp://example.com/wd/hub')
+
+
+class TestAsyncWatch:
+
+    def test_watch(self):
+        transport = FakeTransport({('POST', '/session/s1/execute/sync'): ['ok']})
+        page = TestPage(AsyncWebDriver(transport, 's1'))
+
+        async def watch():
+            async with page.watch('username', interval=0.01) as watch:
+                assert watch.values == {'username': 'ok'}
+                transport.responses[('POST', '/session/s1/execute/sync')] = [
+                    ['username', 'ok', 'busy', 1000]]
+                events = watch.events()
+                event = await events.__anext__()
+                await events.aclose()
+                transport.responses[('POST', '/session/s1/execute/sync')] = []
+                assert [e async for e in watch.events(timeout=0.03)] == []
+            return event, watch
+
+        event, watch = run(watch())
+        assert event == ('username', 'ok', 'busy', 1.0)
+        assert watch.token is None
+        bodies = [body for _, _, body in transport.requests]
+        assert bodies[0]['args'][1] == [['username', 'css selector', '[id="user"]', False]]
+        assert bodies[-1]['args'][1] is True
+
+    def test_no_sync_iteration(self):
+        page = TestPage(AsyncWebDriver(FakeTransport({}), 's1'))
+        with pytest.raises(TypeError):
+            iter(page.watch('username'))
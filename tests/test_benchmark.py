@@ -0,0 +1,74 @@
+import pytest
+
+from page_objects import benchmark
+
+
+@pytest.fixture(scope='module')
+def results():
+    return dict((r.name, r) for r in benchmark.run(rows=200, fields=5, repeat=3))
+
+
+@pytest.mark.parametrize('name', list(benchmark.BENCHMARKS))
+def test_within_budget(results, name):
+    result = results[name]
+    assert result.ops == 3
+    assert result.commands_per_op <= result.budget
+
+
+def test_budget_for_page(results):
+    assert results['set_fields'].budget == 10
+    assert results['set_fields'].commands_per_op == 10
+
+
+def test_latency_overhead():
+    [result] = benchmark.run(['descriptor'], rows=10, latency=0.01, repeat=2)
+    assert result.seconds >= 0.02
+    assert result.overhead_per_op < result.per_op
+    assert not result.over_budget
+
+
+def test_over_budget():
+    result = benchmark.Result('x', ops=2, commands=3, seconds=1.0, budget=1)
+    assert result.over_budget
+    assert 'x' in benchmark.report([result])
+
+
+def test_main(capsys):
+    assert benchmark.main(['--rows', '10', '--repeat', '1', 'descriptor', 'fill']) == 0
+    out = capsys.readouterr()[0]
+    assert 'descriptor' in out
+    assert 'fill' in out
+    assert 'set_fields' not in out
+
+
+def test_main_over_budget(monkeypatch, capsys):
+    monkeypatch.setattr(benchmark.BENCHMARKS['descriptor'], 'budget', 0)
+    assert benchmark.main(['--rows', '10', '--repeat', '1', 'descriptor']) == 1
+    assert 'Over budget: descriptor' in capsys.readouterr()[0]
+
+
+@pytest.mark.parametrize('module,allowed', benchmark.IMPORTS)
+def test_imports_within_budget(module, allowed):
+    result = benchmark.import_time(module, repeat=1, allowed=allowed)
+    assert result.seconds > 0
+    assert result.disallowed == []
+
+
+def test_import_core_without_selenium():
+    assert benchmark.import_time('page_objects', repeat=1).selenium == []
+
+
+def test_import_over_budget():
+    result = benchmark.ImportResult('x', 0.01,
+                                    ['selenium', 'selenium.common', 'selenium.webdriver'],
+                                    allowed=('selenium.common',))
+    assert result.disallowed == ['selenium.webdriver']
+    assert result.over_budget
+    assert 'selenium.webdriver' in benchmark.report([result])
+
+
+def test_main_imports(capsys):
+    assert benchmark.main(['--imports', '--repeat', '1']) == 0
+    out = capsys.readouterr()[0]
+    assert 'import_ms' in out
+    assert 'page_objects.testing' in out
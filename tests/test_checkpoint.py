@@ -0,0 +1,125 @@
+import threading
+
+try:
+    from unittest import mock
+except ImportError:
+    import mock
+import pytest
+
+from page_objects import PageObject, PageElement
+from page_objects.checkpoint import CheckpointStore
+from page_objects.pool import SessionPool
+from page_objects.testing import FakeWebDriver
+
+HOME = '<p id="welcome">Welcome</p>'
+
+
+class LoginPage(PageObject):
+    welcome = PageElement(id_='welcome')
+
+
+def login(page, user):
+    page.get('/login')
+    page.w.add_cookie({'name': 'session', 'value': user})
+    page.w.local_storage['user'] = user
+    page.get('/home')
+
+
+@pytest.fixture()
+def driver():
+    return FakeWebDriver(pages={'http://example.com/home': HOME})
+
+
+@pytest.fixture()
+def page(driver):
+    return LoginPage(driver, root_uri='http://example.com')
+
+
+class TestCheckpointStore:
+
+    def test_save(self, page):
+        store = CheckpointStore()
+        login(page, 'alice')
+        checkpoint = store.save('login', page)
+        assert checkpoint.url == 'http://example.com/home'
+        assert checkpoint.cookies == [{'name': 'session', 'value': 'alice'}]
+        assert checkpoint.local_storage == {'user': 'alice'}
+        assert store.get('login') is checkpoint
+        assert 'login' in store
+        assert page.w.commands[-2:] == ['execute_script', 'get_cookies']
+
+    def test_restore(self, page):
+        store = CheckpointStore()
+        login(page, 'alice')
+        store.save('login', page)
+
+        other = LoginPage(FakeWebDriver(pages={'http://example.com/home': HOME}))
+        assert store.restore('login', other)
+        assert other.w.cookies == [{'name': 'session', 'value': 'alice'}]
+        assert other.w.local_storage == {'user': 'alice'}
+        assert other.w.current_url == 'http://example.com/home'
+        assert other.welcome.text == 'Welcome'
+        assert other.w.commands[:2] == ['current_url', 'get']
+
+    def test_restore_on_same_origin(self, page):
+        store = CheckpointStore()
+        login(page, 'alice')
+        store.save('login', page)
+        page.w.delete_all_cookies()
+        page.w.reset_commands()
+        assert store.restore('login', page, navigate=False)
+        assert page.w.commands == ['current_url', 'delete_all_cookies', 'add_cookie',
+                                   'execute_script']
+        assert page.w.cookies == [{'name': 'session', 'value': 'alice'}]
+
+    def test_restore_missing(self, page):
+        assert not CheckpointStore().restore('login', page)
+        assert page.w.commands == []
+
+    def test_restore_or_run(self, page):
+        store = CheckpointStore()
+        flow = mock.Mock(side_effect=login)
+        assert not store.restore_or_run('login', page, flow, 'alice')
+        assert store.restore_or_run('login', page, flow, 'alice')
+        flow.assert_called_once_with(page, 'alice')
+
+    def test_ttl(self, page):
+        store = CheckpointStore(ttl=60)
+        with mock.patch('time.time', return_value=1000):
+            store.save('login', page)
+            store.save('short', page, ttl=10)
+        with mock.patch('time.time', return_value=1059):
+            assert 'login' in store
+            assert 'short' not in store
+        with mock.patch('time.time', return_value=1060):
+            assert 'login' not in store
+            assert not store.restore('login', page)
+
+    def test_invalidate(self, page):
+        store = CheckpointStore()
+        store.save('a', page)
+        store.save('b', page)
+        store.save('c', page)
+        store.invalidate('a', 'missing')
+        assert len(store) == 2
+        store.invalidate()
+        assert len(store) == 0
+
+
+class TestPool:
+
+    def test_shared_between_drivers(self):
+        store = CheckpointStore()
+        flow = mock.Mock(side_effect=login)
+        lock = threading.Lock()
+
+        def setup(page):
+            with lock:
+                store.restore_or_run('login', page, flow, 'alice')
+            return page.welcome.text, list(page.w.cookies)
+
+        factory = lambda: FakeWebDriver(pages={'http://example.com/home': HOME})
+        with SessionPool(factory, size=3, root_uri='http://example.com') as pool:
+            results = [f.result() for f in [pool.submit(LoginPage, setup) for _ in range(6)]]
+        assert flow.call_count == 1
+        assert results == [('Welcome', [{'name': 'session', 'value': 'alice'}])] * 6
@@ -0,0 +1,167 @@
+import pytest
+
+from page_objects import dom
+
+HTML = """
+<html>
+    <head><title>Test</title><script>var x = "<p>";</script></head>
+    <body>
+        <div id="main" class="content wide">
+            <form id="login">
+                <input type="text" name="username" id="user-input">
+                <input type="checkbox" name="remember" checked>
+                <input type="submit" value="Go"/>
+            </form>
+            <ul>
+                <li class="item first">One
+                <li class="item">Two
+                <li class="item last" data-id="item-3">Three
+            </ul>
+            <a href="/home">Go   home</a>
+            <a href="/away">Away</a>
+        </div>
+        <p>Para <b>bold</b> &amp; more</p>
+    </body>
+</html>
+"""
+
+
+@pytest.fixture(scope='module')
+def doc():
+    return dom.parse_html(HTML)
+
+
+def tags(nodes):
+    return [n.tag for n in nodes]
+
+
+def attr(nodes, name):
+    return [n.attrs.get(name) for n in nodes]
+
+
+class TestParse:
+
+    def test_structure(self, doc):
+        [html] = doc.elements
+        assert tags(html.elements) == ['head', 'body']
+
+    def test_void_and_implied_end(self, doc):
+        [ul] = dom.query(doc, 'tag name', 'ul')
+        assert tags(ul.elements) == ['li', 'li', 'li']
+        [form] = dom.query(doc, 'id', 'login')
+        assert tags(form.elements) == ['input', 'input', 'input']
+
+    def test_text(self, doc):
+        [p] = dom.query(doc, 'tag name', 'p')
+        assert p.text == 'Para bold & more'
+        [html] = doc.elements
+        assert 'var x' not in html.text
+        assert 'Test' not in html.text
+
+    def test_boolean_attribute(self, doc):
+        [checkbox] = dom.query(doc, 'name', 'remember')
+        assert 'checked' in checkbox.attrs
+
+    def test_to_html_round_trip(self, doc):
+        again = dom.parse_html(doc.to_html())
+        assert tags(again.iter()) == tags(doc.iter())
+        assert [n.text for n in again.iter()] == [n.text for n in doc.iter()]
+
+
+class TestLocators:
+
+    @pytest.mark.parametrize('by, value, expected', [
+        ('id', 'user-input', ['username']),
+        ('name', 'remember', ['remember']),
+        ('class name', 'item', [None, None, 'item-3']),
+        ('tag name', 'INPUT', ['username', 'remember', None]),
+    ])
+    def test_simple(self, doc, by, value, expected):
+        found = dom.query(doc, by, value)
+        key = 'name' if by in ('id', 'name', 'tag name') else 'data-id'
+        assert attr(found, key) == expected
+
+    def test_link_text(self, doc):
+        assert attr(dom.query(doc, 'link text', 'Go home'), 'href') == ['/home']
+        assert attr(dom.query(doc, 'partial link text', 'wa'), 'href') == ['/away']
+
+    def test_single(self, doc):
+        assert dom.query(doc, 'class name', 'item', multi=False).text == 'One'
+        assert dom.query(doc, 'class name', 'nothing', multi=False) is None
+        assert dom.query(doc, 'xpath', '//nothing', multi=False) is None
+
+    def test_unsupported_strategy(self, doc):
+        with pytest.raises(ValueError):
+            dom.query(doc, 'foo', 'bar')
+
+
+class TestCSS:
+
+    @pytest.mark.parametrize('selector, expected', [
+        ('li', ['One', 'Two', 'Three']),
+        ('li.item.last', ['Three']),
+        ('#main li:first-child', ['One']),
+        ('ul > li:last-child', ['Three']),
+        ('li:nth-child(2)', ['Two']),
+        ('li:nth-of-type(3)', ['Three']),
+        ('li.first + li', ['Two']),
+        ('li.first ~ li', ['Two', 'Three']),
+        ('[data-id]', ['Three']),
+        ('[data-id="item-3"]', ['Three']),
+        ("[data-id^='item']", ['Three']),
+        ('[data-id$=-3]', ['Three']),
+        ('[data-id*="em-"]', ['Three']),
+        ('[class~=last]', ['Three']),
+        ('div.content li.first, li.last', ['One', 'Three']),
+        ('*.wide > ul > *:first-child', ['One']),
+        ('body > li', []),
+    ])
+    def test_selectors(self, doc, selector, expected):
+        assert [n.text for n in dom.query(doc, 'css selector', selector)] == expected
+
+    def test_context(self, doc):
+        [ul] = dom.query(doc, 'tag name', 'ul')
+        assert len(dom.query(ul, 'css selector', 'div li')) == 3
+        assert dom.query(ul, 'css selector', 'input') == []
+
+    @pytest.mark.parametrize('selector', ['li:not(.first)', 'li::before', '> li', 'li >', ''])
+    def test_unsupported(self, doc, selector):
+        with pytest.raises(ValueError):
+            dom.query(doc, 'css selector', selector)
+
+
+class TestXPath:
+
+    @pytest.mark.parametrize('path, expected', [
+        ('//li', ['One', 'Two', 'Three']),
+        ('/html/body/div/ul/li[2]', ['Two']),
+        ('//li[last()]', ['Three']),
+        ('//li[@data-id]', ['Three']),
+        ("//li[@class='item']", ['Two']),
+        ("//li[@class!='item']", ['One', 'Three']),
+        ("//li[contains(@class, 'first') or contains(@class, 'last')]", ['One', 'Three']),
+        ("//a[normalize-space()='Go home']", ['Go home']),
+        ("//a[text()='Away']", ['Away']),
+        ("//a[starts-with(@href, '/h')]", ['Go home']),
+        ("//ul[li]/li[1]", ['One']),
+        ("//li[@class='item']/..//li[3]", ['Three']),
+        ("//*[@id='main']/a", ['Go home', 'Away']),
+        ("//li[contains(., 'w')][1]", ['Two']),
+        ("(//li)[2]", ['Two']),
+        ("(//ul)[1]//li[last()]", ['Three']),
+        ("((//li)[3]/..)[1]/li[@class='item']", ['Two']),
+    ])
+    def test_paths(self, doc, path, expected):
+        assert [n.text for n in dom.query(doc, 'xpath', path)] == expected
+
+    def test_relative(self, doc):
+        [ul] = dom.query(doc, 'tag name', 'ul')
+        assert len(dom.query(ul, 'xpath', './li')) == 3
+        assert len(dom.query(ul, 'xpath', './/a')) == 0
+        assert len(dom.query(ul, 'xpath', '//a')) == 2
+
+    @pytest.mark.parametrize('path', ['//li[position()>1]', 'count(//li)', '//li/following::a',
+                                      '(//li)', '(//li[1]'])
+    def test_unsupported(self, doc, path):
+        with pytest.raises(ValueError):
+            dom.query(doc, 'xpath', path)
@@ -0,0 +1,150 @@
+import json
+
+try:
+    from unittest import mock
+except ImportError:
+    import mock
+import pytest
+
+from selenium.webdriver.remote.webdriver import WebDriver, WebElement
+from selenium.common.exceptions import NoSuchElementException
+
+import page_objects
+from page_objects import PageObject, PageElement, MultiPageElement, instrumentation
+
+
+class LoginPage(PageObject):
+    username = PageElement(id_='user')
+    rows = MultiPageElement(css='tr')
+
+
+@pytest.fixture()
+def webdriver():
+    return mock.Mock(spec=WebDriver)
+
+
+@pytest.fixture()
+def recorder():
+    with instrumentation.recording() as recorder:
+        yield recorder
+
+
+def stats(recorder):
+    return dict((k, (v.count, v.not_found, v.errors)) for k, v in recorder.stats.items())
+
+
+class TestRecorder:
+
+    def test_disabled_by_default(self, webdriver):
+        assert page_objects._recorder is None
+        LoginPage(webdriver).username
+
+    def test_enable_disable(self):
+        recorder = instrumentation.enable()
+        assert page_objects._recorder is recorder
+        instrumentation.disable()
+        assert page_objects._recorder is None
+
+    def test_find(self, webdriver, recorder):
+        page = LoginPage(webdriver)
+        page.username
+        page.username
+        page.rows
+        assert stats(recorder) == {
+            ('find', 'LoginPage', 'username', 'id=user'): (2, 0, 0),
+            ('find', 'LoginPage', 'rows', 'css selector=tr'): (1, 0, 0),
+        }
+
+    def test_not_found(self, webdriver, recorder):
+        webdriver.find_element.side_effect = NoSuchElementException
+        webdriver.find_elements.return_value = []
+        page = LoginPage(webdriver)
+        page.username
+        page.rows
+        assert stats(recorder) == {
+            ('find', 'LoginPage', 'username', 'id=user'): (1, 1, 0),
+            ('find', 'LoginPage', 'rows', 'css selector=tr'): (1, 1, 0),
+        }
+
+    def test_error(self, webdriver, recorder):
+        webdriver.find_element.side_effect = RuntimeError
+        with pytest.raises(RuntimeError):
+            LoginPage(webdriver).username
+        assert stats(recorder) == {('find', 'LoginPage', 'username', 'id=user'): (1, 0, 1)}
+
+    def test_cache_hits_not_recorded(self, webdriver, recorder):
+        page = LoginPage(webdriver, cache=True)
+        page.username
+        page.username
+        assert recorder.stats[('find', 'LoginPage', 'username', 'id=user')].count == 1
+
+    def test_set_and_get(self, webdriver, recorder):
+        webdriver.find_element.return_value = mock.Mock(spec=WebElement)
+        page = LoginPage(webdriver)
+        page.get('/login')
+        page.username = 'secret'
+        assert stats(recorder) == {
+            ('get', 'LoginPage', None, '/login'): (1, 0, 0),
+            ('set', 'LoginPage', 'username', 'id=user'): (1, 0, 0),
+            ('find', 'LoginPage', 'username', 'id=user'): (1, 0, 0),
+        }
+
+    def test_resolve_and_fill(self, webdriver, recorder):
+        page = LoginPage(webdriver)
+        webdriver.execute_script.return_value = ["XXX", ["YYY"]]
+        page.resolve('username', 'rows')
+        webdriver.execute_script.return_value = [["XXX"], True]
+        page.fill(username='secret')
+        page.fill({'username': 'secret'})
+        assert stats(recorder) == {
+            ('resolve', 'LoginPage', None, 'username, rows'): (1, 0, 0),
+            ('fill', 'LoginPage', None, 'username'): (2, 0, 0),
+        }
+
+    def test_merge(self):
+        r1 = instrumentation.Recorder()
+        r2 = instrumentation.Recorder()
+        key = ('find', 'LoginPage', 'username', 'id=user')
+        r1.stats[key] = instrumentation.Stats()
+        r1.stats[key].samples = [1.0]
+        r2.stats[key] = instrumentation.Stats()
+        r2.stats[key].samples = [2.0]
+        r2.stats[key].errors = 1
+        r1.merge(r2)
+        assert r1.stats[key].samples == [1.0, 2.0]
+        assert r1.stats[key].errors == 1
+
+
+class TestReport:
+
+    def test_report(self, webdriver, recorder):
+        page = LoginPage(webdriver)
+        for _ in range(10):
+            page.username
+        page.rows
+        report = recorder.report()
+        assert len(report) == 2
+        totals = [r['total'] for r in report]
+        assert totals == sorted(totals, reverse=True)
+        [row] = [r for r in report if r['name'] == 'username']
+        assert (row['page'], row['name'], row['count']) == ('LoginPage', 'username', 10)
+        assert row['p50'] <= row['p90'] <= row['p99'] <= row['max']
+        assert abs(row['mean'] * 10 - row['total']) < 1e-9
+
+    def test_to_json(self, webdriver, recorder):
+        LoginPage(webdriver).username
+        [row] = json.loads(recorder.report().to_json())
+        assert row['locator'] == 'id=user'
+
+    def test_str(self, webdriver, recorder):
+        LoginPage(webdriver).username
+        lines = str(recorder.report()).splitlines()
+        assert lines[0].split()[:4] == ['op', 'page', 'name', 'locator']
+        assert lines[1].split()[:4] == ['find', 'LoginPage', 'username', 'id=user']
+
+    def test_percentile(self):
+        stats = instrumentation.Stats()
+        stats.samples = [float(i) for i in range(1, 101)]
+        assert stats.percentile(50) == 51.0
+        assert stats.percentile(99) == 99.0
+        assert stats.percentile(100) == 100.0
@@ -0,0 +1,227 @@
+import sys
+import textwrap
+import time
+
+try:
+    from unittest import mock
+except ImportError:
+    import mock
+import pytest
+
+from selenium.webdriver.common.by import By
+
+from page_objects import Component, PageObject, PageElement, MultiPageElement
+from page_objects import lint
+from page_objects.replay import RecordingDriver, ReplayDriver
+from page_objects.snapshot import SnapshotDriver
+from page_objects.testing import FakeWebDriver
+
+HTML = """
+<html><body>
+<form id="login">
+  <input id="user" name="username">
+  <input name="password" type="password">
+  <div class="error">Bad password</div>
+  <div class="error">Try again</div>
+</form>
+<ul id="menu"><li><a href="/help">Help me</a></li></ul>
+</body></html>
+"""
+
+
+class LoginPage(PageObject):
+    username = PageElement(xpath='//form//input[@id="user"]')
+    password = PageElement(name='password')
+    error = PageElement(css='form div')
+    errors = MultiPageElement(css='body .error')
+    help = PageElement(partial_link_text='Help')
+    item = PageElement(tag_name='li', context=True)
+    missing = PageElement(css='div .missing')
+
+
+class SubPage(LoginPage):
+    menu = PageElement(id_='menu')
+
+
+class Menu(Component):
+    links = MultiPageElement(xpath='//ul//a')
+
+
+class MenuPage(Menu, PageObject):
+    menu = PageElement(id_='menu')
+
+
+def find(findings, name, rule=None):
+    return [f for f in findings if f.name == name and (rule is None or f.rule == rule)]
+
+
+class SlowDriver(SnapshotDriver):
+    """ Snapshot driver where the declared ``errors`` locator is slow, so that
+        faster suggestions are always found.
+    """
+    def find_elements(self, by, value):
+        if (by, value) == (By.CSS_SELECTOR, 'body .error'):
+            time.sleep(0.005)
+        return SnapshotDriver.find_elements(self, by, value)
+
+
+@pytest.fixture()
+def driver():
+    return SnapshotDriver(HTML, 'http://example.com/login')
+
+
+def test_page_classes():
+    classes = lint.page_classes([__name__])
+    assert classes == [LoginPage, Menu, MenuPage, SubPage]
+    assert LoginPage in lint.page_classes()
+
+
+def test_static_rules():
+    assert lint.static_rules((By.PARTIAL_LINK_TEXT, 'x')) == ['partial-link-text']
+    assert lint.static_rules((By.LINK_TEXT, 'x')) == ['link-text']
+    assert lint.static_rules((By.XPATH, '//a')) == ['slow-xpath']
+    assert lint.static_rules((By.CSS_SELECTOR, 'div .error')) == ['unanchored']
+    assert lint.static_rules((By.CSS_SELECTOR, '#login .error')) == []
+    assert lint.static_rules((By.CSS_SELECTOR, 'ul > li')) == []
+    assert lint.static_rules((By.ID, 'foo')) == []
+
+
+@pytest.mark.parametrize('xpath,css', [
+    ('//div[@id="a"]//input[@name=\'q\']', 'div#a input[name="q"]'),
+    ('/html/body/div', 'html > body > div'),
+    ('.//a[@href]', 'a[href]'),
+    ('//*[@id="x"]', '#x'),
+    ('//a[contains(@href, "x")]', None),
+    ('//a[text()="x"]', None),
+    ('//a[2]', None),
+    ('/div', None),
+    ('div', None),
+])
+def test_xpath_to_css(xpath, css):
+    assert lint.xpath_to_css(xpath) == css
+
+
+def test_lint_static():
+    findings = lint.lint([LoginPage])
+    assert [(f.name, f.rule) for f in findings] == [
+        ('error', 'unanchored'), ('errors', 'unanchored'), ('help', 'partial-link-text'),
+        ('missing', 'unanchored'), ('username', 'slow-xpath')]
+    assert all(f.seconds is None and f.suggestion is None for f in findings)
+
+
+def test_lint_inherited():
+    findings = lint.lint([MenuPage, SubPage])
+    assert [(f.page, f.name, f.rule) for f in findings] == [
+        ('Menu', 'links', 'slow-xpath'), ('LoginPage', 'error', 'unanchored'),
+        ('LoginPage', 'errors', 'unanchored'), ('LoginPage', 'help', 'partial-link-text'),
+        ('LoginPage', 'missing', 'unanchored'), ('LoginPage', 'username', 'slow-xpath')]
+    assert findings[0].page_class is Menu
+    assert len(lint.lint([Menu, MenuPage])) == 1
+
+
+def test_lint_on_page(driver):
+    findings = lint.lint([LoginPage], driver, repeat=2)
+    [username] = find(findings, 'username')
+    assert username.rule == 'slow-xpath'
+    assert username.matches == 1
+    assert username.seconds > 0
+    keyword, value = username.suggestion
+    assert driver.find_elements(lint._LOCATOR_MAP[keyword], value) == \
+        driver.find_elements(By.ID, 'user')
+    [ambiguous, unanchored] = find(findings, 'error')
+    assert ambiguous.rule == 'ambiguous' and unanchored.rule == 'unanchored'
+    assert ambiguous.matches == 2
+    [errors] = find(findings, 'errors')
+    assert errors.matches == 2
+    # Elements that aren't on the page only get the static rules
+    [missing] = find(findings, 'missing')
+    assert missing.matches is None
+    assert not find(findings, 'item')
+    assert not find(findings, 'password')
+
+
+def test_suggestion_finds_same_elements():
+    driver = SlowDriver(HTML, 'http://example.com/login')
+    finding = find(lint.lint([LoginPage], driver, repeat=1, slow=0), 'errors', 'unanchored')[0]
+    keyword, value = finding.suggestion
+    assert driver.find_elements(lint._LOCATOR_MAP[keyword], value) == \
+        driver.find_elements(By.CSS_SELECTOR, '.error')
+    # The class the locator selects on is kept, though '#login div' finds the same
+    assert finding.suggestion == ('css', '#login div.error')
+
+
+def test_candidates_keep_classes(driver):
+    found = driver.find_elements(By.CSS_SELECTOR, 'body .error')
+    assert list(lint._candidates(driver, found, True, (By.CSS_SELECTOR, 'body .error'))) == [
+        ('css', (By.CSS_SELECTOR, '#login div.error'))]
+    assert list(lint._candidates(driver, found, True, (By.CSS_SELECTOR, 'form div'))) == [
+        ('css', (By.CSS_SELECTOR, '#login div')), ('css', (By.CSS_SELECTOR, '#login div.error'))]
+
+
+def test_slow(driver):
+    findings = lint.lint([SubPage], driver, repeat=1, slow=0)
+    assert [f.rule for f in find(findings, 'menu')] == ['slow']
+    # Inherited elements are checked on the class declaring them
+    assert set(f.page for f in find(findings, 'username')) == set(['LoginPage'])
+
+
+def test_replay_errors_ignored():
+    driver = mock.Mock()
+    driver.find_elements.side_effect = lint.WebDriverException
+    [finding] = find(lint.lint([LoginPage], driver), 'username')
+    assert finding.matches is None
+
+
+def test_replay_unrecorded_commands():
+    recording = RecordingDriver(FakeWebDriver(HTML))
+    page = LoginPage(recording)
+    page.error
+    page.errors
+    replay = ReplayDriver(recording.entries)
+    findings = lint.lint([LoginPage], replay, repeat=1, slow=0)
+    # Only find_element was recorded for these, so they're not timed
+    [username] = find(findings, 'username')
+    assert username.matches is None
+    [errors] = find(findings, 'errors', 'unanchored')
+    assert errors.matches == 2
+
+
+def test_report(driver):
+    text = lint.report(lint.lint([LoginPage], driver, repeat=1))
+    assert text.splitlines()[0].split() == ['page', 'name', 'locator', 'rule', 'ms', 'matches',
+                                            'suggestion']
+    assert 'partial-link-text' in text
+
+
+def test_rewrite(tmpdir, driver, monkeypatch):
+    tmpdir.join('lint_pages.py').write(textwrap.dedent('''
+        from page_objects import PageObject, PageElement
+
+
+        class FormPage(PageObject):
+            username = PageElement(
+                xpath='//form//input[@id="user"]')
+            password = PageElement(name='password')
+    '''))
+    monkeypatch.syspath_prepend(str(tmpdir))
+    import lint_pages
+    try:
+        findings = lint.lint([lint_pages.FormPage], driver, repeat=1)
+        [finding] = findings
+        finding.suggestion = ('id_', 'user')
+        diff = lint.rewrite(findings)
+        assert "-        xpath='//form//input[@id=\"user\"]')" in diff
+        assert "+        id_='user')" in diff
+        assert 'xpath' in tmpdir.join('lint_pages.py').read()
+        lint.rewrite(findings, write=True)
+        assert "id_='user')" in tmpdir.join('lint_pages.py').read()
+    finally:
+        del sys.modules['lint_pages']
+
+
+def test_main(tmpdir, capsys):
+    html = tmpdir.join('page.html')
+    html.write(HTML)
+    assert lint.main([__name__, '--html', str(html), '--repeat', '1']) == 1
+    out = capsys.readouterr()[0]
+    assert 'LoginPage' in out and 'ambiguous' in out
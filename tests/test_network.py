@@ -0,0 +1,207 @@
+import socket
+import threading
+import time
+
+try:
+    from http.server import BaseHTTPRequestHandler, HTTPServer
+    from urllib.error import HTTPError
+    from urllib.request import ProxyHandler, build_opener
+except ImportError:
+    from BaseHTTPServer import BaseHTTPRequestHandler, HTTPServer
+    from urllib2 import HTTPError, ProxyHandler, build_opener
+
+try:
+    from unittest import mock
+except ImportError:
+    import mock
+
+import pytest
+
+from selenium.common.exceptions import WebDriverException
+from selenium.webdriver.remote.webdriver import WebDriver
+
+from page_objects import PageObject, PageElement
+from page_objects.network import NetworkProxy, apply, matcher
+from page_objects.testing import FakeWebDriver
+
+
+class SitePage(PageObject):
+    blocked_resources = ['*/ads/*', '*.woff2']
+    header = PageElement(id_='header')
+
+
+class PlainPage(PageObject):
+    header = PageElement(id_='header')
+
+
+class _Handler(BaseHTTPRequestHandler):
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        body = ('served ' + self.path).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+@pytest.fixture()
+def site():
+    server = HTTPServer(('127.0.0.1', 0), _Handler)
+    thread = threading.Thread(target=server.serve_forever, args=(0.05,))
+    thread.daemon = True
+    thread.start()
+    yield 'http://127.0.0.1:%d' % server.server_address[1]
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture()
+def proxy():
+    with NetworkProxy() as proxy:
+        yield proxy
+
+
+def fetch(proxy, url):
+    opener = build_opener(ProxyHandler({'http': 'http://' + proxy.address}))
+    try:
+        response = opener.open(url, timeout=5)
+    except HTTPError as e:
+        return e.code, b''
+    return response.getcode(), response.read()
+
+
+def connect(proxy, target):
+    sock = socket.create_connection((proxy.host, proxy.port), timeout=5)
+    sock.sendall(('CONNECT %s HTTP/1.1\r\nHost: %s\r\n\r\n' % (target, target)).encode('ascii'))
+    return sock, sock.recv(1024).decode('ascii')
+
+
+class TestMatcher:
+
+    def test_matcher(self):
+        match = matcher(['*/ads/*', '*.woff2', 'https://cdn.example.com/*'])
+        assert match('http://example.com/ads/banner.png')
+        assert match('https://fonts.example.com/a.woff2')
+        assert match('https://cdn.example.com/lib.js')
+        assert not match('http://example.com/adsense.js')
+        assert not match('https://fonts.example.com/a.woff2?v=1')
+        assert not match('http://cdn.example.com/lib.js')
+
+    def test_nothing_blocked(self):
+        assert not matcher(())('http://example.com/')
+
+
+class TestApply:
+
+    def test_devtools(self):
+        driver = mock.Mock(spec=['execute_cdp_cmd'])
+        assert apply(driver, ['*.png'], {'latency': 20})
+        assert driver.execute_cdp_cmd.mock_calls == [
+            mock.call('Network.enable', {}),
+            mock.call('Network.setBlockedURLs', {'urls': ['*.png']}),
+            mock.call('Network.emulateNetworkConditions', {
+                'offline': False, 'latency': 20, 'downloadThroughput': -1,
+                'uploadThroughput': -1}),
+        ]
+
+    def test_only_changes_sent(self):
+        driver = mock.Mock(spec=['execute_cdp_cmd'])
+        assert not apply(driver)
+        assert apply(driver, ['*.png'])
+        assert not apply(driver, ['*.png'])
+        assert driver.execute_cdp_cmd.call_count == 3
+        assert apply(driver)
+        driver.execute_cdp_cmd.assert_any_call('Network.setBlockedURLs', {'urls': []})
+
+    def test_proxy(self):
+        driver = mock.Mock(spec=['execute_cdp_cmd'])
+        proxy = NetworkProxy()
+        try:
+            assert proxy.attach(driver) is driver
+            apply(driver, ['*.png'], {'offline': True})
+        finally:
+            proxy.stop()
+        assert proxy.blocked == ('*.png',)
+        assert proxy.conditions == {'offline': True}
+        assert not driver.execute_cdp_cmd.called
+
+    def test_unsupported(self):
+        driver = mock.Mock(spec=WebDriver)
+        driver.execute_cdp_cmd.side_effect = WebDriverException('unknown command')
+        assert not apply(driver)
+        with pytest.raises(ValueError):
+            apply(driver, ['*.png'])
+        with pytest.raises(ValueError):
+            apply(mock.Mock(spec=['get']), ['*.png'])
+
+    def test_bad_conditions(self):
+        with pytest.raises(ValueError):
+            apply(mock.Mock(spec=['execute_cdp_cmd']), conditions={'jitter': 5})
+
+
+class TestPageObject:
+
+    def test_get(self):
+        driver = FakeWebDriver()
+        SitePage(driver).get('/')
+        SitePage(driver).get('/other')
+        assert driver.devtools['Network.setBlockedURLs'] == {'urls': ['*/ads/*', '*.woff2']}
+        assert driver.commands == ['execute_cdp_cmd'] * 3 + ['get', 'get']
+
+    def test_reset_by_other_page(self):
+        driver = FakeWebDriver()
+        SitePage(driver).get('/')
+        PlainPage(driver).get('/')
+        assert driver.devtools['Network.setBlockedURLs'] == {'urls': []}
+
+    def test_no_settings(self):
+        driver = FakeWebDriver()
+        PlainPage(driver).get('/')
+        assert driver.commands == ['get']
+
+
+class TestNetworkProxy:
+
+    def test_forward(self, site, proxy):
+        assert fetch(proxy, site + '/index.html') == (200, b'served /index.html')
+        assert proxy.requests == 1
+
+    def test_block(self, site, proxy):
+        proxy.block(['*/ads/*'])
+        assert fetch(proxy, site + '/ads/banner.png') == (204, b'')
+        assert fetch(proxy, site + '/page') == (200, b'served /page')
+        assert proxy.blocked_requests == 1
+
+    def test_offline(self, site, proxy):
+        proxy.shape({'offline': True})
+        assert fetch(proxy, site + '/page')[0] == 204
+
+    def test_latency(self, site, proxy):
+        proxy.shape({'latency': 100})
+        started = time.time()
+        fetch(proxy, site + '/page')
+        assert time.time() - started >= 0.1
+
+    def test_connect(self, site, proxy):
+        sock, status = connect(proxy, site[len('http://'):])
+        try:
+            assert status.startswith('HTTP/1.1 200')
+            sock.sendall(b'GET /tunnel HTTP/1.0\r\n\r\n')
+            data = b''
+            while True:
+                chunk = sock.recv(1024)
+                if not chunk:
+                    break
+                data += chunk
+        finally:
+            sock.close()
+        assert data.endswith(b'served /tunnel')
+
+    def test_connect_blocked(self, proxy):
+        proxy.block(['https://tracker.example.com/*'])
+        sock, status = connect(proxy, 'tracker.example.com:443')
+        sock.close()
+        assert status.startswith('HTTP/1.1 403')
@@ -1,4 +1,8 @@
+import collections
 import inspect
+import subprocess
+import sys
+import textwrap
 
 try:
     from unittest import mock
@@ -8,10 +12,17 @@ import pytest
 
 from selenium.webdriver.common.by import By
 from selenium.webdriver.remote.webdriver import WebDriver, WebElement
-from selenium.common.exceptions import NoSuchElementException
+from selenium.common.exceptions import (NoSuchElementException, StaleElementReferenceException,
+                                        TimeoutException, WebDriverException)
 
 
-from page_objects import PageObject, PageElement, MultiPageElement
+import page_objects
+from page_objects import (PageObject, PageElement, MultiPageElement, _RESOLVE_SCRIPT, _FILL_SCRIPT,
+                          LazyElement, _CHAIN_SCRIPT, _EXTRACT_SCRIPT, _ITER_SCRIPT, _WAIT_SCRIPT,
+                          _SNAPSHOT_SCRIPT, ElementInfo, _page_elements, _NAVIGATE_SCRIPT,
+                          _LOADED_SCRIPT, _EXISTS_SCRIPT, Component, _WATCH_SCRIPT,
+                          _DRAIN_SCRIPT, Watch)
+from page_objects.snapshot import SnapshotDriver, SnapshotElement
 
 
 @pytest.fixture()
@@ -36,6 +47,60 @@ class TestConstructor:
             PageElement(id_='foo', xpath='bar')
 
 
+class TestRegistry:
+
+    class BasePage(PageObject):
+        test_elem = PageElement(id_='foo')
+        test_elems = MultiPageElement(css='.bar')
+        test_cell = PageElement(css='td', context=True)
+
+    class ChildPage(BasePage):
+        test_elems = None
+        test_link = PageElement(link_text='Home')
+
+    def test_registry(self):
+        assert _page_elements(self.BasePage) == {'test_elem': vars(self.BasePage)['test_elem'],
+                                                 'test_elems': vars(self.BasePage)['test_elems'],
+                                                 'test_cell': vars(self.BasePage)['test_cell']}
+        assert sorted(_page_elements(self.ChildPage)) == ['test_cell', 'test_elem', 'test_link']
+        assert PageObject.page_elements() == ()
+
+    def test_page_elements(self):
+        cell, elem, elems = self.BasePage.page_elements()
+        assert elem == ElementInfo('test_elem', (By.ID, 'foo'), 'single',
+                                   False, vars(self.BasePage)['test_elem'])
+        assert elems.kind == 'multi'
+        assert cell.context
+        assert [e.name for e in self.ChildPage.page_elements()] == [
+            'test_cell', 'test_elem', 'test_link']
+
+    def test_names(self):
+        assert vars(self.BasePage)['test_elem'].name == 'test_elem'
+        assert PageElement(id_='foo').name is None
+
+    def test_set_and_delete(self):
+        class Page(PageObject):
+            test_elem = PageElement(id_='foo')
+
+        class SubPage(Page):
+            pass
+
+        Page.test_new = PageElement(id_='new')
+        assert sorted(_page_elements(SubPage)) == ['test_elem', 'test_new']
+        assert vars(Page)['test_new'].name == 'test_new'
+        del Page.test_elem
+        assert [e.name for e in SubPage.page_elements()] == ['test_new']
+        SubPage.test_new = 'shadowed'
+        assert SubPage.page_elements() == ()
+        assert len(Page.page_elements()) == 1
+
+    def test_slots(self):
+        with pytest.raises(AttributeError):
+            PageElement(id_='foo').color = 'red'
+        with pytest.raises(AttributeError):
+            MultiPageElement(id_='foo').color = 'red'
+
+
 class TestGet:
     def test_get_descriptors(self, webdriver):
         class TestPage(PageObject):
@@ -69,6 +134,22 @@ class TestGet:
         webdriver.find_element.side_effect = NoSuchElementException
         assert page.test_elem is None
 
+    def test_get_custom_find(self, webdriver):
+        class FirstVisible(PageElement):
+            def find(self, context):
+                return [e for e in context.find_elements(*self.locator) if e.is_displayed()][0]
+
+        class TestPage(PageObject):
+            test_elem = FirstVisible(css='foo')
+            test_elem_with_context = FirstVisible(css='foo', context=True)
+
+        hidden, shown = mock.Mock(is_displayed=lambda: False), mock.Mock(is_displayed=lambda: True)
+        webdriver.find_elements.return_value = [hidden, shown]
+        page = TestPage(webdriver=webdriver)
+        assert page.test_elem is shown
+        assert page.test_elem_with_context(webdriver) is shown
+        assert not webdriver.find_element.called
+
     def test_get_unattached(self):
         assert PageElement(css='bar').__get__(None, None) is None
 
@@ -179,3 +260,1184 @@ class TestRootURI:
         page = self.TestPage(webdriver=webdriver)
         page.get('/foo/bar')
         assert webdriver.get.called_once_with("/foo/bar")
+
+
+class TestNavigation:
+
+    class TestPage(PageObject):
+        test_elem = PageElement(id_='foo')
+        test_cell = PageElement(css='td', context=True)
+
+    @pytest.fixture(autouse=True)
+    def no_sleep(self):
+        with mock.patch('time.sleep') as sleep:
+            yield sleep
+
+    def test_get(self, webdriver):
+        page = self.TestPage(webdriver=webdriver, root_uri="http://example.com")
+        page.get('/foo')
+        webdriver.get.assert_called_once_with("http://example.com/foo")
+        assert page.last_navigation.url == "http://example.com/foo"
+        assert page.last_navigation.strategy == 'normal'
+        assert page.last_navigation.seconds >= 0
+
+    def test_skip_if_already_there(self, webdriver):
+        webdriver.current_url = "http://example.com/foo"
+        page = self.TestPage(webdriver=webdriver, root_uri="http://example.com", cache=True)
+        page._element_cache[(vars(self.TestPage)['test_elem'], None)] = "XXX"
+        page.get('/foo', reload=False)
+        assert not webdriver.get.called
+        assert page.last_navigation.strategy == 'skipped'
+        assert page.test_elem == "XXX"
+        page.get('/bar', reload=False)
+        webdriver.get.assert_called_once_with("http://example.com/bar")
+        assert page._element_cache == {}
+
+    def test_eager(self, webdriver):
+        page = self.TestPage(webdriver=webdriver)
+        webdriver.execute_async_script.side_effect = [False, WebDriverException, True]
+        page.get('/foo', strategy='eager')
+        assert not webdriver.get.called
+        url, token, history = webdriver.execute_script.call_args[0][1:]
+        assert webdriver.execute_script.call_args[0][0] == _NAVIGATE_SCRIPT
+        assert (url, history) == ('/foo', False)
+        webdriver.execute_async_script.assert_called_with(_LOADED_SCRIPT, token)
+        assert webdriver.execute_async_script.call_count == 3
+
+    def test_eager_timeout(self, webdriver):
+        page = self.TestPage(webdriver=webdriver)
+        webdriver.execute_async_script.return_value = False
+        with mock.patch('time.time', side_effect=[0, 0, 0, 1, 2, 3]):
+            with pytest.raises(TimeoutException):
+                page.get('/foo', strategy='eager', timeout=2)
+
+    def test_none(self, webdriver):
+        page = self.TestPage(webdriver=webdriver)
+        page.get('/foo', strategy='none')
+        assert webdriver.execute_script.call_count == 1
+        assert not webdriver.execute_async_script.called
+
+    def test_history(self, webdriver):
+        page = self.TestPage(webdriver=webdriver)
+        page.get('/foo', strategy='history')
+        assert webdriver.execute_script.call_args[0][3] is True
+        assert page.last_navigation.strategy == 'history'
+
+    def test_ready(self, webdriver):
+        page = self.TestPage(webdriver=webdriver)
+        webdriver.find_element.return_value = "XXX"
+        page.get('/foo', ready='test_elem')
+        webdriver.find_element.assert_called_once_with(By.ID, 'foo')
+        webdriver.find_element.side_effect = NoSuchElementException
+        with pytest.raises(TimeoutException):
+            page.get('/foo', ready='test_elem')
+
+    def test_ready_element(self, webdriver):
+        class ReadyPage(self.TestPage):
+            ready_element = 'test_elem'
+
+        webdriver.find_element.return_value = "XXX"
+        ReadyPage(webdriver=webdriver).get('/foo')
+        assert webdriver.find_element.called
+
+    def test_bad_args(self, webdriver):
+        page = self.TestPage(webdriver=webdriver)
+        with pytest.raises(ValueError):
+            page.get('/foo', strategy='fast')
+        with pytest.raises(ValueError):
+            page.get('/foo', ready='test_cell')
+        assert not webdriver.get.called
+
+
+class TestCache:
+
+    class TestPage(PageObject):
+        test_elem = PageElement(css='foo')
+        test_elems = MultiPageElement(css='bar')
+        test_child = PageElement(css='baz', context=True)
+
+    def test_not_cached_by_default(self, webdriver):
+        page = self.TestPage(webdriver=webdriver)
+        page.test_elem
+        page.test_elem
+        assert webdriver.find_element.call_count == 2
+
+    def test_cached(self, webdriver):
+        page = self.TestPage(webdriver=webdriver, cache=True)
+        assert page.test_elem is page.test_elem
+        assert page.test_elems is page.test_elems
+        assert webdriver.find_element.call_count == 1
+        assert webdriver.find_elements.call_count == 1
+
+    def test_cached_from_class_attribute(self, webdriver):
+        class TestPage(self.TestPage):
+            cache_elements = True
+
+        page = TestPage(webdriver=webdriver)
+        page.test_elem
+        page.test_elem
+        assert webdriver.find_element.call_count == 1
+
+    def test_cached_with_context(self, webdriver):
+        page = self.TestPage(webdriver=webdriver, cache=True)
+        ctx1 = mock.Mock(spec=WebElement)
+        ctx2 = mock.Mock(spec=WebElement)
+        assert page.test_child(ctx1) is page.test_child(ctx1)
+        assert page.test_child(ctx2) == ctx2.find_element.return_value
+        assert ctx1.find_element.call_count == 1
+        assert ctx2.find_element.call_count == 1
+
+    def test_not_found_not_cached(self, webdriver):
+        page = self.TestPage(webdriver=webdriver, cache=True)
+        webdriver.find_element.side_effect = [NoSuchElementException, "XXX"]
+        assert page.test_elem is None
+        assert page.test_elem == "XXX"
+
+    def test_invalidate(self, webdriver):
+        page = self.TestPage(webdriver=webdriver, cache=True)
+        page.test_elem
+        page.test_elems
+        page.invalidate('test_elem')
+        page.test_elem
+        page.test_elems
+        assert webdriver.find_element.call_count == 2
+        assert webdriver.find_elements.call_count == 1
+        page.invalidate()
+        page.test_elems
+        assert webdriver.find_elements.call_count == 2
+
+    def test_get_invalidates(self, webdriver):
+        page = self.TestPage(webdriver=webdriver, cache=True)
+        page.test_elem
+        page.get('/foo')
+        page.test_elem
+        assert webdriver.find_element.call_count == 2
+
+    def test_set_retries_stale(self, webdriver):
+        page = self.TestPage(webdriver=webdriver, cache=True)
+        stale = mock.Mock(spec=WebElement)
+        stale.send_keys.side_effect = StaleElementReferenceException
+        fresh = mock.Mock(spec=WebElement)
+        webdriver.find_element.side_effect = [stale, fresh]
+        page.test_elem
+        page.test_elem = 'xxx'
+        fresh.send_keys.assert_called_once_with('xxx')
+        assert page.test_elem == fresh
+
+    def test_set_stale_uncached_raises(self, webdriver):
+        page = self.TestPage(webdriver=webdriver)
+        webdriver.find_element.return_value.send_keys.side_effect = StaleElementReferenceException
+        with pytest.raises(StaleElementReferenceException):
+            page.test_elem = 'xxx'
+
+    def test_stale_dropped(self, webdriver):
+        page = self.TestPage(webdriver=webdriver, cache=True)
+        stale = mock.Mock(spec=WebElement)
+        stale.click.side_effect = StaleElementReferenceException
+        fresh = mock.Mock(spec=WebElement)
+        webdriver.find_element.side_effect = [stale, fresh]
+        page.test_elem.click()
+        fresh.click.assert_called_once_with()
+        assert page.test_elem == fresh
+        assert webdriver.find_element.call_count == 2
+
+    def test_stale_multi_dropped(self, webdriver):
+        page = self.TestPage(webdriver=webdriver, cache=True)
+        stale = mock.Mock(spec=WebElement)
+        stale.click.side_effect = StaleElementReferenceException
+        fresh = mock.Mock(spec=WebElement)
+        webdriver.find_elements.side_effect = [[mock.Mock(), stale], [mock.Mock(), fresh]]
+        page.test_elems[1].click()
+        fresh.click.assert_called_once_with()
+        assert page.test_elems[1] == fresh
+        assert webdriver.find_elements.call_count == 2
+
+    def test_stale_context_refreshed(self, webdriver):
+        page = self.TestPage(webdriver=webdriver, cache=True)
+        stale = mock.Mock(spec=WebElement)
+        stale.find_element.side_effect = StaleElementReferenceException
+        fresh = mock.Mock(spec=WebElement)
+        webdriver.find_element.side_effect = [stale, fresh]
+        assert page.test_child(page.test_elem) == fresh.find_element.return_value
+        assert page.test_elem == fresh
+
+    def test_stale_context_not_cached(self, webdriver):
+        page = self.TestPage(webdriver=webdriver, cache=True)
+        stale = mock.Mock(spec=WebElement)
+        stale.find_element.side_effect = StaleElementReferenceException
+        with pytest.raises(StaleElementReferenceException):
+            page.test_child(stale)
+
+
+class TestResolve:
+
+    class TestPage(PageObject):
+        test_elem = PageElement(id_='foo')
+        test_elems = MultiPageElement(class_name='bar')
+        test_link = PageElement(link_text='Home')
+        test_child = PageElement(css='baz', context=True)
+
+    def test_locators_translated(self):
+        assert PageElement(css='a b').script_locator == (By.CSS_SELECTOR, 'a b')
+        assert PageElement(xpath='//a').script_locator == (By.XPATH, '//a')
+        assert PageElement(id_='foo').script_locator == (By.CSS_SELECTOR, '[id="foo"]')
+        assert PageElement(name='foo').script_locator == (By.CSS_SELECTOR, '[name="foo"]')
+        assert PageElement(class_name='foo').script_locator == (By.CSS_SELECTOR, '.foo')
+        assert PageElement(tag_name='tr').script_locator == (By.CSS_SELECTOR, 'tr')
+        assert PageElement(link_text='foo').script_locator is None
+        assert PageElement(partial_link_text='foo').script_locator is None
+
+    def test_resolve(self, webdriver):
+        page = self.TestPage(webdriver=webdriver, cache=True)
+        webdriver.execute_script.return_value = ["XXX", ["YYY", "ZZZ"]]
+        assert page.resolve('test_elem', 'test_elems') == {
+            'test_elem': "XXX",
+            'test_elems': ["YYY", "ZZZ"],
+        }
+        webdriver.execute_script.assert_called_once_with(_RESOLVE_SCRIPT, [
+            [None, By.CSS_SELECTOR, '[id="foo"]', False],
+            [None, By.CSS_SELECTOR, '.bar', True],
+        ])
+        assert page.test_elem == "XXX"
+        assert page.test_elems == ["YYY", "ZZZ"]
+        assert not webdriver.find_element.called
+        assert not webdriver.find_elements.called
+
+    def test_resolve_not_cached_by_default(self, webdriver):
+        page = self.TestPage(webdriver=webdriver)
+        webdriver.execute_script.return_value = ["XXX"]
+        assert page.resolve('test_elem') == {'test_elem': "XXX"}
+        assert page.test_elem is webdriver.find_element.return_value
+        assert not page._element_cache
+
+    def test_resolve_all(self, webdriver):
+        page = self.TestPage(webdriver=webdriver)
+        webdriver.execute_script.return_value = ["XXX", ["YYY"]]
+        webdriver.find_element.return_value = "LINK"
+        assert page.resolve() == {
+            'test_elem': "XXX",
+            'test_elems': ["YYY"],
+            'test_link': "LINK",
+        }
+        webdriver.find_element.assert_called_once_with(By.LINK_TEXT, 'Home')
+        assert webdriver.execute_script.call_count == 1
+
+    def test_resolve_cached(self, webdriver):
+        page = self.TestPage(webdriver=webdriver, cache=True)
+        page.test_elem
+        webdriver.execute_script.return_value = [["YYY"]]
+        res = page.resolve('test_elem', 'test_elems')
+        assert res['test_elem'] == webdriver.find_element.return_value
+        assert webdriver.execute_script.call_args[0][1] == [
+            [None, By.CSS_SELECTOR, '.bar', True]]
+
+    def test_resolve_not_found(self, webdriver):
+        page = self.TestPage(webdriver=webdriver)
+        webdriver.execute_script.return_value = [None, []]
+        assert page.resolve('test_elem', 'test_elems') == {
+            'test_elem': None,
+            'test_elems': [],
+        }
+        webdriver.find_element.return_value = "XXX"
+        assert page.test_elem == "XXX"
+
+    def test_resolve_script_error_falls_back(self, webdriver):
+        page = self.TestPage(webdriver=webdriver)
+        webdriver.execute_script.return_value = [False]
+        webdriver.find_element.return_value = "XXX"
+        assert page.resolve('test_elem') == {'test_elem': "XXX"}
+        webdriver.find_element.assert_called_once_with(By.ID, 'foo')
+
+    def test_resolve_with_context(self, webdriver):
+        page = self.TestPage(webdriver=webdriver)
+        with pytest.raises(ValueError) as e:
+            page.resolve('test_child')
+        assert "with context" in e.value.args[0]
+
+
+class TestFill:
+
+    class TestPage(PageObject):
+        test_elem = PageElement(id_='foo')
+        test_elems = MultiPageElement(class_name='bar')
+        test_link = PageElement(link_text='Home')
+        test_child = PageElement(css='baz', context=True)
+
+    def test_fill(self, webdriver):
+        page = self.TestPage(webdriver=webdriver, cache=True)
+        webdriver.execute_script.return_value = [["XXX", ["YYY", "ZZZ"]], True]
+        page.fill(test_elem='a', test_elems=True)
+        webdriver.execute_script.assert_called_once_with(_FILL_SCRIPT, [
+            [None, By.CSS_SELECTOR, '[id="foo"]', False, 'a'],
+            [None, By.CSS_SELECTOR, '.bar', True, True],
+        ])
+        assert page.test_elem == "XXX"
+        assert page.test_elems == ["YYY", "ZZZ"]
+        assert not webdriver.find_element.called
+
+    def test_fill_order(self, webdriver):
+        page = self.TestPage(webdriver=webdriver)
+        webdriver.execute_script.return_value = [["XXX", ["YYY"], "ZZZ"], True]
+        page.fill(collections.OrderedDict([('test_elems', 'b'), ('test_elem', 'a')]),
+                  test_link='c')
+        queries = webdriver.execute_script.call_args[0][1]
+        assert [q[4] for q in queries] == ['b', 'a', 'c']
+        with pytest.raises(TypeError):
+            page.fill({}, {})
+
+    def test_fill_not_cached_by_default(self, webdriver):
+        page = self.TestPage(webdriver=webdriver)
+        webdriver.execute_script.return_value = [["XXX"], True]
+        page.fill(test_elem='a')
+        assert page.test_elem is webdriver.find_element.return_value
+        assert not page._element_cache
+
+    def test_fill_uses_cache_and_fallback(self, webdriver):
+        page = self.TestPage(webdriver=webdriver, cache=True)
+        elem = page.test_elem
+        webdriver.find_element.return_value = "LINK"
+        webdriver.execute_script.return_value = [[elem, "LINK"], True]
+        page.fill(test_elem='a', test_link='b')
+        webdriver.execute_script.assert_called_once_with(_FILL_SCRIPT, [
+            [elem, By.CSS_SELECTOR, '[id="foo"]', False, 'a'],
+            ["LINK", None, None, False, 'b'],
+        ])
+
+    def test_fill_not_found(self, webdriver):
+        page = self.TestPage(webdriver=webdriver)
+        webdriver.execute_script.return_value = [["XXX", []], False]
+        with pytest.raises(ValueError) as e:
+            page.fill(test_elem='a', test_elems='b')
+        assert "no elements found" in e.value.args[0]
+        assert webdriver.execute_script.call_count == 1
+
+    def test_fill_script_error_falls_back(self, webdriver):
+        page = self.TestPage(webdriver=webdriver)
+        webdriver.find_element.return_value = "XXX"
+        webdriver.execute_script.side_effect = [[[False], False], [["XXX"], True]]
+        page.fill(test_elem='a')
+        webdriver.find_element.assert_called_once_with(By.ID, 'foo')
+        assert webdriver.execute_script.call_args[0][1] == [
+            ["XXX", By.CSS_SELECTOR, '[id="foo"]', False, 'a']]
+
+    def test_fill_stale(self, webdriver):
+        page = self.TestPage(webdriver=webdriver, cache=True)
+        page.test_elem
+        webdriver.execute_script.side_effect = [StaleElementReferenceException,
+                                                [["XXX"], True]]
+        page.fill(test_elem='a')
+        assert webdriver.execute_script.call_args[0][1] == [
+            [None, By.CSS_SELECTOR, '[id="foo"]', False, 'a']]
+        assert page.test_elem == "XXX"
+
+    def test_fill_with_context(self, webdriver):
+        page = self.TestPage(webdriver=webdriver)
+        with pytest.raises(ValueError) as e:
+            page.fill(test_child='a')
+        assert "with context" in e.value.args[0]
+        assert not webdriver.execute_script.called
+
+
+class TestWait:
+
+    class TestPage(PageObject):
+        test_elem = PageElement(id_='foo', wait=2)
+        test_elems = MultiPageElement(css='.bar', wait=2, until='visible')
+        test_link = PageElement(link_text='Home', wait=0.1, until='enabled')
+        test_child = PageElement(css='baz', context=True, wait=2)
+
+    @pytest.fixture(autouse=True)
+    def no_sleep(self):
+        with mock.patch('time.sleep') as sleep:
+            yield sleep
+
+    def test_bad_condition(self):
+        with pytest.raises(ValueError):
+            PageElement(css='foo', wait=1, until='gone')
+
+    def test_not_waiting(self, webdriver):
+        class TestPage(PageObject):
+            test_elem = PageElement(id_='foo')
+
+        TestPage(webdriver=webdriver).test_elem
+        assert not webdriver.execute_async_script.called
+
+    def test_wait_in_browser(self, webdriver):
+        page = self.TestPage(webdriver=webdriver)
+        webdriver.execute_async_script.return_value = "XXX"
+        assert page.test_elem == "XXX"
+        webdriver.execute_async_script.assert_called_once_with(
+            _WAIT_SCRIPT, None, By.CSS_SELECTOR, '[id="foo"]', False, 'present', 2000)
+        assert not webdriver.find_element.called
+
+    def test_wait_multi(self, webdriver):
+        page = self.TestPage(webdriver=webdriver)
+        webdriver.execute_async_script.return_value = []
+        assert page.test_elems == []
+        assert webdriver.execute_async_script.call_args[0][1:] == (
+            None, By.CSS_SELECTOR, '.bar', True, 'visible', 2000)
+
+    def test_wait_with_context(self, webdriver):
+        page = self.TestPage(webdriver=webdriver)
+        elem = mock.Mock(spec=WebElement)
+        elem.parent = webdriver
+        webdriver.execute_async_script.return_value = "XXX"
+        assert page.test_child(elem) == "XXX"
+        assert webdriver.execute_async_script.call_args[0][1] is elem
+
+    def test_script_error_falls_back_to_polling(self, webdriver, no_sleep):
+        page = self.TestPage(webdriver=webdriver)
+        webdriver.execute_async_script.side_effect = TimeoutException
+        webdriver.find_element.side_effect = [NoSuchElementException, NoSuchElementException, "XXX"]
+        assert page.test_elem == "XXX"
+        assert webdriver.find_element.call_count == 3
+        assert no_sleep.call_count == 2
+
+    def test_poll_until_timeout(self, webdriver, no_sleep):
+        page = self.TestPage(webdriver=webdriver)
+        elem = mock.Mock(spec=WebElement)
+        elem.is_enabled.return_value = False
+        webdriver.find_element.return_value = elem
+        with mock.patch('time.time', side_effect=[0, 0, 0.2]):
+            assert page.test_link is None
+        assert not webdriver.execute_async_script.called
+        assert elem.is_enabled.call_count == 2
+
+    def test_resolve_and_fill_wait(self, webdriver):
+        page = self.TestPage(webdriver=webdriver)
+        webdriver.execute_async_script.return_value = "XXX"
+        webdriver.execute_script.return_value = [["XXX"], True]
+        assert page.resolve('test_elem') == {'test_elem': "XXX"}
+        assert not webdriver.execute_script.called
+        page.invalidate()
+        page.fill(test_elem='a')
+        assert webdriver.execute_script.call_args[0][1] == [
+            ["XXX", By.CSS_SELECTOR, '[id="foo"]', False, 'a']]
+
+
+class TestLazy:
+
+    class TestPage(PageObject):
+        test_elem = PageElement(id_='foo', lazy=True)
+        test_elems = MultiPageElement(css='.bar', lazy=True)
+        test_child = PageElement(css='baz', context=True, lazy=True)
+        test_eager_child = PageElement(css='qux', context=True)
+
+    def test_not_looked_up(self, webdriver):
+        page = self.TestPage(webdriver=webdriver)
+        elem = page.test_elem
+        assert isinstance(elem, LazyElement)
+        assert not webdriver.find_element.called
+        assert 'unresolved' in repr(elem)
+
+    def test_looked_up_on_use(self, webdriver):
+        page = self.TestPage(webdriver=webdriver)
+        webdriver.find_element.return_value.text = 'XXX'
+        elem = page.test_elem
+        elem.click()
+        assert elem.text == 'XXX'
+        webdriver.find_element.assert_called_once_with(By.ID, 'foo')
+        webdriver.find_element.return_value.click.assert_called_once_with()
+        assert elem.resolve() is webdriver.find_element.return_value
+        assert elem == webdriver.find_element.return_value
+
+    def test_hash(self, webdriver):
+        page = self.TestPage(webdriver=webdriver)
+        found = webdriver.find_element.return_value
+        first, second = page.test_elem, page.test_elem
+        assert hash(first) == hash(second) == hash(found)
+        assert len(set([first, second, found])) == 1
+        assert {found: 'XXX'}[first] == 'XXX'
+
+    def test_truth(self, webdriver):
+        page = self.TestPage(webdriver=webdriver)
+        webdriver.find_element.side_effect = NoSuchElementException
+        elem = page.test_elem
+        assert not elem
+        with pytest.raises(NoSuchElementException):
+            elem.click()
+
+    def test_multi(self, webdriver):
+        page = self.TestPage(webdriver=webdriver)
+        webdriver.find_elements.return_value = ["XXX", "YYY"]
+        elems = page.test_elems
+        assert not webdriver.find_elements.called
+        assert len(elems) == 2
+        assert list(elems) == ["XXX", "YYY"]
+        assert elems[1] == "YYY"
+        assert webdriver.find_elements.call_count == 1
+
+    def test_context_chain(self, webdriver):
+        page = self.TestPage(webdriver=webdriver)
+        parent = page.test_elem
+        child = page.test_child(parent)
+        assert child.locators == [(By.ID, 'foo'), (By.CSS_SELECTOR, 'baz')]
+        assert not webdriver.find_element.called
+        child.click()
+        webdriver.execute_script.assert_called_once_with(_CHAIN_SCRIPT, None, [
+            [By.CSS_SELECTOR, '[id="foo"]'], [By.CSS_SELECTOR, 'baz']], False)
+        webdriver.execute_script.return_value.click.assert_called_once_with()
+        assert not webdriver.find_element.called
+
+    def test_context_chain_script_error(self, webdriver):
+        page = self.TestPage(webdriver=webdriver)
+        webdriver.execute_script.return_value = False
+        page.test_child(page.test_elem).click()
+        webdriver.find_element.assert_called_once_with(By.ID, 'foo')
+        webdriver.find_element.return_value.find_element.assert_called_once_with(
+            By.CSS_SELECTOR, 'baz')
+
+    def test_eager_with_lazy_context(self, webdriver):
+        page = self.TestPage(webdriver=webdriver)
+        res = page.test_eager_child(page.test_elem)
+        assert res == webdriver.find_element.return_value.find_element.return_value
+
+    def test_stale_re_resolved(self, webdriver):
+        page = self.TestPage(webdriver=webdriver, cache=True)
+        stale = mock.Mock(spec=WebElement)
+        stale.click.side_effect = StaleElementReferenceException
+        fresh = mock.Mock(spec=WebElement)
+        webdriver.find_element.side_effect = [stale, fresh]
+        elem = page.test_elem
+        elem.click()
+        fresh.click.assert_called_once_with()
+        assert elem.resolve() is fresh
+        assert page.test_elem.resolve() is fresh
+
+    def test_stale_context_re_resolved(self, webdriver):
+        page = self.TestPage(webdriver=webdriver)
+        stale = mock.Mock(spec=WebElement)
+        stale.find_element.side_effect = StaleElementReferenceException
+        fresh = mock.Mock(spec=WebElement)
+        webdriver.find_element.side_effect = [stale, fresh]
+        webdriver.execute_script.return_value = False
+        child = page.test_child(page.test_elem)
+        child.click()
+        fresh.find_element.return_value.click.assert_called_once_with()
+
+    def test_set(self, webdriver):
+        page = self.TestPage(webdriver=webdriver)
+        page.test_elem = 'XXX'
+        webdriver.find_element.return_value.send_keys.assert_called_once_with('XXX')
+
+
+class TestParent:
+
+    class TestPage(PageObject):
+        test_form = PageElement(id_='form')
+        test_input = PageElement(name='user', parent=test_form)
+        test_table = PageElement(xpath='//table')
+        test_cells = MultiPageElement(xpath='.//td', parent=test_table)
+        test_section = PageElement(css='div.section')
+        test_header = PageElement(css='h1', parent=test_section)
+        test_link = PageElement(link_text='Home', parent=test_section)
+        test_row = PageElement(css='tr', context=True)
+        test_cell = PageElement(css='td', parent=test_row)
+
+    def test_compiled_css(self, webdriver):
+        page = self.TestPage(webdriver=webdriver)
+        assert page.test_input == webdriver.find_element.return_value
+        webdriver.find_element.assert_called_once_with(By.CSS_SELECTOR,
+                                                       '[id="form"] [name="user"]')
+
+    def test_combinator_not_compiled(self, webdriver):
+        form = PageElement(id_='form')
+        assert PageElement(css='input.user', parent=form).compiled
+        for css in ('div input', 'div > input', 'label + input', 'label ~ input', 'a, b'):
+            assert not PageElement(css=css, parent=form).compiled
+
+    def test_compiled_xpath(self, webdriver):
+        page = self.TestPage(webdriver=webdriver)
+        webdriver.find_elements.return_value = ["XXX"]
+        assert page.test_cells == ["XXX"]
+        webdriver.find_elements.assert_called_once_with(By.XPATH, '(//table)[1]//td')
+
+    def test_chain_script(self, webdriver):
+        page = self.TestPage(webdriver=webdriver)
+        webdriver.execute_script.return_value = "XXX"
+        assert page.test_header == "XXX"
+        webdriver.execute_script.assert_called_once_with(_CHAIN_SCRIPT, None, [
+            [By.CSS_SELECTOR, 'div.section'], [By.CSS_SELECTOR, 'h1']], False)
+        assert not webdriver.find_element.called
+
+    def test_chain_script_error(self, webdriver):
+        page = self.TestPage(webdriver=webdriver)
+        webdriver.execute_script.return_value = False
+        assert page.test_header == webdriver.find_element.return_value.find_element.return_value
+        webdriver.find_element.assert_called_once_with(By.CSS_SELECTOR, 'div.section')
+
+    def test_sequential(self, webdriver):
+        page = self.TestPage(webdriver=webdriver)
+        section = webdriver.find_element.return_value
+        assert page.test_link == section.find_element.return_value
+        section.find_element.assert_called_once_with(By.LINK_TEXT, 'Home')
+        assert not webdriver.execute_script.called
+
+    def test_parent_not_found(self, webdriver):
+        page = self.TestPage(webdriver=webdriver)
+        webdriver.find_element.side_effect = NoSuchElementException
+        assert page.test_link is None
+
+    def test_cached_parent(self, webdriver):
+        page = self.TestPage(webdriver=webdriver, cache=True)
+        section = page.test_section.resolve()
+        assert page.test_header == section.find_element.return_value
+        section.find_element.assert_called_once_with(By.CSS_SELECTOR, 'h1')
+        assert not webdriver.execute_script.called
+
+    def test_stale_cached_parent(self, webdriver):
+        page = self.TestPage(webdriver=webdriver, cache=True)
+        section = page.test_section.resolve()
+        section.find_element.side_effect = StaleElementReferenceException
+        webdriver.execute_script.return_value = "XXX"
+        assert page.test_header == "XXX"
+        assert (page.__class__.test_section, None) not in page._element_cache
+
+    def test_context(self, webdriver):
+        page = self.TestPage(webdriver=webdriver)
+        row = mock.Mock(spec=WebElement)
+        row.parent = webdriver
+        webdriver.execute_script.return_value = "XXX"
+        assert page.test_cell(row) == "XXX"
+        assert webdriver.execute_script.call_args[0][1] is row
+
+    def test_resolve(self, webdriver):
+        page = self.TestPage(webdriver=webdriver)
+        # Elements that can't be batched are looked up first
+        webdriver.execute_script.side_effect = ["YYY", ["XXX"]]
+        assert page.resolve('test_input', 'test_header') == {
+            'test_input': "XXX", 'test_header': "YYY"}
+        assert webdriver.execute_script.call_args_list[1][0] == (_RESOLVE_SCRIPT, [
+            [None, By.CSS_SELECTOR, '[id="form"] [name="user"]', False]])
+
+    def test_chain(self):
+        row, cell = vars(self.TestPage)['test_row'], vars(self.TestPage)['test_cell']
+        assert cell.chain == [row, cell]
+        assert cell.has_context
+
+    def test_bad_parent(self):
+        with pytest.raises(ValueError):
+            PageElement(css='td', parent=MultiPageElement(css='tr'))
+        with pytest.raises(ValueError):
+            PageElement(css='td', context=True, parent=PageElement(css='tr'))
+
+
+class TestHas:
+
+    class TestPage(PageObject):
+        test_elem = PageElement(id_='foo', wait=5)
+        test_elems = MultiPageElement(css='.bar')
+        test_link = PageElement(link_text='Home')
+        test_cell = PageElement(css='td', context=True)
+        test_parent = PageElement(id_='form')
+        test_child = PageElement(link_text='Help', parent=test_parent)
+
+    def test_has(self, webdriver):
+        page = self.TestPage(webdriver=webdriver)
+        webdriver.execute_script.return_value = False
+        assert page.has('test_elem') is False
+        webdriver.execute_script.assert_called_once_with(
+            _EXISTS_SCRIPT, None, By.CSS_SELECTOR, '[id="foo"]')
+        assert not webdriver.find_element.called
+        assert not webdriver.execute_async_script.called
+        webdriver.execute_script.return_value = True
+        assert page.has('test_elems') is True
+
+    def test_link_text(self, webdriver):
+        page = self.TestPage(webdriver=webdriver)
+        webdriver.execute_script.return_value = True
+        assert page.has('test_link')
+        webdriver.execute_script.assert_called_once_with(
+            _EXISTS_SCRIPT, None, By.LINK_TEXT, 'Home')
+
+    def test_with_context(self, webdriver):
+        page = self.TestPage(webdriver=webdriver)
+        with pytest.raises(ValueError):
+            page.has('test_cell')
+        row = mock.Mock(spec=WebElement)
+        row.parent = webdriver
+        webdriver.execute_script.return_value = True
+        assert page.has('test_cell', row)
+        assert webdriver.execute_script.call_args[0][1] is row
+
+    def test_script_error_falls_back(self, webdriver):
+        page = self.TestPage(webdriver=webdriver)
+        webdriver.execute_script.return_value = None
+        webdriver.find_elements.return_value = []
+        assert not page.has('test_elems')
+        webdriver.execute_script.side_effect = WebDriverException
+        webdriver.find_element.return_value = "XXX"
+        assert page.has('test_link')
+
+    def test_parent(self, webdriver):
+        page = self.TestPage(webdriver=webdriver)
+        webdriver.execute_script.return_value = False
+        assert not page.has('test_child')
+        assert webdriver.execute_script.call_count == 1
+        webdriver.execute_script.side_effect = [True, True]
+        webdriver.find_element.return_value = form = mock.Mock(spec=WebElement)
+        form.parent = webdriver
+        assert page.has('test_child')
+        assert webdriver.execute_script.call_args[0][1:] == (form, By.LINK_TEXT, 'Help')
+
+
+class TestExtract:
+
+    class TestPage(PageObject):
+        test_elem = PageElement(id_='foo')
+        test_elems = MultiPageElement(css='.bar')
+        test_links = MultiPageElement(partial_link_text='Home')
+        test_cells = MultiPageElement(css='td', context=True)
+
+    def test_extract(self, webdriver):
+        page = self.TestPage(webdriver=webdriver)
+        webdriver.execute_script.return_value = [['a', 'b'], ['1', '2']]
+        assert page.extract('test_elems', ['text', 'data-id']) == {
+            'text': ['a', 'b'], 'data-id': ['1', '2']}
+        webdriver.execute_script.assert_called_once_with(
+            _EXTRACT_SCRIPT, None, None, By.CSS_SELECTOR, '.bar', ['text', 'data-id'], True)
+        assert not webdriver.find_elements.called
+
+    def test_extract_single(self, webdriver):
+        page = self.TestPage(webdriver=webdriver)
+        webdriver.execute_script.return_value = [['a']]
+        assert page.extract('test_elem', ['text']) == {'text': ['a']}
+        webdriver.execute_script.assert_called_once_with(
+            _EXTRACT_SCRIPT, None, None, By.CSS_SELECTOR, '[id="foo"]', ['text'], False)
+
+    def test_extract_cached(self, webdriver):
+        page = self.TestPage(webdriver=webdriver, cache=True)
+        webdriver.find_element.return_value = "XXX"
+        page.test_elem
+        webdriver.execute_script.return_value = [['a']]
+        assert page.extract('test_elem', ['text']) == {'text': ['a']}
+        assert webdriver.execute_script.call_args[0][2] == ["XXX"]
+
+    def test_extract_no_script_locator(self, webdriver):
+        page = self.TestPage(webdriver=webdriver)
+        webdriver.find_elements.return_value = ["XXX", "YYY"]
+        webdriver.execute_script.return_value = [['a', 'b']]
+        page.extract('test_links', ['href'])
+        assert webdriver.execute_script.call_args[0][2] == ["XXX", "YYY"]
+
+    def test_extract_script_error_falls_back(self, webdriver):
+        page = self.TestPage(webdriver=webdriver)
+        webdriver.find_elements.return_value = ["XXX"]
+        webdriver.execute_script.side_effect = [False, [['a']]]
+        assert page.extract('test_elems', ['text']) == {'text': ['a']}
+        webdriver.find_elements.assert_called_once_with(By.CSS_SELECTOR, '.bar')
+
+    def test_extract_stale(self, webdriver):
+        page = self.TestPage(webdriver=webdriver, cache=True)
+        webdriver.find_elements.return_value = ["XXX"]
+        page.test_elems
+        webdriver.execute_script.side_effect = [StaleElementReferenceException, [['a']]]
+        assert page.extract('test_elems', ['text']) == {'text': ['a']}
+        assert webdriver.execute_script.call_args[0][2] is None
+
+    def test_extract_with_context(self, webdriver):
+        page = self.TestPage(webdriver=webdriver)
+        with pytest.raises(ValueError):
+            page.extract('test_cells', ['text'])
+        row = mock.Mock(spec=WebElement)
+        webdriver.execute_script.return_value = [[]]
+        assert page.extract('test_cells', ['text'], context=row) == {'text': []}
+        assert webdriver.execute_script.call_args[0][1] is row
+
+
+class TestIterate:
+
+    class TestPage(PageObject):
+        test_elem = PageElement(id_='foo')
+        test_elems = MultiPageElement(css='.bar')
+        test_links = MultiPageElement(link_text='Home')
+        test_cells = MultiPageElement(css='td', context=True)
+
+    @pytest.fixture(autouse=True)
+    def no_sleep(self):
+        with mock.patch('time.sleep') as sleep:
+            yield sleep
+
+    def test_batches(self, webdriver):
+        page = self.TestPage(webdriver=webdriver)
+        webdriver.execute_script.side_effect = [["A", "B"], ["C"], []]
+        assert list(page.iterate('test_elems', batch=2)) == ["A", "B", "C"]
+        assert webdriver.execute_script.call_count == 3
+        args = webdriver.execute_script.call_args[0]
+        assert args[0] == _ITER_SCRIPT
+        assert args[1:4] == (None, By.CSS_SELECTOR, '.bar')
+        assert args[5:] == (2, None, False)
+
+    def test_lazy(self, webdriver):
+        page = self.TestPage(webdriver=webdriver)
+        webdriver.execute_script.side_effect = [["A", "B"], ["C"], []]
+        it = page.iterate('test_elems', batch=2)
+        assert next(it) == "A"
+        assert webdriver.execute_script.call_count == 1
+
+    def test_limit(self, webdriver):
+        page = self.TestPage(webdriver=webdriver)
+        webdriver.execute_script.side_effect = [["A", "B"], ["C"], []]
+        assert list(page.iterate('test_elems', batch=2, limit=2)) == ["A", "B"]
+        assert webdriver.execute_script.call_count == 1
+        assert list(page.iterate('test_elems', limit=0)) == []
+
+    def test_until(self, webdriver):
+        page = self.TestPage(webdriver=webdriver)
+        webdriver.execute_script.side_effect = [["A", "B"], ["C"], []]
+        assert list(page.iterate('test_elems', until=lambda e: e == "B")) == ["A"]
+
+    def test_scroll(self, webdriver, no_sleep):
+        page = self.TestPage(webdriver=webdriver)
+        webdriver.execute_script.side_effect = [["A"], [], ["B"], [], []]
+        assert list(page.iterate('test_elems', scroll=True, pause=2)) == ["A", "B"]
+        assert no_sleep.mock_calls == [mock.call(2), mock.call(2)]
+        assert webdriver.execute_script.call_args[0][-1] is True
+
+    def test_more(self, webdriver):
+        page = self.TestPage(webdriver=webdriver)
+        webdriver.execute_script.side_effect = [["A"], [], ["B"], []]
+        more = mock.Mock(side_effect=[True, False])
+        assert list(page.iterate('test_elems', more=more)) == ["A", "B"]
+        more.assert_called_with(page)
+        assert more.call_count == 2
+
+    def test_key(self, webdriver):
+        page = self.TestPage(webdriver=webdriver)
+        webdriver.execute_script.return_value = []
+        list(page.iterate('test_elems', key='data-id'))
+        assert webdriver.execute_script.call_args[0][6] == 'data-id'
+
+    def test_no_script_locator(self, webdriver):
+        page = self.TestPage(webdriver=webdriver)
+        webdriver.find_elements.return_value = ["A", "B", "C"]
+        assert list(page.iterate('test_links', batch=2)) == ["A", "B", "C"]
+        assert not webdriver.execute_script.called
+
+    def test_script_error_falls_back(self, webdriver):
+        page = self.TestPage(webdriver=webdriver)
+        webdriver.execute_script.return_value = False
+        webdriver.find_elements.return_value = ["A"]
+        assert list(page.iterate('test_elems')) == ["A"]
+
+    def test_bad_elements(self, webdriver):
+        page = self.TestPage(webdriver=webdriver)
+        with pytest.raises(ValueError):
+            list(page.iterate('test_elem'))
+        with pytest.raises(ValueError):
+            list(page.iterate('test_cells'))
+
+
+class TestSnapshot:
+
+    class TestPage(PageObject):
+        test_elem = PageElement(id_='foo')
+        test_elems = MultiPageElement(css='.bar')
+        test_link = PageElement(link_text='Home')
+        test_cell = PageElement(css='td', context=True)
+
+    HTML = '<div id="foo"><p class="bar">a</p><p class="bar">b</p><a href="/home">Home</a></div>'
+
+    def test_snapshot(self, webdriver):
+        page = self.TestPage(webdriver=webdriver)
+        webdriver.execute_script.return_value = [self.HTML, 'http://example.com/x', 'Example']
+        snap = page.snapshot()
+        webdriver.execute_script.assert_called_once_with(_SNAPSHOT_SCRIPT, None, None, None)
+        assert isinstance(snap.w, SnapshotDriver)
+        assert snap.w.title == 'Example'
+        assert [e.text for e in snap.test_elems] == ['a', 'b']
+        assert snap.test_link.get_attribute('href') == 'http://example.com/home'
+        assert page.w is webdriver
+        assert webdriver.execute_script.call_count == 1
+        assert not webdriver.find_element.called
+
+    def test_snapshot_element(self, webdriver):
+        page = self.TestPage(webdriver=webdriver)
+        webdriver.execute_script.return_value = [self.HTML, 'about:blank', '']
+        page.snapshot('test_elem')
+        webdriver.execute_script.assert_called_once_with(
+            _SNAPSHOT_SCRIPT, None, By.CSS_SELECTOR, '[id="foo"]')
+
+    def test_snapshot_element_no_script_locator(self, webdriver):
+        page = self.TestPage(webdriver=webdriver)
+        webdriver.find_element.return_value = "XXX"
+        webdriver.execute_script.return_value = ['<a>Home</a>', 'about:blank', '']
+        page.snapshot('test_link')
+        webdriver.execute_script.assert_called_once_with(_SNAPSHOT_SCRIPT, "XXX", None, None)
+
+    def test_snapshot_not_cached(self, webdriver):
+        page = self.TestPage(webdriver=webdriver, cache=True)
+        webdriver.find_element.return_value = "XXX"
+        page.test_elem
+        webdriver.execute_script.return_value = [self.HTML, 'about:blank', '']
+        snap = page.snapshot()
+        assert isinstance(snap.test_elem, SnapshotElement)
+        assert page.test_elem == "XXX"
+
+    def test_snapshot_not_found(self, webdriver):
+        page = self.TestPage(webdriver=webdriver)
+        webdriver.execute_script.return_value = [None, 'about:blank', '']
+        with pytest.raises(ValueError):
+            page.snapshot('test_elem')
+
+    def test_bad_elements(self, webdriver):
+        page = self.TestPage(webdriver=webdriver)
+        with pytest.raises(ValueError):
+            page.snapshot('test_elems')
+        with pytest.raises(ValueError):
+            page.snapshot('test_cell')
+
+
+class TestCapture:
+
+    class TestPage(PageObject):
+        test_elem = PageElement(id_='foo')
+        test_elems = MultiPageElement(css='.bar')
+        test_cell = PageElement(css='td', context=True)
+        test_lazy = PageElement(id_='baz', lazy=True)
+
+    def test_capture(self, webdriver):
+        page = self.TestPage(webdriver=webdriver)
+        webdriver.find_element.return_value.screenshot_as_png = b'png'
+        assert page.capture('test_elem') == b'png'
+        webdriver.find_element.assert_called_once_with(By.ID, 'foo')
+
+    def test_with_context(self, webdriver):
+        page = self.TestPage(webdriver=webdriver)
+        with pytest.raises(ValueError):
+            page.capture('test_cell')
+        row = mock.Mock(spec=WebElement)
+        row.find_element.return_value.screenshot_as_png = b'cell'
+        assert page.capture('test_cell', row) == b'cell'
+        row.find_element.assert_called_once_with(By.CSS_SELECTOR, 'td')
+
+    def test_lazy(self, webdriver):
+        page = self.TestPage(webdriver=webdriver)
+        webdriver.find_element.return_value.screenshot_as_png = b'png'
+        assert page.capture('test_lazy') == b'png'
+
+    def test_multi(self, webdriver):
+        page = self.TestPage(webdriver=webdriver)
+        with pytest.raises(ValueError):
+            page.capture('test_elems')
+
+    def test_not_found(self, webdriver):
+        page = self.TestPage(webdriver=webdriver)
+        webdriver.find_element.side_effect = NoSuchElementException
+        with pytest.raises(ValueError):
+            page.capture('test_elem')
+
+
+class Header(Component):
+    logo = PageElement(id_='logo')
+    links = MultiPageElement(css='#nav a')
+    item = PageElement(tag_name='li', context=True)
+
+
+class HomePage(Header, PageObject):
+    news = PageElement(id_='news')
+
+
+class SearchPage(Header, PageObject):
+    results = PageElement(id_='results')
+
+
+class TestComponent:
+
+    def test_registered(self):
+        assert [e.name for e in HomePage.page_elements()] == ['item', 'links', 'logo', 'news']
+        elements = _page_elements(HomePage)
+        assert elements['logo'].shared
+        assert not elements['news'].shared
+
+    def test_shared_between_pages(self, webdriver):
+        home = HomePage(webdriver)
+        logo = home.logo
+        assert SearchPage(webdriver).logo is logo
+        assert HomePage(webdriver).logo is logo
+        webdriver.find_element.assert_called_once_with(By.ID, 'logo')
+
+    def test_multi_and_context(self, webdriver):
+        SearchPage(webdriver).links
+        HomePage(webdriver).links
+        # Lists can't tell when the document changes, so aren't shared
+        assert webdriver.find_elements.call_count == 2
+        row = mock.Mock(spec=WebElement)
+        assert HomePage(webdriver).item(row) is SearchPage(webdriver).item(row)
+        assert row.find_element.call_count == 1
+
+    def test_own_elements_not_cached(self, webdriver):
+        HomePage(webdriver).news
+        HomePage(webdriver).news
+        assert webdriver.find_element.call_count == 2
+        page = HomePage(webdriver, cache=True)
+        page.news
+        page.news
+        assert webdriver.find_element.call_count == 3
+
+    def test_not_shared_between_drivers(self):
+        first, second = mock.Mock(spec=WebDriver), mock.Mock(spec=WebDriver)
+        assert HomePage(first).logo is not HomePage(second).logo
+        first.find_element.assert_called_once_with(By.ID, 'logo')
+        second.find_element.assert_called_once_with(By.ID, 'logo')
+
+    def test_get_starts_new_document(self, webdriver):
+        home = HomePage(webdriver, root_uri='http://example.com')
+        home.logo
+        document = webdriver._po_components.document
+        SearchPage(webdriver).get('/search')
+        assert webdriver._po_components.document != document
+        home.logo
+        assert webdriver.find_element.call_count == 2
+
+    def test_invalidate(self, webdriver):
+        home = HomePage(webdriver)
+        home.logo
+        home.links
+        SearchPage(webdriver).invalidate('logo')
+        home.logo
+        assert webdriver.find_element.call_count == 2
+        home.invalidate()
+        home.logo
+        assert webdriver.find_element.call_count == 3
+
+    def test_resolve_shared(self, webdriver):
+        webdriver.execute_script.return_value = ['LOGO']
+        assert HomePage(webdriver).resolve('logo') == {'logo': 'LOGO'}
+        assert SearchPage(webdriver).logo == 'LOGO'
+        assert not webdriver.find_element.called
+
+    def test_not_shared_cache(self, webdriver):
+        class Footer(Component):
+            shared_cache = False
+            links = PageElement(css='footer a')
+
+        class FooterPage(Footer, Header, PageObject):
+            pass
+
+        assert not _page_elements(FooterPage)['links'].shared
+        assert _page_elements(FooterPage)['logo'].shared
+        FooterPage(webdriver).links
+        FooterPage(webdriver).links
+        assert webdriver.find_element.call_count == 2
+        page = FooterPage(webdriver, cache=True)
+        page.links
+        page.links
+        assert webdriver.find_element.call_count == 3
+
+    def test_stale_lazy(self, webdriver):
+        class LazyHeader(Component):
+            menu = PageElement(id_='menu', lazy=True)
+
+        class MenuPage(LazyHeader, PageObject):
+            pass
+
+        stale = mock.Mock(spec=WebElement)
+        stale.click.side_effect = StaleElementReferenceException
+        fresh = mock.Mock(spec=WebElement)
+        webdriver.find_element.side_effect = [stale, fresh]
+        MenuPage(webdriver).menu.click()
+        fresh.click.assert_called_once_with()
+        assert MenuPage(webdriver).menu.resolve() is fresh
+
+    def test_bases_order(self):
+        with pytest.raises(ValueError):
+            class WrongPage(PageObject, Header):
+                pass
+
+
+class TestWatch:
+
+    class TestPage(PageObject):
+        test_elem = PageElement(id_='foo')
+        test_elems = MultiPageElement(css='.bar')
+        test_link = PageElement(link_text='Home')
+        test_cell = PageElement(css='td', context=True)
+
+    def test_watch(self, webdriver):
+        page = self.TestPage(webdriver=webdriver)
+        webdriver.execute_script.return_value = ['a', ['b']]
+        watch = page.watch('test_elem', 'test_elems', field='value', interval=1)
+        assert isinstance(watch, Watch)
+        script, token, queries, field = webdriver.execute_script.call_args[0]
+        assert script == _WATCH_SCRIPT
+        assert token.startswith('__page_objects_')
+        assert queries == [['test_elem', By.CSS_SELECTOR, '[id="foo"]', False],
+                           ['test_elems', By.CSS_SELECTOR, '.bar', True]]
+        assert field == 'value'
+        assert watch.values == {'test_elem': 'a', 'test_elems': ['b']}
+
+        webdriver.execute_script.return_value = [['test_elem', 'a', 'c', 1500]]
+        [event] = watch.poll()
+        webdriver.execute_script.assert_called_with(_DRAIN_SCRIPT, token, False)
+        assert event == ('test_elem', 'a', 'c', 1.5)
+        assert watch.values['test_elem'] == 'c'
+
+        watch.stop()
+        webdriver.execute_script.assert_called_with(_DRAIN_SCRIPT, token, True)
+        assert watch.token is None
+
+    def test_new_document(self, webdriver):
+        page = self.TestPage(webdriver=webdriver)
+        webdriver.execute_script.return_value = ['a']
+        watch = page.watch('test_elem')
+        token = watch.token
+        webdriver.execute_script.side_effect = [None, ['b']]
+        [event] = watch.poll()
+        assert event[:3] == ('test_elem', 'a', 'b')
+        assert watch.token != token
+
+    def test_events_timeout(self, webdriver):
+        page = self.TestPage(webdriver=webdriver)
+        webdriver.execute_script.return_value = ['a']
+        watch = page.watch('test_elem', interval=0.01)
+        webdriver.execute_script.return_value = []
+        assert list(watch.events(timeout=0.05)) == []
+
+    def test_invalid(self, webdriver):
+        page = self.TestPage(webdriver=webdriver)
+        with pytest.raises(ValueError):
+            page.watch('test_cell')
+        with pytest.raises(ValueError):
+            page.watch('test_link')
+        with pytest.raises(TypeError):
+            page.watch('test_elem', timeout=1)
+        assert not webdriver.execute_script.called
+
+
+class TestBackend:
+    """ Page Objects don't import Selenium, so they can run on other webdrivers.
+    """
+    def test_by(self):
+        for name in dir(page_objects.By):
+            if name.isupper():
+                assert getattr(page_objects.By, name) == getattr(By, name)
+
+    def test_selenium_exceptions(self):
+        from page_objects import exceptions
+        assert exceptions.NoSuchElementException is NoSuchElementException
+        assert exceptions.WebDriverException is WebDriverException
+
+    def test_without_selenium(self):
+        script = textwrap.dedent("""
+            import sys
+            sys.modules['selenium'] = None
+            from page_objects import PageObject, PageElement
+            from page_objects.exceptions import NoSuchElementException, WebDriverException
+            from page_objects.testing import FakeWebDriver
+
+            class Page(PageObject):
+                header = PageElement(id_='header')
+                missing = PageElement(id_='missing')
+
+            page = Page(FakeWebDriver('<h1 id="header">Hi</h1>'))
+            assert page.header.text == 'Hi'
+            assert page.missing is None
+            assert issubclass(NoSuchElementException, WebDriverException)
+            try:
+                page.w.find_element('id', 'missing')
+            except NoSuchElementException as e:
+                print(e.msg)
+        """)
+        out = subprocess.check_output([sys.executable, '-c', script])
+        assert out.decode('ascii').strip() == 'Unable to locate element: id=missing'
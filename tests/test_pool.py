@@ -0,0 +1,197 @@
+import functools
+import os
+import sys
+import threading
+import time
+
+try:
+    from unittest import mock
+except ImportError:
+    import mock
+import pytest
+
+from selenium.webdriver.remote.webdriver import WebDriver
+from selenium.common.exceptions import WebDriverException
+
+from page_objects import PageObject, PageElement, instrumentation
+from page_objects.pool import ProcessPool, SessionPool, _RESET_SCRIPT
+from page_objects.testing import FakeWebDriver, make_page
+
+
+class LoginPage(PageObject):
+    pass
+
+
+class FakePage(PageObject):
+    header = PageElement(id_='header')
+
+
+# Flows for ProcessPool are pickled, so they have to be module level
+fake_driver = functools.partial(FakeWebDriver, make_page(rows=5, fields=1))
+
+
+def read_header(page):
+    return os.getpid(), page.header.text
+
+
+def remember(page, value):
+    page.w.add_cookie({'name': value, 'value': value})
+    return os.getpid()
+
+
+def cookies(page):
+    return [c['value'] for c in page.w.get_cookies()]
+
+
+def fail(page):
+    raise KeyError('foo')
+
+
+@pytest.fixture()
+def factory():
+    return mock.Mock(side_effect=lambda: mock.Mock(spec=WebDriver))
+
+
+class TestSessionPool:
+
+    def test_start(self, factory):
+        with SessionPool(factory, size=3) as pool:
+            assert factory.call_count == 3
+            pool.start()
+            assert factory.call_count == 3
+        for driver in pool._drivers:
+            driver.quit.assert_called_once_with()
+
+    def test_submit(self, factory):
+        def flow(page, uri):
+            page.get(uri)
+            return page
+
+        with SessionPool(factory, size=2, root_uri='http://example.com') as pool:
+            page = pool.submit(LoginPage, flow, '/login').result()
+        assert isinstance(page, LoginPage)
+        page.w.get.assert_called_once_with('http://example.com/login')
+        page.w.delete_all_cookies.assert_called_once_with()
+        page.w.execute_script.assert_called_once_with(_RESET_SCRIPT)
+        [result] = pool.results
+        assert result.name == 'flow'
+        assert result.ok
+        assert result.duration >= 0
+
+    def test_flows_run_in_parallel(self, factory):
+        barrier = threading.Barrier(4, timeout=5)
+
+        def flow(page):
+            barrier.wait()
+            return page.w
+
+        with SessionPool(factory, size=4) as pool:
+            drivers = [f.result() for f in [pool.submit(LoginPage, flow) for _ in range(4)]]
+        assert len(set(map(id, drivers))) == 4
+        assert factory.call_count == 4
+
+    def test_drivers_reused(self, factory):
+        with SessionPool(factory, size=2) as pool:
+            futures = [pool.submit(LoginPage, lambda page: time.sleep(0.01)) for _ in range(10)]
+            [f.result() for f in futures]
+        assert factory.call_count == 2
+        assert sorted(set(r.driver for r in pool.results)) == [0, 1]
+        assert len(pool.results) == 10
+
+    def test_no_reset(self, factory):
+        with SessionPool(factory, size=1, reset=False) as pool:
+            page = pool.submit(LoginPage, lambda page: page).result()
+        assert not page.w.delete_all_cookies.called
+
+    def test_flow_error(self, factory):
+        def flow(page):
+            raise KeyError('foo')
+
+        with SessionPool(factory, size=1) as pool:
+            with pytest.raises(KeyError):
+                pool.submit(LoginPage, flow).result()
+        [result] = pool.results
+        assert not result.ok
+        assert isinstance(result.error, KeyError)
+
+    def test_broken_driver_replaced(self, factory):
+        with SessionPool(factory, size=1) as pool:
+            broken = pool._drivers[0]
+            broken.delete_all_cookies.side_effect = WebDriverException
+            pool.submit(LoginPage, lambda page: None).result()
+            assert pool._drivers[0] is not broken
+        broken.quit.assert_called_once_with()
+        assert factory.call_count == 2
+
+    def test_broken_driver_not_replaced(self, factory):
+        with SessionPool(factory, size=1) as pool:
+            pool._drivers[0].delete_all_cookies.side_effect = WebDriverException
+            factory.side_effect = WebDriverException
+            with pytest.raises(WebDriverException):
+                pool.submit(LoginPage, lambda page: None).result()
+            assert pool._drivers == [None]
+            # The driver is started again when it's next checked out
+            factory.side_effect = lambda: mock.Mock(spec=WebDriver)
+            driver = pool.submit(LoginPage, lambda page: page.w).result(timeout=5)
+            assert pool._drivers == [driver]
+        assert factory.call_count == 3
+
+    def test_page(self, factory):
+        with SessionPool(factory, size=1, root_uri='http://example.com') as pool:
+            with pool.page(LoginPage) as page:
+                assert page.root_uri == 'http://example.com'
+                assert page.w is pool._drivers[0]
+            page.w.delete_all_cookies.assert_called_once_with()
+
+
+@pytest.mark.skipif(sys.version_info < (3, 7), reason="ProcessPool needs Python 3.7")
+class TestProcessPool:
+
+    def test_submit(self):
+        with ProcessPool(fake_driver, processes=2) as pool:
+            futures = [pool.submit(FakePage, read_header) for _ in range(6)]
+            results = [f.result() for f in futures]
+        assert set(text for _, text in results) == set(['Homeok'])
+        assert os.getpid() not in set(pid for pid, _ in results)
+        assert len(pool.results) == 6
+        assert set(r.driver for r in pool.results) <= set([0, 1])
+        assert all(r.ok and r.name == 'read_header' for r in pool.results)
+
+    def test_affinity(self):
+        with ProcessPool(fake_driver, processes=2, reset=False) as pool:
+            pids = [pool.submit_to('alice', FakePage, remember, str(i)).result() for i in range(3)]
+            assert len(set(pids)) == 1
+            assert pool.submit_to('alice', FakePage, cookies).result() == ['0', '1', '2']
+        assert set(r.driver for r in pool.results) == set([pool.worker_for('alice')])
+
+    def test_reset(self):
+        with ProcessPool(fake_driver, processes=1) as pool:
+            pool.submit(FakePage, remember, 'x').result()
+            assert pool.submit(FakePage, cookies).result() == []
+
+    def test_flow_error(self):
+        with ProcessPool(fake_driver, processes=1) as pool:
+            with pytest.raises(KeyError):
+                pool.submit(FakePage, fail).result()
+            # The worker carries on
+            assert pool.submit(FakePage, read_header).result()[1] == 'Homeok'
+        result = pool.results[0]
+        assert not result.ok
+        assert isinstance(result.error, KeyError)
+
+    def test_instrumentation_merged(self):
+        with ProcessPool(fake_driver, processes=2) as pool:
+            with instrumentation.recording() as recorder:
+                [f.result() for f in [pool.submit(FakePage, read_header) for _ in range(4)]]
+        stats = recorder.stats[('find', 'FakePage', 'header', 'id=header')]
+        assert stats.count == 4
+
+    def test_not_recording(self):
+        with ProcessPool(fake_driver, processes=1) as pool:
+            pool.submit(FakePage, read_header).result()
+        assert pool.results[0].ok
+
+    def test_unpicklable_flow(self):
+        with ProcessPool(fake_driver, processes=1) as pool:
+            with pytest.raises(Exception):
+                pool.submit(FakePage, lambda page: None).result()
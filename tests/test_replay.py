@@ -0,0 +1,129 @@
+import pytest
+
+from selenium.common.exceptions import NoSuchElementException
+
+from page_objects import PageObject, PageElement, MultiPageElement
+from page_objects.replay import RecordingDriver, ReplayDriver, ReplayElement, ReplayError
+from page_objects.testing import FakeWebDriver, make_page
+
+
+class TablePage(PageObject):
+    header = PageElement(id_='header')
+    missing = PageElement(id_='missing')
+    rows = MultiPageElement(css='tr.row')
+    name = PageElement(css='td.name', context=True)
+    field = PageElement(name='field0')
+
+
+def flow(page):
+    page.field = 'abc'
+    return {'header': page.header.text,
+            'missing': page.missing,
+            'ids': [row.get_attribute('data-id') for row in page.rows[:3]],
+            'name': page.name(page.rows[1]).text,
+            'resolved': sorted(page.resolve('header', 'rows')),
+            'iterated': len(list(page.iterate('rows', batch=4))),
+            'value': page.field.get_attribute('value')}
+
+
+@pytest.fixture()
+def recorder():
+    return RecordingDriver(FakeWebDriver(make_page(rows=10, fields=1)))
+
+
+class TestRecordingDriver:
+
+    def test_passes_through(self, recorder):
+        result = flow(TablePage(recorder))
+        assert result['header'] == 'Homeok'
+        assert result['missing'] is None
+        assert result['ids'] == ['0', '1', '2']
+        assert result['value'] == 'abc'
+
+    def test_entries(self, recorder):
+        TablePage(recorder).header.text
+        assert [e[:2] for e in recorder.entries if e[1] != 'root_uri'] == [
+            [None, 'find_element'], ['1', 'text']]
+        assert recorder.entries[-1][3] == 'Homeok'
+
+    def test_elements_are_stable(self, recorder):
+        assert recorder.find_element('id', 'header') is recorder.find_element('id', 'header')
+        assert recorder.find_element('id', 'header').parent is recorder
+
+    def test_errors(self, recorder):
+        with pytest.raises(NoSuchElementException):
+            recorder.find_element('id', 'missing')
+        assert recorder.entries[-1][3]['__error__'] == 'NoSuchElementException'
+
+
+class TestReplayDriver:
+
+    @pytest.mark.parametrize('filename', ['flow.json', 'flow.json.gz'])
+    def test_replay(self, recorder, tmpdir, filename):
+        expected = flow(TablePage(recorder))
+        path = str(tmpdir.join(filename))
+        recorder.save(path)
+        replay = ReplayDriver.load(path)
+        assert flow(TablePage(replay)) == expected
+        assert replay.command_count > 0
+        assert replay.recorded_seconds >= 0
+
+    def test_replay_many_times(self, recorder):
+        expected = flow(TablePage(recorder))
+        replay = ReplayDriver(recorder.entries)
+        for _ in range(3):
+            assert flow(TablePage(replay)) == expected
+
+    def test_responses_in_order(self):
+        replay = ReplayDriver([[None, 'execute_script', ['return 1'], 1, 0.1],
+                               [None, 'execute_script', ['return 1'], 2, 0.2]])
+        assert [replay.execute_script('return 1') for _ in range(3)] == [1, 2, 1]
+        assert replay.commands == ['execute_script'] * 3
+        assert replay.recorded_seconds == pytest.approx(0.4)
+        replay.reset_commands()
+        assert replay.command_count == 0
+
+    def test_elements(self):
+        replay = ReplayDriver([[None, 'find_elements', ['css selector', 'p'],
+                                [{'__element__': '1'}, {'__element__': '2'}], 0],
+                               ['2', 'text', None, 'Second', 0],
+                               ['2', 'parent', None, {'__driver__': True}, 0]])
+        first, second = replay.find_elements('css selector', 'p')
+        assert isinstance(first, ReplayElement)
+        assert second is replay.find_elements('css selector', 'p')[1]
+        assert second.text == 'Second'
+        assert second.parent is replay
+
+    def test_not_recorded(self, recorder):
+        TablePage(recorder).header
+        replay = ReplayDriver(recorder.entries)
+        with pytest.raises(ReplayError):
+            replay.find_element('id', 'other')
+        with pytest.raises(AttributeError):
+            replay.quit
+        assert getattr(replay, 'root_uri', None) is None
+
+    def test_keyword_arguments(self, recorder):
+        header = recorder.find_element(by='id', value='header')
+        assert recorder.entries[-1][5] == {'by': 'id', 'value': 'header'}
+        assert header.get_attribute(name='id') == 'header'
+        replay = ReplayDriver(recorder.entries)
+        elem = replay.find_element(by='id', value='header')
+        assert elem.get_attribute(name='id') == 'header'
+        with pytest.raises(ReplayError):
+            replay.find_element('id', 'header')
+        replay.find_element(value='header', by='id')
+        with pytest.raises(ReplayError) as e:
+            replay.find_element(by='id', value='other')
+        assert "by=\"id\", value=\"other\"" in str(e.value)
+
+    def test_bytes(self, recorder):
+        recorder._obj.get_screenshot_as_png = lambda: b'\x89PNG'
+        recorder.get_screenshot_as_png()
+        assert ReplayDriver(recorder.entries).get_screenshot_as_png() == b'\x89PNG'
+
+    def test_bad_format(self, tmpdir):
+        path = tmpdir.join('old.json')
+        path.write('{"format": 0, "commands": []}')
+        with pytest.raises(ValueError):
+            ReplayDriver.load(str(path))
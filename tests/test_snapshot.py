@@ -0,0 +1,136 @@
+import pytest
+
+from selenium.common.exceptions import (InvalidSelectorException, NoSuchElementException,
+                                        WebDriverException)
+
+from page_objects import PageObject, PageElement, MultiPageElement
+from page_objects.snapshot import SnapshotDriver, SnapshotElement
+from page_objects.testing import FakeWebDriver, make_page
+
+HTML = """<html><head><title>Shop</title></head><body>
+<div id="main">
+  <h1 class="title">Basket</h1>
+  <ul>
+    <li class="item" data-id="1"><a href="/items/1">One</a> <span class="price">1.50</span></li>
+    <li class="item" data-id="2"><a href="items/2">Two</a> <span class="price">2.50</span></li>
+    <li class="item" data-id="3" hidden><a href="/items/3">Three</a></li>
+  </ul>
+  <input type="checkbox" id="gift" checked>
+  <button id="buy" disabled>Buy</button>
+</div>
+</body></html>"""
+
+
+class BasketPage(PageObject):
+    title = PageElement(css='#main .title')
+    items = MultiPageElement(css='li.item')
+    links = MultiPageElement(xpath='//li/a')
+    price = PageElement(css='.price', context=True)
+    gift = PageElement(id_='gift')
+    buy = PageElement(id_='buy', wait=5, until='enabled')
+    main = PageElement(id_='main')
+    heading = PageElement(tag_name='h1', parent=main)
+
+
+@pytest.fixture()
+def driver():
+    return SnapshotDriver(HTML, url='http://shop.example.com/basket/', title='Shop')
+
+
+class TestSnapshotDriver:
+
+    def test_driver(self, driver):
+        assert driver.current_url == 'http://shop.example.com/basket/'
+        assert driver.title == 'Shop'
+        assert '<h1 class="title">Basket</h1>' in driver.page_source
+
+    def test_find(self, driver):
+        elem = driver.find_element('css selector', 'h1')
+        assert isinstance(elem, SnapshotElement)
+        assert elem.tag_name == 'h1'
+        assert elem.text == 'Basket'
+        assert elem == driver.find_element('class name', 'title')
+        assert len(driver.find_elements('css selector', 'li')) == 3
+        assert elem.find_elements('tag name', 'a') == []
+
+    def test_not_found(self, driver):
+        with pytest.raises(NoSuchElementException):
+            driver.find_element('id', 'nothing')
+        assert driver.find_elements('id', 'nothing') == []
+
+    def test_invalid_selector(self, driver):
+        with pytest.raises(InvalidSelectorException):
+            driver.find_element('css selector', 'li::before')
+
+    def test_attributes(self, driver):
+        links = driver.find_elements('tag name', 'a')
+        assert [a.get_attribute('href') for a in links] == [
+            'http://shop.example.com/items/1', 'http://shop.example.com/basket/items/2',
+            'http://shop.example.com/items/3']
+        assert links[1].get_dom_attribute('href') == 'items/2'
+        gift = driver.find_element('id', 'gift')
+        assert gift.get_attribute('checked') == 'true'
+        assert gift.is_selected()
+        assert gift.get_attribute('value') == ''
+        assert not driver.find_element('id', 'buy').is_enabled()
+
+    def test_hidden(self, driver):
+        items = driver.find_elements('css selector', 'li')
+        assert [i.is_displayed() for i in items] == [True, True, False]
+        assert items[2].text == ''
+
+    def test_unknown_script(self, driver):
+        with pytest.raises(WebDriverException):
+            driver.execute_script('return document.title')
+
+
+class TestSnapshotPage:
+
+    def test_elements(self, driver):
+        page = BasketPage(driver)
+        assert page.title.text == 'Basket'
+        assert [i.get_attribute('data-id') for i in page.items] == ['1', '2', '3']
+        assert page.price(page.items[1]).text == '2.50'
+        assert page.heading.text == 'Basket'
+
+    def test_wait(self, driver):
+        page = BasketPage(driver)
+        assert page.buy is None
+        assert len(page.links) == 3
+
+    def test_resolve(self, driver):
+        found = BasketPage(driver).resolve('title', 'items', 'gift')
+        assert found['title'].text == 'Basket'
+        assert len(found['items']) == 3
+
+    def test_extract(self, driver):
+        assert BasketPage(driver).extract('links', ['text', 'href']) == {
+            'text': ['One', 'Two', ''],
+            'href': ['http://shop.example.com/items/1', 'http://shop.example.com/basket/items/2',
+                     'http://shop.example.com/items/3']}
+
+    def test_iterate(self, driver):
+        page = BasketPage(driver)
+        assert [i.get_attribute('data-id') for i in page.iterate('items', batch=2)] == \
+            ['1', '2', '3']
+
+    def test_snapshot_of_fake_driver(self):
+        live = FakeWebDriver(make_page(rows=3, fields=1))
+        page = BasketPage(live)
+        snap = page.snapshot()
+        assert live.commands == ['execute_script']
+        assert snap.w.title == 'Fake Page'
+        assert isinstance(snap.w, SnapshotDriver)
+        assert live.commands == ['execute_script']
+
+    def test_snapshot_of_element(self):
+        live = FakeWebDriver(make_page(rows=3, fields=1))
+
+        class TablePage(PageObject):
+            table = PageElement(id_='rows')
+            rows = MultiPageElement(css='tr.row')
+            header = PageElement(id_='header')
+
+        snap = TablePage(live).snapshot('table')
+        assert len(snap.rows) == 3
+        assert snap.header is None
@@ -0,0 +1,309 @@
+import time
+
+import pytest
+
+from selenium.common.exceptions import (InvalidSelectorException, NoSuchElementException,
+                                        StaleElementReferenceException, WebDriverException)
+
+from page_objects import Component, PageObject, PageElement, MultiPageElement, dom
+from page_objects.testing import FakeWebDriver, make_page
+
+
+class FormPage(PageObject):
+    field = PageElement(name='field0')
+    remember = PageElement(id_='remember')
+    rows = MultiPageElement(css='tr.row')
+    name = PageElement(css='td.name', context=True)
+    missing = PageElement(id_='missing')
+    status = PageElement(css='#header .status')
+
+
+@pytest.fixture()
+def driver():
+    return FakeWebDriver(make_page(rows=10, fields=2) + '<input type="checkbox" id="remember">',
+                         pages={'/other': '<p id="other">Other</p>'})
+
+
+class TestFakeWebDriver:
+
+    def test_make_page(self, driver):
+        assert len(driver.find_elements('css selector', 'tr.row')) == 10
+        assert len(driver.find_elements('css selector', '#form input[type="text"]')) == 2
+        assert driver.title == 'Fake Page'
+
+    def test_command_count(self, driver):
+        driver.find_element('id', 'header').text
+        assert driver.commands == ['find_element', 'text']
+        assert driver.command_count == 2
+        driver.reset_commands()
+        assert driver.command_count == 0
+
+    def test_latency(self, driver):
+        driver.latency = 0.01
+        started = time.time()
+        driver.find_element('id', 'header')
+        assert time.time() - started >= 0.01
+
+    def test_not_found(self, driver):
+        with pytest.raises(NoSuchElementException):
+            driver.find_element('id', 'nothing')
+        assert driver.find_elements('id', 'nothing') == []
+
+    def test_invalid_selector(self, driver):
+        with pytest.raises(InvalidSelectorException):
+            driver.find_element('css selector', 'li::before')
+
+    def test_element_api(self, driver):
+        elem = driver.find_element('id', 'field-0')
+        assert elem.tag_name == 'input'
+        assert elem.get_attribute('value') == ''
+        elem.send_keys('abc')
+        assert elem.get_attribute('value') == 'abc'
+        elem.clear()
+        assert elem.get_attribute('value') == ''
+        assert elem.is_displayed()
+        assert elem.is_enabled()
+        assert elem == driver.find_element('name', 'field0')
+
+    def test_checkbox(self, driver):
+        elem = driver.find_element('id', 'remember')
+        assert not elem.is_selected()
+        elem.click()
+        assert elem.is_selected()
+        assert elem.get_attribute('checked') == 'true'
+
+    def test_navigate(self, driver):
+        elem = driver.find_element('id', 'header')
+        driver.get('/other')
+        assert driver.current_url == '/other'
+        assert driver.find_element('id', 'other').text == 'Other'
+        with pytest.raises(StaleElementReferenceException):
+            elem.text
+
+    def test_unknown_script(self, driver):
+        with pytest.raises(WebDriverException):
+            driver.execute_script('return 1;')
+
+    def test_add_script(self, driver):
+        driver.add_script('return arguments[0];', lambda d, node: node)
+        elem = driver.find_element('id', 'header')
+        assert driver.execute_script('return arguments[0];', elem) == elem
+
+    def test_wait_script(self, driver):
+        class WaitPage(PageObject):
+            footer = PageElement(id_='footer', wait=1, until='visible')
+            hidden = PageElement(id_='hidden', wait=0.05, until='visible')
+
+        driver.document.elements[0].append(dom.Node('p', {'id': 'hidden', 'hidden': ''}))
+        page = WaitPage(driver)
+        assert page.footer.text == 'Footer'
+        assert page.hidden is None
+        assert driver.commands == ['execute_async_script', 'text', 'execute_async_script']
+
+    def test_cookies(self, driver):
+        driver.add_cookie({'name': 'a', 'value': '1'})
+        driver.add_cookie({'name': 'a', 'value': '2'})
+        assert driver.get_cookies() == [{'name': 'a', 'value': '2'}]
+        driver.delete_all_cookies()
+        assert driver.get_cookies() == []
+
+
+class TestPageObjects:
+
+    def test_elements(self, driver):
+        page = FormPage(driver)
+        rows = page.rows
+        assert len(rows) == 10
+        assert page.name(rows[3]).text == 'Row 3'
+        assert driver.commands == ['find_elements', 'find_element', 'text']
+
+    def test_set(self, driver):
+        page = FormPage(driver)
+        page.field = 'abc'
+        assert page.field.get_attribute('value') == 'abc'
+
+    def test_cache_rerender(self):
+        driver = FakeWebDriver(pages={'/page': make_page(rows=3, fields=1)})
+        driver.get('/page')
+        page = FormPage(driver, cache=True)
+        assert page.status.text == 'ok'
+        assert [row.text for row in page.rows][0].startswith('Row 0')
+        # The same document again, so the cached elements are stale
+        driver.get('/page')
+        assert page.status.text == 'ok'
+        assert [row.text for row in page.rows][0].startswith('Row 0')
+        driver.reset_commands()
+        assert page.status.text == 'ok'
+        assert driver.commands == ['text']
+
+    def test_component_navigation_by_click(self):
+        class Header(Component):
+            logo = PageElement(id_='logo')
+            links = MultiPageElement(css='a')
+
+        class HomePage(Header, PageObject):
+            go = PageElement(id_='go')
+
+        class NextPage(Header, PageObject):
+            pass
+
+        driver = FakeWebDriver('<h1 id="logo">Home</h1><a id="go" href="/next">Next</a>',
+                               pages={'/next': '<h1 id="logo">Next</h1><a>1</a><a>2</a>'})
+        home = HomePage(driver)
+        assert home.logo.text == 'Home'
+        assert len(home.links) == 1
+        home.go.click()
+        page = NextPage(driver)
+        assert len(page.links) == 2
+        assert page.logo.text == 'Next'
+        assert page.logo.text == 'Next'
+        assert [a.text for a in page.links] == ['1', '2']
+
+    def test_resolve(self, driver):
+        page = FormPage(driver)
+        found = page.resolve('field', 'rows')
+        assert found['field'].get_attribute('name') == 'field0'
+        assert len(found['rows']) == 10
+        assert driver.commands[0] == 'execute_script'
+
+    def test_parent(self, driver):
+        class TablePage(PageObject):
+            table = PageElement(id_='rows')
+            row = PageElement(css='tr.row:nth-child(3)', parent=table)
+            name = PageElement(css='td.name', parent=row)
+            links = MultiPageElement(xpath='.//a', parent=row)
+
+        page = TablePage(driver)
+        assert page.name.text == 'Row 2'
+        assert [a.get_attribute('href') for a in page.links] == ['/rows/2']
+        assert driver.commands == ['execute_script', 'text', 'execute_script', 'get_attribute']
+
+    def test_parent_descendant_css(self):
+        class SidePage(PageObject):
+            side = PageElement(id_='side')
+            spans = MultiPageElement(css='div span', parent=side)
+
+        driver = FakeWebDriver('<div><section id="side"><span>x</span></section></div>')
+        page = SidePage(driver)
+        # As found from the parent element, the div can be one of its ancestors
+        assert [s.text for s in page.spans] == ['x']
+        assert page.spans == page.side.find_elements('css selector', 'div span')
+
+    def test_extract(self, driver):
+        class TablePage(PageObject):
+            rows = MultiPageElement(css='tr.row')
+            cells = MultiPageElement(css='td', context=True)
+
+        page = TablePage(driver)
+        columns = page.extract('rows', ['data-id', 'tag_name'])
+        assert columns == {'data-id': [str(i) for i in range(10)], 'tag_name': ['tr'] * 10}
+        row = driver.find_element('css selector', 'tr.row')
+        assert page.extract('cells', ['text'], context=row) == {'text': ['Row 0', '0', 'View']}
+        assert driver.commands == ['execute_script', 'find_element', 'execute_script']
+
+    def test_extract_single(self):
+        class ListPage(PageObject):
+            item = PageElement(css='li')
+
+        page = ListPage(FakeWebDriver('<ul><li>one</li><li>two</li></ul>'))
+        assert page.extract('item', ['text']) == {'text': ['one']}
+        page.cache_elements = True
+        page.item
+        assert page.extract('item', ['text']) == {'text': ['one']}
+
+    def test_iterate_scroll(self, driver):
+        class TablePage(PageObject):
+            rows = MultiPageElement(css='tr.row')
+
+        def load_more(driver):
+            table = dom.query(driver.document, 'id', 'rows', multi=False)
+            count = len(table.elements)
+            if count < 25:
+                for i in range(count, count + 10):
+                    table.append(dom.Node('tr', {'class': 'row', 'data-id': str(i)}))
+
+        driver.on_scroll = load_more
+        page = TablePage(driver)
+        rows = list(page.iterate('rows', batch=4, scroll=True, pause=0))
+        assert [r.get_attribute('data-id') for r in rows] == [str(i) for i in range(30)]
+
+    def test_iterate_key(self, driver):
+        class TablePage(PageObject):
+            rows = MultiPageElement(css='tr.row')
+
+        def recycle(driver):
+            # Reuse the rows for the next page of items, like a virtualised grid
+            rows = dom.query(driver.document, 'css selector', 'tr.row')
+            start = int(rows[0].attrs['data-id']) + len(rows)
+            if start < 30:
+                for i, row in enumerate(rows):
+                    row.attrs['data-id'] = str(start + i)
+
+        driver.on_scroll = recycle
+        page = TablePage(driver)
+        rows = page.iterate('rows', batch=4, key='data-id', scroll=True, pause=0)
+        assert len(list(rows)) == 30
+
+    def test_fill(self, driver):
+        page = FormPage(driver)
+        page.fill(field='abc', remember=True)
+        assert driver.commands == ['execute_script']
+        assert page.field.get_attribute('value') == 'abc'
+        assert page.remember.is_selected()
+
+    def test_navigate(self, driver):
+        page = FormPage(driver)
+        page.get('/other')
+        page.get('/other', reload=False)
+        assert driver.commands == ['get', 'current_url']
+        page.get('/other', strategy='eager')
+        assert driver.find_element('id', 'other')
+        assert page.last_navigation.strategy == 'eager'
+
+    def test_navigate_history(self, driver):
+        page = FormPage(driver)
+        page.get('/app/rows', strategy='history')
+        assert driver.current_url == '/app/rows'
+        assert len(page.rows) == 10
+
+    def test_has(self, driver):
+        driver.implicit_wait = 5
+        page = FormPage(driver)
+        started = time.time()
+        assert page.has('field')
+        assert not page.has('missing')
+        assert time.time() - started < 1
+        assert page.has('name', page.rows[0])
+        assert driver.commands == ['execute_script', 'execute_script', 'find_elements',
+                                   'execute_script']
+
+    def test_watch(self, driver):
+        page = FormPage(driver)
+        status = driver.find_element('css selector', '#header .status').node
+        rows = page.rows
+        with page.watch('status', 'missing') as watch:
+            assert watch.values == {'status': 'ok', 'missing': None}
+            driver.reset_commands()
+            assert watch.poll() == []
+            status.children[0].data = 'busy'
+            status.children[0].data = 'done'
+            [event] = watch.poll()
+            assert event[:3] == ('status', 'ok', 'done')
+            assert driver.commands == ['execute_script', 'execute_script']
+        assert watch.token is None
+        assert not driver.window
+
+        watch = page.watch('rows', field='data-id', interval=0.01)
+        rows[0].node.parent.children.remove(rows[0].node)
+        [event] = list(watch.events(timeout=0.05))
+        assert event.new == [str(i) for i in range(1, 10)]
+        assert len(event.old) == 10
+
+    def test_watch_navigation(self, driver):
+        page = FormPage(driver)
+        watch = page.watch('status', 'field')
+        page.get('/other')
+        events = watch.poll()
+        assert sorted(e.name for e in events) == ['field', 'status']
+        assert watch.values == {'status': None, 'field': None}
+        assert watch.poll() == []
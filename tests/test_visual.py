@@ -0,0 +1,141 @@
+import json
+import os
+
+try:
+    from unittest import mock
+except ImportError:
+    import mock
+import pytest
+
+numpy = pytest.importorskip('numpy')
+pytest.importorskip('PIL')
+
+from page_objects import PageObject, PageElement
+from page_objects import visual
+from page_objects.visual import BaselineStore, Comparison
+
+
+class HeaderPage(PageObject):
+    header = PageElement(id_='header')
+
+
+def image(width=64, height=40, color=(200, 100, 50, 255)):
+    pixels = numpy.zeros((height, width, 4), dtype=numpy.uint8)
+    pixels[:] = color
+    return pixels
+
+
+@pytest.fixture()
+def store(tmpdir):
+    return BaselineStore(str(tmpdir), tile_size=16)
+
+
+def test_encode_decode():
+    pixels = image()
+    pixels[3, 5] = (1, 2, 3, 255)
+    assert (visual.decode(visual.encode(pixels)) == pixels).all()
+
+
+def test_tile_digests():
+    pixels = image(width=40, height=20)
+    digests = visual.tile_digests(pixels, 16)
+    assert len(digests) == 2 and len(digests[0]) == 3
+    pixels[17, 33] = 0
+    changed = visual.tile_digests(pixels, 16)
+    assert [[a == b for a, b in zip(*rows)] for rows in zip(digests, changed)] == \
+        [[True, True, True], [True, True, False]]
+
+
+def test_diff_threshold():
+    a = image()
+    b = a.copy()
+    b[0, 0, 0] += 5
+    b[1, 1, 1] += 20
+    assert visual.diff(a, b).sum() == 2
+    assert visual.diff(a, b, threshold=10).sum() == 1
+
+
+class TestBaselineStore:
+
+    def test_new_baseline(self, store):
+        comparison = store.compare(HeaderPage, 'header', visual.encode(image()))
+        assert comparison.new and comparison.ok
+        path = store.path(HeaderPage, 'header')
+        assert path == os.path.join(store.directory, 'HeaderPage', 'header.png')
+        assert os.path.exists(path)
+        with open(path[:-4] + '.json') as f:
+            assert json.load(f)['size'] == [64, 40]
+
+    def test_unchanged_skips_baseline(self, store):
+        png = visual.encode(image())
+        store.compare(HeaderPage, 'header', png)
+        with mock.patch.object(visual, 'decode', wraps=visual.decode) as decode:
+            comparison = store.compare(HeaderPage, 'header', png)
+        assert comparison.ok and not comparison.new
+        # Only the capture is decoded, not the baseline
+        assert decode.call_count == 1
+
+    def test_changed_tiles(self, store):
+        store.compare(HeaderPage, 'header', visual.encode(image()))
+        pixels = image()
+        pixels[20:22, 50:52] = (0, 0, 0, 255)
+        comparison = store.compare(HeaderPage, 'header', visual.encode(pixels))
+        assert not comparison.ok
+        assert comparison.changed_pixels == 4
+        assert comparison.changed_tiles == [(48, 16, 16, 16)]
+        assert comparison.ratio == 4.0 / (64 * 40)
+
+    def test_edge_tiles(self, store):
+        store.compare(HeaderPage, 'header', visual.encode(image()))
+        pixels = image()
+        pixels[39, 63] = 0
+        comparison = store.compare(HeaderPage, 'header', visual.encode(pixels))
+        assert comparison.changed_tiles == [(48, 32, 16, 8)]
+
+    def test_tolerance_and_threshold(self, tmpdir):
+        store = BaselineStore(str(tmpdir), threshold=10, tolerance=0.01)
+        store.compare(HeaderPage, 'header', visual.encode(image()))
+        pixels = image()
+        pixels[0, :10, 0] += 5
+        assert store.compare(HeaderPage, 'header', visual.encode(pixels)).changed_pixels == 0
+        pixels[0, :10, 0] += 50
+        comparison = store.compare(HeaderPage, 'header', visual.encode(pixels))
+        assert comparison.changed_pixels == 10
+        assert comparison.ok
+
+    def test_size_changed(self, store):
+        store.compare(HeaderPage, 'header', visual.encode(image()))
+        comparison = store.compare(HeaderPage, 'header', visual.encode(image(width=60)))
+        assert not comparison.ok
+        assert comparison.baseline_size == (64, 40)
+        assert 'baseline 64x40' in repr(comparison)
+
+    def test_update(self, store, tmpdir):
+        store.compare(HeaderPage, 'header', visual.encode(image()))
+        updating = BaselineStore(str(tmpdir), update=True, tile_size=16)
+        black = visual.encode(image(color=(0, 0, 0, 255)))
+        assert updating.compare(HeaderPage, 'header', black).new
+        comparison = store.compare(HeaderPage, 'header', black)
+        assert comparison.ok and not comparison.new
+
+    def test_other_tile_size(self, store, tmpdir):
+        png = visual.encode(image())
+        store.compare(HeaderPage, 'header', png)
+        other = BaselineStore(str(tmpdir), tile_size=8)
+        assert other.compare(HeaderPage, 'header', png).ok
+        with open(store.path(HeaderPage, 'header')[:-4] + '.json') as f:
+            assert json.load(f)['tile_size'] == 8
+
+    def test_check(self, store):
+        page = mock.Mock(spec=HeaderPage)
+        page.__class__ = HeaderPage
+        page.capture.return_value = visual.encode(image())
+        comparison = store.check(page, 'header', baseline='header-hover')
+        page.capture.assert_called_once_with('header', None)
+        assert comparison.key == ('HeaderPage', 'header-hover')
+
+
+def test_comparison_repr():
+    comparison = Comparison(('Page', 'header'), (10, 10), 3, [(0, 0, 10, 10)])
+    assert repr(comparison) == '<Comparison Page.header 3 pixels changed in 1 tiles>'
+    assert not comparison.ok